@@ -0,0 +1,32 @@
+-- Incremental pull for the local inventory snapshot (see src/tools/inventory_snapshot.py).
+-- Re-aggregates only the (BU, item) keys with on-hand rows changed after the watermark (the single '?').
+SELECT
+    bu.business_unit_name                 AS business_unit_name,
+    item.item_number                      AS item_number,
+    SUM(ohd.primary_transaction_quantity) AS available_quantity,
+    MAX(ohd.last_update_date)             AS last_update_date
+FROM
+    fdi_idl_catalog.default.dw_inventory_item_d           item          /* Dim_DW_INVENTORY_ITEM_D */,
+    fdi_idl_catalog.default.dw_inv_subinventory_d         subinv        /* Dim_DW_INV_SUBINVENTORY_D */,
+    fdi_idl_catalog.default.dw_internal_org_d             org           /* Dim_DW_INV_ORGANIZATION_D_Inventory_Org */,
+    fdi_idl_catalog.default.dw_inv_onhand_details_cf      ohd           /* Fact_DW_INV_ONHAND_DETAILS_CF */,
+    fdi_idl_catalog.default.dw_business_unit_d_tl         bu
+WHERE
+    subinv.organization_id = ohd.organization_id
+    AND subinv.secondary_inventory_name = ohd.subinventory_code
+    AND org.organization_id = ohd.organization_id
+    AND bu.business_unit_id = ohd.business_unit_id
+    AND item.organization_id = ohd.organization_id
+    AND org.organization_code = '002'
+    AND item.inventory_item_id = ohd.inventory_item_id
+    AND org.inv_business_unit_id = bu.business_unit_id
+    AND EXISTS (
+        SELECT 1
+        FROM fdi_idl_catalog.default.dw_inv_onhand_details_cf chg
+        WHERE chg.inventory_item_id = ohd.inventory_item_id
+          AND chg.business_unit_id = ohd.business_unit_id
+          AND chg.last_update_date > ?
+    )
+GROUP BY
+    bu.business_unit_name,
+    item.item_number;
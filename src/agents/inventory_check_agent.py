@@ -5,25 +5,31 @@ from wayflowcore.executors.executionstatus import (
 )
 from wayflowcore.tools import tool
 from wayflowcore.models import OCIGenAIModel
-from src.llm.oci_genai import initialize_llm
-from src.tools.aidp_fdi_inventory_check_tools import aidp_fdi_inventory_check
+from src.llm.registry import get_llm, get_registry
+from src.tools.aidp_fdi_inventory_check_tools import aidp_fdi_inventory_check, aidp_fdi_inventory_check_bulk
 
 import re
 from typing import List, Dict, Any
 
+def _build_agent() -> Agent:
+    return Agent(
+        custom_instruction="Check item inventory for the provided list of item_numbers, list of item_required_quantity, and bu. "
+                           "When several bu or orders are given, check them all with ONE aidp_fdi_inventory_check_bulk call. "
+                           "Respond ONLY JSON with proper line breaks",
+        tools=[aidp_fdi_inventory_check, aidp_fdi_inventory_check_bulk], 
+        llm=get_llm()
+    )
+
+def get_inventory_check_agent() -> Agent:
+    """Built once per process; every call gets its own conversation."""
+    return get_registry().get("agent:inventory_check", _build_agent)
+
 def inventory_check_agent(user_msg: str):
 
     print("anup : ")
     print(user_msg)
-    llm = initialize_llm()
-
-    assistant = Agent(
-        custom_instruction="Check item inventory for the provided list of item_numbers, list of item_required_quantity, and bu. Respond ONLY JSON with proper line breaks",
-        tools=[aidp_fdi_inventory_check], 
-        llm=llm
-    )
 
-    conversation = assistant.start_conversation()
+    conversation = get_inventory_check_agent().start_conversation()
     #user_msg = f"item_numbers: {item_numbers}\nitem_required_quantity: {item_required_quantity}\nbu: {bu}\nquestion: {question}"
     conversation.append_user_message(user_msg)
     status = conversation.execute()
@@ -6,14 +6,11 @@ from wayflowcore.executors.executionstatus import (
 )
 from wayflowcore.tools import tool
 from wayflowcore.models import OCIGenAIModel
-from src.llm.oci_genai import initialize_llm
+from src.llm.registry import get_llm, get_registry
 from src.tools.order_create_tools import create_order
 from src.tools.email_tool import send_email_dummy
 
-def order_create_agent(user_msg: str):
-
-    llm = initialize_llm()
-
+def _build_agent() -> Agent:
     system_prompt = """
     Create Order in Fusion. Respond ONLY JSON with proper line breaks. 
     Now send an email out using the email tool after the create_order_tool comes back with a resppnse (either valid or error).
@@ -21,13 +18,19 @@ def order_create_agent(user_msg: str):
         f"subject : Order has been created",
         f"body: Order has been created. The body should be the response form the order_create_tools",
     """
-    assistant = Agent(
+    return Agent(
         custom_instruction="",
         tools=[create_order, send_email_dummy],
-        llm=llm
+        llm=get_llm()
     )
 
-    conversation = assistant.start_conversation()
+def get_order_create_agent() -> Agent:
+    """Built once per process; every call gets its own conversation."""
+    return get_registry().get("agent:order_create", _build_agent)
+
+def order_create_agent(user_msg: str):
+
+    conversation = get_order_create_agent().start_conversation()
     conversation.append_user_message(user_msg)
     status = conversation.execute()
 
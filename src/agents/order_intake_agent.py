@@ -6,26 +6,29 @@ from wayflowcore.executors.executionstatus import (
     UserMessageRequestStatus,
 )
 from wayflowcore.models import OCIGenAIModel
-from src.llm.oci_genai import initialize_llm
+from src.llm.registry import get_llm, get_registry
 from src.system_prompts.order_intake_agent_prompts import prompt_order_intake_agent
 from src.tools.vision_instruct_tools import image_to_text
 from src.tools.speech_instruct_tools import voice_to_text
 import os
 from pathlib import Path
 
-def order_intake_agent(user_msg: str):
-
-    llm = initialize_llm()
-
+def _build_agent() -> Agent:
     # order_intake_agent_instructions = prompt_order_intake_agent.strip()
 
-    assistant = Agent(
+    return Agent(
         custom_instruction="Get information from the file. Don't forget to Extract the BusinessUnitId, among the others",
         tools=[voice_to_text, image_to_text], 
-        llm=llm,
-    )    
+        llm=get_llm(),
+    )
+
+def get_order_intake_agent() -> Agent:
+    """Built once per process; every call gets its own conversation."""
+    return get_registry().get("agent:order_intake", _build_agent)
+
+def order_intake_agent(user_msg: str):
 
-    conversation = assistant.start_conversation()
+    conversation = get_order_intake_agent().start_conversation()
     conversation.append_user_message(user_msg)
     status = conversation.execute()
 
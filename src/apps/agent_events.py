@@ -0,0 +1,99 @@
+# src/apps/agent_events.py
+"""
+Server-Sent Events for agent progress.
+
+AgentEventStream is a wayflowcore EventListener: registered around an agent
+run (in the executor thread), it turns conversation events into SSE frames
+that the endpoint streams to the client as they happen.
+
+    event: token        {"text": "..."}                      LLM output chunk
+    event: llm_start / llm_end  {"ms": ...}                  one LLM generation
+    event: tool_start / tool_end {"tool", "id", "ms"}        tool call
+    event: agent_start / agent_end                           agent execution
+    event: stage        {"name", "status", "ms"}             pipeline/job stage transitions
+
+Every frame carries t_ms, milliseconds since the request was accepted.
+"""
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+from wayflowcore.events.event import (
+    Event,
+    AgentExecutionStartedEvent,
+    AgentExecutionFinishedEvent,
+    ConversationMessageStreamChunkEvent,
+    LlmGenerationRequestEvent,
+    LlmGenerationResponseEvent,
+    ToolExecutionStartEvent,
+    ToolExecutionResultEvent,
+)
+from wayflowcore.events.eventlistener import EventListener
+
+_END = object()
+
+
+def sse(kind: str, data: Dict[str, Any]) -> str:
+    """One SSE frame."""
+    return f"event: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class AgentEventStream(EventListener):
+    """Thread-safe bridge from wayflowcore events (worker thread) to an asyncio queue (event loop)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._started = time.perf_counter()
+        self._spans: Dict[Any, float] = {}
+
+    def _elapsed_ms(self, since: Optional[float] = None) -> float:
+        return round((time.perf_counter() - (self._started if since is None else since)) * 1000, 1)
+
+    def emit(self, kind: str, **data) -> None:
+        """Queue a frame; callable from any thread."""
+        data["t_ms"] = self._elapsed_ms()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (kind, data))
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, _END)
+
+    def on_stage(self, name: str, status: str, ms: Optional[float]) -> None:
+        self.emit("stage", name=name, status=status, ms=ms)
+
+    def _start_span(self, key) -> None:
+        self._spans[key] = time.perf_counter()
+
+    def _end_span(self, key) -> Optional[float]:
+        started = self._spans.pop(key, None)
+        return None if started is None else self._elapsed_ms(started)
+
+    def __call__(self, event: Event) -> None:
+        if isinstance(event, ConversationMessageStreamChunkEvent):
+            self.emit("token", text=event.chunk)
+        elif isinstance(event, ToolExecutionStartEvent):
+            request_id = event.tool_request.tool_request_id
+            self._start_span(("tool", request_id))
+            self.emit("tool_start", tool=event.tool.name, id=request_id)
+        elif isinstance(event, ToolExecutionResultEvent):
+            request_id = event.tool_result.tool_request_id
+            self.emit("tool_end", tool=event.tool.name, id=request_id, ms=self._end_span(("tool", request_id)))
+        elif isinstance(event, LlmGenerationRequestEvent):
+            self._start_span(("llm", id(event.llm)))
+            self.emit("llm_start")
+        elif isinstance(event, LlmGenerationResponseEvent):
+            self.emit("llm_end", ms=self._end_span(("llm", id(event.llm))))
+        elif isinstance(event, AgentExecutionStartedEvent):
+            self.emit("agent_start")
+        elif isinstance(event, AgentExecutionFinishedEvent):
+            self.emit("agent_end")
+
+    async def frames(self) -> AsyncIterator[str]:
+        """SSE frames until close()."""
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            kind, data = item
+            yield sse(kind, data)
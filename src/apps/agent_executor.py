@@ -0,0 +1,159 @@
+# src/apps/agent_executor.py
+"""
+Runs the blocking agent calls (order_intake_agent, inventory_check_agent,
+order_create_agent) off the event loop.
+
+One sized thread pool executes them; every endpoint gets an EndpointLimiter
+with its own concurrency limit and a bounded wait queue. A request that finds
+the queue full is rejected immediately (429), one that waits longer than the
+queue timeout gets 503; both carry Retry-After.
+"""
+import time
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.common.config import (
+    AGENT_EXECUTOR_WORKERS, AGENT_QUEUE_SIZE, AGENT_QUEUE_TIMEOUT, AGENT_RETRY_AFTER,
+)
+
+
+class AgentOverloadedError(RuntimeError):
+    """The endpoint cannot take the request now; maps to 429 (queue full) or 503 (queue wait timed out)."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int = AGENT_RETRY_AFTER):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, fn: Callable[..., Any], *args) -> None:
+    try:
+        loop.call_soon_threadsafe(fn, *args)
+    except RuntimeError:
+        pass  # loop closed at shutdown; nothing left to account for
+
+
+class EndpointLimiter:
+    """
+    Per-endpoint admission control (event-loop side; no locks needed).
+
+    - concurrency:   agent calls of this endpoint running at once
+    - queue_size:    requests allowed to wait for a slot; beyond that -> 429
+    - queue_timeout: seconds a request may wait for a slot -> 503
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int = AGENT_QUEUE_SIZE,
+                 queue_timeout: float = AGENT_QUEUE_TIMEOUT):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self._stats = {"admitted": 0, "rejected": 0, "timed_out": 0, "completed": 0, "failed": 0,
+                       "max_waiting": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def check(self) -> None:
+        """Raise the 429 up front (e.g. before a streaming response has started)."""
+        if self.in_flight + self.waiting >= self.concurrency + self.queue_size:
+            self._stats["rejected"] += 1
+            raise AgentOverloadedError(f"{self.name}: {self.waiting} requests already queued", 429)
+
+    async def run(self, executor: ThreadPoolExecutor, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self.check()
+        await self._acquire(self.queue_timeout)
+        return await self._start(executor, fn, *args, **kwargs)
+
+    async def run_queued(self, executor: ThreadPoolExecutor, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """run() for background jobs: same slots, but no queue bound or wait timeout (JOB_MAX_PENDING bounds jobs)."""
+        await self._acquire(None)
+        return await self._start(executor, fn, *args, **kwargs)
+
+    async def _acquire(self, timeout: Optional[float]) -> None:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+        self.waiting += 1
+        self._stats["max_waiting"] = max(self._stats["max_waiting"], self.waiting)
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            raise AgentOverloadedError(f"{self.name}: no free slot within {self.queue_timeout:g}s", 503)
+        finally:
+            self.waiting -= 1
+            self._record_wait((time.monotonic() - started) * 1000)
+
+    async def _start(self, executor: ThreadPoolExecutor, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self.in_flight += 1
+        self._stats["admitted"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)  # keep the request's contextvars
+            future = executor.submit(call)
+        except BaseException:
+            self._finished(None)
+            raise
+        # the slot is freed when the call finishes, not when the request goes away: a client that
+        # disconnects cancels this await, but the thread keeps running until fn returns
+        future.add_done_callback(lambda f: _call_soon(loop, self._finished, f))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _finished(self, future: Optional[Future]) -> None:
+        self.in_flight -= 1
+        self._sem.release()
+        if future is not None and not future.cancelled() and future.exception() is None:
+            self._stats["completed"] += 1
+        else:
+            self._stats["failed"] += 1
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self._stats["wait_ms_total"] += wait_ms
+        self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+
+    def stats(self) -> Dict[str, float]:
+        s = dict(self._stats)
+        waited = s["admitted"] + s["timed_out"] or 1
+        s["avg_wait_ms"] = round(s.pop("wait_ms_total") / waited, 2)
+        s["wait_ms_max"] = round(s["wait_ms_max"], 2)
+        s.update(in_flight=self.in_flight, queue_depth=self.waiting,
+                 concurrency=self.concurrency, queue_size=self.queue_size)
+        return s
+
+
+class AgentExecutor:
+    """Sized thread pool for blocking agent calls plus the limiters of the endpoints using it."""
+
+    def __init__(self, max_workers: int = AGENT_EXECUTOR_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self.limiters: Dict[str, EndpointLimiter] = {}
+
+    def limiter(self, name: str, concurrency: int, **kwargs) -> EndpointLimiter:
+        if name not in self.limiters:
+            self.limiters[name] = EndpointLimiter(name, concurrency, **kwargs)
+        return self.limiters[name]
+
+    async def run(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool under the `name` endpoint's limits."""
+        return await self.limiters[name].run(self._executor, fn, *args, **kwargs)
+
+    def run_from_thread(self, loop: asyncio.AbstractEventLoop, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        For job worker threads: block until fn(*args, **kwargs) has run on the pool under the
+        `name` endpoint's concurrency limit. The slot is awaited on `loop` (the server's loop);
+        fn keeps the calling thread's contextvars.
+        """
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        limited = self.limiters[name].run_queued(self._executor, call)
+        return asyncio.run_coroutine_threadsafe(limited, loop).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.max_workers, "endpoints": {n: l.stats() for n, l in self.limiters.items()}}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
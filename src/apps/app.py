@@ -1,5 +1,10 @@
 # app.py — intake-driven create (no user item/qty picking)
-import json, re, requests, streamlit as st
+import sys, json, requests, streamlit as st
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repo root, for src.utils
+from src.utils import order_payload
+from src.utils.order_payload import DEFAULT_BUS
 
 st.set_page_config(page_title="Agent Orchestrator (Streaming)", page_icon="🤖", layout="wide")
 st.title("🤖 SCM - Sales Order Automation Agent")
@@ -15,6 +20,8 @@ with st.sidebar:
     st.code("streamlit run app.py --server.address 0.0.0.0 --server.port 8505")
     st.markdown("---")
     transaction_number = st.text_input("Transaction Number", value="R230_Sample_Order_ATOModel_232")
+    use_pipeline = st.checkbox("Run server-side (/stream/orders/pipeline)", value=True,
+                               help="One request; intake, inventory, create and email run inside the API server.")
 
 # ---------------- HTTP helpers ----------------
 session = requests.Session()
@@ -23,109 +30,25 @@ def GET(path, **kw):  return session.get(_url(path), timeout=timeout, **kw)
 def POST(path, **kw): return session.post(_url(path), timeout=timeout, **kw)
 
 # ---------------- State ----------------
-DEFAULT_BUS = ["US1 Business Unit", "EMEA1 Business Unit", "APAC1 Business Unit"]
-DEFAULT_SKUS = ["AS6647431", "AS6647432", "AS6647433"]  # only for ultimate fallback
-
 if "order_json" not in st.session_state:           st.session_state.order_json = {}   # final create payload
 if "intake_bu"  not in st.session_state:           st.session_state.intake_bu  = None
 if "last_create_result" not in st.session_state:   st.session_state.last_create_result = None
 
-# ---------------- Parsers/Builders ----------------
+# ---------------- Parsers/Builders (shared with the server pipeline) ----------------
 def parse_order_from_intake(intake_resp, fallback_txn: str) -> dict:
     """Convert /orders/image output into a minimal create-order payload. No user item/qty input."""
-    def _unwrap(x):
-        if isinstance(x, dict) and "final_answer" in x: return x["final_answer"]
-        return x
-    raw = _unwrap(intake_resp)
-
-    # Already shaped as create payload
-    if isinstance(raw, dict) and raw.get("lines"):
-        # capture BU name if present
-        st.session_state.intake_bu = raw.get("BusinessUnit") or raw.get("BillToCustomer", {}).get("BusinessUnit")
-        return raw
-
-    # Common schema from intake: {"BusinessUnit": "...", "OrderItems": [{"Item":"AS..","Quantity":N}, ...]}
-    if isinstance(raw, str):
-        try:
-            as_json = json.loads(raw)
-            if isinstance(as_json, dict):
-                bu = as_json.get("BusinessUnit") or as_json.get("BillToCustomer", {}).get("BusinessUnit")
-                st.session_state.intake_bu = bu
-                items = []
-                for key in ("OrderItems", "Items", "Lines"):
-                    if isinstance(as_json.get(key), list):
-                        for it in as_json[key]:
-                            sku = it.get("Item") or it.get("ProductNumber") or it.get("item_number")
-                            qty = it.get("Quantity") or it.get("OrderedQuantity") or it.get("qty")
-                            if sku and qty is not None:
-                                items.append((str(sku), int(qty)))
-                        break
-                if items:
-                    return build_create_payload(fallback_txn, bu or DEFAULT_BUS[0], items)
-        except Exception:
-            pass
-
-        # Bullet/text fallback “… Item AS#### … Quantity/Required: N …”
-        pat = re.compile(r"(?:Item\s*)?(?P<sku>AS\d+)\D+?(?:Required:\s*(?P<q1>\d+)|Quantity\s*[:=]\s*(?P<q2>\d+))", re.I)
-        items = []
-        for m in pat.finditer(raw):
-            sku = m.group("sku"); qty = int(m.group("q1") or m.group("q2"))
-            items.append((sku, qty))
-        if items:
-            st.session_state.intake_bu = st.session_state.intake_bu or DEFAULT_BUS[0]
-            return build_create_payload(fallback_txn, st.session_state.intake_bu, items)
-
-    # Ultimate fallback (should rarely trigger)
-    st.session_state.intake_bu = st.session_state.intake_bu or DEFAULT_BUS[0]
-    return build_create_payload(fallback_txn, st.session_state.intake_bu, [(DEFAULT_SKUS[0], 1)])
-
-def build_create_payload(txn: str, bu_name: str, items: list[tuple[str, int]]) -> dict:
-    payload = {
-        "SourceTransactionNumber": txn,
-        "SourceTransactionSystem": "OPS",
-        "SourceTransactionId": txn,
-        "TransactionalCurrencyCode": "USD",
-        # Map BU name -> IDs here if needed
-        "BusinessUnitId": 300000046987012,
-        "RequestingBusinessUnitId": 300000046987012,
-        "BuyingPartyNumber": "10060",
-        "RequestedShipDate": "2018-09-19",
-        "SubmittedFlag": "true",
-        "FreezePriceFlag": "false",
-        "FreezeShippingChargeFlag": "false",
-        "FreezeTaxFlag": "false",
-        "lines": []
-    }
-    for i, (sku, qty) in enumerate(items, start=1):
-        payload["lines"].append({
-            "SourceTransactionLineId": str(i),
-            "SourceTransactionLineNumber": str(i),
-            "SourceScheduleNumber": "1",
-            "SourceTransactionScheduleId": "1",
-            "OrderedUOMCode": "zzu",
-            "OrderedQuantity": int(qty),
-            "ProductNumber": str(sku),
-            "FOBPoint": "Destination",
-            "FreightTerms": "Add freight",
-            "PaymentTerms": "30 Net",
-            "ShipmentPriority": "High",
-        })
-    # record BU name for inventory prompt derivation
-    payload["BusinessUnit"] = bu_name
+    payload, bu = order_payload.parse_order_from_intake(intake_resp, fallback_txn, st.session_state.intake_bu)
+    st.session_state.intake_bu = bu
     return payload
 
-def build_inventory_prompt(order_json: dict) -> str:
-    lines = order_json.get("lines", []) if isinstance(order_json, dict) else []
-    item_numbers = [str(l.get("ProductNumber")) for l in lines if l.get("ProductNumber")]
-    req_qty = [int(l.get("OrderedQuantity", 0)) for l in lines]
-    bu = (order_json.get("BusinessUnit") or st.session_state.intake_bu or DEFAULT_BUS[0]).strip()
-    if not item_numbers: item_numbers = [DEFAULT_SKUS[0]]
-    if not req_qty: req_qty = [1]
-    return f"Return per-item availability for item_numbers: {item_numbers}, item_required_quantity: {req_qty} and bu: {bu}"
+def inventory_params(order_json: dict) -> dict:
+    """Structured /orders/inventory query (direct tool call, no LLM round trip)."""
+    items, qtys, bu = order_payload.inventory_request(order_json, st.session_state.intake_bu)
+    return {"item_numbers": items, "required_quantities": qtys, "bu": bu}
 
 # ---------------- Tools UI ----------------
 st.subheader("🛠️ Tools")
-st.caption("Wired to: /orders/image, /orders/inventory, /orders/create")
+st.caption("Wired to: /orders/pipeline, or /orders/image, /orders/inventory, /orders/create step by step")
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -199,7 +122,62 @@ def show_payload(title, payload):
     if isinstance(payload, (dict, list)): st.json(payload)
     else: st.code(str(payload)[:5000])
 
-if run:
+# pipeline stage -> diagram node
+PIPELINE_STAGES = {"order_intake_agent": "T1", "inventory_check": "T2", "order_create_agent": "T3", "notify_queued": "T4"}
+
+def iter_sse(response):
+    """(event, data) pairs from a text/event-stream response."""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"): event = line[6:].strip()
+        elif line.startswith("data:"): data.append(line[5:].strip())
+        elif not line and data:
+            yield event, json.loads("\n".join(data))
+            event, data = "message", []
+
+if run and use_pipeline:
+    stream_log(reset=True)
+    stream_log("Streaming intake → inventory → create → email from the server (/stream/orders/pipeline) …")
+    tokens_area = st.empty(); tokens = ""
+    try:
+        files = {"image": (q_image.name, q_image.getvalue(), q_image.type or "image/jpeg")} if q_image else None
+        data = {"question": q_question, "transaction_number": transaction_number,
+                "email_to": email_to, "email_subject": email_subject, "email_note": email_note}
+        with session.post(_url("/stream/orders/pipeline"), files=files, data=data, stream=True,
+                          timeout=timeout, headers={"accept": "text/event-stream"}) as r:
+            if not r.ok:
+                raise RuntimeError(f"HTTP {r.status_code}: {r.text[:500]}")
+            p = None
+            for event, payload in iter_sse(r):
+                t = f"[{payload.get('t_ms', 0):>8.0f} ms]"
+                if event == "stage":
+                    code = PIPELINE_STAGES.get(payload["name"])
+                    stream_log(f"{t} {payload['name']}: {payload['status']}" + (f" ({payload['ms']} ms)" if payload.get("ms") is not None else ""))
+                    if code:
+                        status_map[code] = {"running": STATUS_RUNNING, "succeeded": STATUS_SUCCESS}.get(payload["status"], STATUS_FAIL)
+                        render_graph(status_map)
+                elif event == "tool_start":
+                    stream_log(f"{t}   tool {payload['tool']} …")
+                elif event == "tool_end":
+                    stream_log(f"{t}   tool {payload['tool']} done in {payload['ms']} ms")
+                elif event == "token":
+                    tokens += payload["text"]; tokens_area.code(tokens[-2000:])
+                elif event == "llm_start":
+                    tokens = ""
+                elif event in ("result", "error"):
+                    p = payload
+                    stream_log(f"Pipeline → {event}")
+        if isinstance(p, dict) and "order" in p:
+            st.session_state.order_json = p.get("order") or st.session_state.order_json
+            st.session_state.intake_bu = p.get("business_unit") or st.session_state.intake_bu
+            st.session_state.last_create_result = p.get("create")
+        show_payload("/stream/orders/pipeline result", p)
+    except Exception as e:
+        status_map.update({code: STATUS_FAIL for code, s_ in status_map.items() if s_ == STATUS_RUNNING}); render_graph(status_map)
+        stream_log(f"Pipeline error: {e}")
+    stream_log("Done.")
+
+elif run:
     stream_log(reset=True)
 
     # STEP 1: intake
@@ -229,8 +207,7 @@ if run:
         status_map["T2"] = STATUS_RUNNING; render_graph(status_map)
         stream_log("Step 2/4: Inventory_Check_Agent — checking inventory …")
         try:
-            inv_prompt = build_inventory_prompt(st.session_state.order_json)
-            r2 = GET("/orders/inventory", params={"input_prompt": inv_prompt}, headers={"accept":"application/json"})
+            r2 = GET("/orders/inventory", params=inventory_params(st.session_state.order_json), headers={"accept":"application/json"})
             p2 = r2.json() if r2.headers.get("content-type","").startswith("application/json") else r2.text
             ok2 = r2.ok
             stream_log(f"Step 2 → HTTP {r2.status_code}")
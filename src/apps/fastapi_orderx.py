@@ -1,35 +1,163 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Body
-from fastapi.responses import JSONResponse
-from pathlib import Path
-from typing import Dict
-import shutil
-from src.agents.inventory_check_agent import inventory_check_agent
-from src.agents.order_intake_agent import order_intake_agent
-from src.agents.order_create_agent import order_create_agent
-import traceback, json, os
-
-app = FastAPI()
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Body, Request, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, List, Literal, Tuple
+from src.agents.inventory_check_agent import inventory_check_agent, get_inventory_check_agent
+from src.agents.order_intake_agent import order_intake_agent, get_order_intake_agent
+from src.agents.order_create_agent import order_create_agent, get_order_create_agent
+from src.llm.registry import get_registry, get_vision_llm, get_structured_llm
+from src.llm.llm_cache import bypass_llm_cache, cache_bypassed, get_llm_cache
+from src.llm.cassette import get_cassette
+from src.llm.rate_limit import limiter_stats
+from src.data.sales_order import Transaction
+from src.tools.aidp_jdbc_pool import get_jdbc_pool, shutdown_jdbc_pool
+from src.tools.aidp_fdi_inventory_check_tools import (
+    inventory_metrics, aidp_fdi_inventory_check_impl, aidp_fdi_inventory_check_bulk_impl,
+)
+from src.tools.email_tool import send_email_dummy_impl
+from src.tools.order_create_tools import create_order_impl
+from src.utils.order_payload import parse_orders_from_intake, inventory_request
+from src.utils.document_pages import DocumentError, UnsupportedDocumentError, check_document
+from src.tools.inventory_snapshot import get_inventory_snapshot
+from src.tools.inventory_ledger import get_allocation_ledger
+from src.tools.extraction_cache import get_extraction_cache
+from src.utils.image_preprocess import preprocess_stats
+from src.utils.intake_normalizer import normalizer_stats
+from src.apps.agent_executor import AgentExecutor, AgentOverloadedError
+from src.apps.jobs import Job, JobManager, JobQueueFullError
+from src.apps.agent_events import AgentEventStream, sse
+from wayflowcore.events.eventlistener import register_event_listeners
+from src.common.idempotency import IdempotentCalls, IdempotencyConflictError, payload_fingerprint
+from src.common.blobs import get_blob_store, sha256_hex
+from src.common.config import (
+    UPLOAD_MAX_BYTES, UPLOAD_DEDUP_TTL, UPLOAD_DEDUP_MAX_ITEMS, IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_ITEMS, INVENTORY_SNAPSHOT_ENABLED, AGENT_CONCURRENCY_IMAGE, AGENT_CONCURRENCY_INVENTORY, AGENT_CONCURRENCY_CREATE,
+    AGENT_CONCURRENCY_PIPELINE,
+)
+from contextlib import asynccontextmanager, nullcontext
+from pydantic import BaseModel
+import traceback, json, os, uuid, asyncio
+
+
+# blocking agent calls run here, never on the event loop
+agent_executor = AgentExecutor()
+agent_executor.limiter("image", AGENT_CONCURRENCY_IMAGE)
+agent_executor.limiter("inventory", AGENT_CONCURRENCY_INVENTORY)
+agent_executor.limiter("create", AGENT_CONCURRENCY_CREATE)
+agent_executor.limiter("pipeline", AGENT_CONCURRENCY_PIPELINE)
+
+# background jobs for the same work (POST /jobs/..., GET /jobs/{id})
+job_manager = JobManager()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # spawn + warm the JDBC workers before the first inventory request
+    get_jdbc_pool()
+    # LLM clients and agent templates, built once instead of per request
+    get_registry().warm([
+        get_order_intake_agent, get_inventory_check_agent, get_order_create_agent,
+        get_vision_llm, lambda: get_structured_llm(Transaction),
+    ])
+    if INVENTORY_SNAPSHOT_ENABLED:
+        get_inventory_snapshot().start()
+    yield
+    if INVENTORY_SNAPSHOT_ENABLED:
+        get_inventory_snapshot().stop()
+    shutdown_jdbc_pool()
+    agent_executor.shutdown()
+    job_manager.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def llm_cache_control(request: Request, call_next):
+    """
+    Cache-Control: no-cache makes this request skip stored answers: the LLM cache
+    (src/llm/llm_cache.py), the image extraction cache and the intake dedup.
+    """
+    if "no-cache" not in request.headers.get("cache-control", "").lower():
+        return await call_next(request)
+    with bypass_llm_cache():
+        return await call_next(request)
+
+
+@app.exception_handler(IdempotencyConflictError)
+async def idempotency_conflict(request: Request, exc: IdempotencyConflictError):
+    return JSONResponse(status_code=422, content={"error": str(exc)})
+
+
+@app.exception_handler(AgentOverloadedError)
+async def agent_overloaded(request: Request, exc: AgentOverloadedError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def _read_upload(image: UploadFile) -> bytes:
+    """
+    Upload bytes, read in chunks so an oversized file is refused without buffering all of it.
+    A document the vision tool could not split into pages is refused here (415 / 422).
+    """
+    chunks, size = [], 0
+    while chunk := await image.read(1024 * 1024):
+        size += len(chunk)
+        if size > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"upload larger than {UPLOAD_MAX_BYTES} bytes")
+        chunks.append(chunk)
+    data = b"".join(chunks)
+    try:
+        check_document(data)
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except DocumentError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return data
+
+
+def _stages(job: Job = None):
+    return job.stage if job is not None else (lambda name: nullcontext())
+
+
+# intake responses by (image SHA-256, question): a re-sent image is answered without an LLM call.
+# Only answers holding an order are kept (as in the extraction cache); anything else is retried.
+_intake_dedup = IdempotentCalls(
+    maxsize=UPLOAD_DEDUP_MAX_ITEMS, ttl=UPLOAD_DEDUP_TTL,
+    cacheable=lambda response: bool(parse_orders_from_intake(response, "dedup")),
+)
+
+
+def _intake_order(data: bytes, question: str, job: Job = None) -> Tuple[str, bool, str]:
+    """
+    Run order_intake_agent on an in-memory image (passed to the vision tool as mem://<sha256>).
+    Returns (response, duplicate, sha256); duplicate is True when an earlier or concurrent
+    request with the same image and question produced the response.
+    """
+    stage = _stages(job)
+    digest = sha256_hex(data)
+
+    def intake() -> str:
+        with get_blob_store().hold(data, digest) as ref, stage("order_intake_agent"):
+            return order_intake_agent(f"{ref}   \n{question}")
+
+    response, duplicate = _intake_dedup.run((digest, question), intake, refresh=cache_bypassed())
+    return response, duplicate, digest
+
 
 @app.post("/orders/image")
 async def ask_agent_from_image(
     image: UploadFile = File(...),
     question: str = Form(...)
 ):
+    data = await _read_upload(image)
     try:
-        # Save image locally
-        temp_path = Path("/tmp") / image.filename
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-
-
-        # Build the prompt
-        input_prompt = f"{str(temp_path)}   \n{question}"
-        response = order_intake_agent(input_prompt)
+        response, duplicate, digest = await agent_executor.run("image", _intake_order, data, question)
         print(response)
+        return JSONResponse(content={"final_answer": response, "sha256": digest, "duplicate": duplicate})
 
-    
-        return JSONResponse(content={"final_answer": response})
-
+    except AgentOverloadedError:
+        raise
     except Exception as e:
         # Print the full stack trace to stdout/logs
         traceback.print_exc()
@@ -43,13 +171,52 @@ async def ask_agent_from_image(
         )
 
 
+def _validate_inventory_input(input_prompt: str | None, item_numbers: List[str] | None,
+                              required_quantities: List[int] | None, bu: str | None) -> None:
+    if item_numbers:
+        if not bu or len(required_quantities or []) != len(item_numbers):
+            raise HTTPException(status_code=422,
+                                detail="item_numbers needs bu and one required_quantities value per item")
+    elif not input_prompt:
+        raise HTTPException(status_code=422, detail="give input_prompt, or item_numbers + required_quantities + bu")
+
+
+def _check_inventory(input_prompt: str | None, item_numbers: List[str] | None = None,
+                     required_quantities: List[int] | None = None, bu: str | None = None,
+                     job: Job = None) -> Tuple[str, str]:
+    """
+    (response, mode). Structured input calls the inventory check directly ("direct", no LLM);
+    a free-text prompt goes through inventory_check_agent ("agent").
+    """
+    stage = _stages(job)
+    if item_numbers:
+        with stage("inventory_check"):
+            return aidp_fdi_inventory_check_impl(item_numbers, required_quantities, bu), "direct"
+    with stage("inventory_check_agent"):
+        return inventory_check_agent(input_prompt), "agent"
+
+
 @app.get("/orders/inventory")
-async def check_inventory(input_prompt: str):
+async def check_inventory(
+    input_prompt: str | None = None,
+    item_numbers: List[str] | None = Query(None),
+    required_quantities: List[int] | None = Query(None),
+    bu: str | None = None,
+):
+    """
+    Free-text input_prompt -> inventory_check_agent.
+    Structured input (?item_numbers=..&required_quantities=..&bu=..) skips the LLM and returns
+    the inventory check's JSON as final_answer.
+    """
+    _validate_inventory_input(input_prompt, item_numbers, required_quantities, bu)
     try:
-        response = inventory_check_agent(input_prompt)
+        response, mode = await agent_executor.run(
+            "inventory", _check_inventory, input_prompt, item_numbers, required_quantities, bu)
         print(response)
 
-        return JSONResponse(content={"final_answer": response})
+        return JSONResponse(content={"final_answer": response, "mode": mode})
+    except AgentOverloadedError:
+        raise
     except Exception as e:
         # Print the full stack trace to stdout/logs
         traceback.print_exc()
@@ -62,22 +229,176 @@ async def check_inventory(input_prompt: str):
             }
         )
 
-@app.post("/orders/create")
-async def create_sales_order(payload: Dict = Body(...)):
+class InventoryLine(BaseModel):
+    bu: str
+    item_number: str
+    required_quantity: int
+    order_id: str | None = None
+
+
+class BulkInventoryRequest(BaseModel):
+    lines: List[InventoryLine]
+
+
+@app.post("/orders/inventory/bulk")
+def check_inventory_bulk(payload: BulkInventoryRequest):
+    """
+    Check (bu, item_number, required_quantity) lines across business units and orders
+    with one AIDP query; no LLM round trip. Results are grouped per BU and per order.
+    """
+    try:
+        result = aidp_fdi_inventory_check_bulk_impl([line.model_dump() for line in payload.lines])
+        if result.startswith("Error:"):
+            return JSONResponse(status_code=400, content={"error": result})
+        body = json.loads(result)
+        return JSONResponse(status_code=504 if body.get("error") == "timeout" else 200, content=body)
+    except Exception as e:
+        # Print the full stack trace to stdout/logs
+        traceback.print_exc()
+
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+        )
+
+@app.get("/health/jdbc-pool")
+async def jdbc_pool_health():
+    return JSONResponse(content=get_jdbc_pool().stats())
+
+@app.get("/metrics/agents")
+async def agent_metrics():
+    return JSONResponse(content={
+        **agent_executor.stats(),
+        "create_idempotency": _create_idempotency.stats(),
+        "intake_dedup": _intake_dedup.stats(),
+        "uploads_in_memory": get_blob_store().stats(),
+        "registry": get_registry().stats(),
+    })
+
+@app.get("/metrics/inventory")
+async def inventory_path_metrics():
+    return JSONResponse(content=inventory_metrics())
+
+def _reservation_lines(payload: Dict) -> Dict:
+    """{(business_unit, item_number): qty} from a create payload ("BusinessUnit" + lines[].ProductNumber/OrderedQuantity)."""
+    bu = payload.get("BusinessUnit") or (payload.get("BillToCustomer") or {}).get("BusinessUnit")
+    lines = {}
+    if not bu:
+        return lines
+    for line in payload.get("lines") or []:
+        item, qty = line.get("ProductNumber"), line.get("OrderedQuantity")
+        if item and qty:
+            lines[(bu, str(item))] = lines.get((bu, str(item)), 0) + int(qty)
+    return lines
+
+
+def _create_failed(response) -> bool:
+    text = str(response)
+    return "API call failed" in text or text.startswith("Error") or text.startswith("Invalid execution status")
+
+
+# create responses by Idempotency-Key / SourceTransactionNumber; failed creates are not replayed
+_create_idempotency = IdempotentCalls(
+    maxsize=IDEMPOTENCY_MAX_ITEMS, ttl=IDEMPOTENCY_TTL, cacheable=lambda response: not _create_failed(response)
+)
+
+
+CreateMode = Literal["auto", "agent", "direct"]
+
+
+def _create_direct(payload: Dict, mode: CreateMode) -> bool:
+    """
+    "direct" posts the payload to Fusion without the agent; "auto" does so for create-order payloads
+    (with lines). "direct" with a payload that has no lines is a 422: there is no order to post.
     """
-    Create an order using the OCI AI agent and a structured JSON payload.
+    has_lines = isinstance(payload, dict) and bool(payload.get("lines"))
+    if mode == "direct" and not has_lines:
+        raise HTTPException(status_code=422, detail="mode=direct needs a create-order payload with lines")
+    return mode == "direct" or (mode == "auto" and has_lines)
+
+
+def _create_key(payload: Dict, idempotency_key: str = None) -> Tuple[str | None, str]:
+    """(idempotency key, payload fingerprint): a key replays only for the payload it was first used with."""
+    txn = payload.get("SourceTransactionNumber")
+    key = f"key:{idempotency_key}" if idempotency_key else (f"txn:{txn}" if txn else None)
+    return key, payload_fingerprint(payload)
+
+
+def _create_order(payload: Dict, job: Job = None, idempotency_key: str = None, direct: bool = False) -> Tuple[str, bool]:
     """
+    Idempotent create: keyed by the Idempotency-Key header, else by SourceTransactionNumber.
+    Duplicates arriving while the first create runs wait for its response; later ones get the
+    stored response. Returns (response, replayed). A key sent again with a different payload
+    raises IdempotencyConflictError (422).
+    """
+    key, fingerprint = _create_key(payload, idempotency_key)
+    return _create_idempotency.run(key, lambda: _create_order_once(payload, job, direct), fingerprint=fingerprint)
+
+
+def _create_order_once(payload: Dict, job: Job = None, direct: bool = False) -> str:
+    """
+    Run order_create_agent for the payload (or, with direct, create_order_impl without the LLM).
+    The order's quantities are held in the allocation ledger while Fusion is called (or the hold
+    taken by an inventory check with reservation_id=SourceTransactionNumber is reused), then
+    committed on success and released on failure.
+    """
+    stage = _stages(job)
+    ledger = get_allocation_ledger()
+    reservation_id = payload.get("SourceTransactionNumber")
+    with stage("reserve"):
+        if reservation_id:
+            lines = _reservation_lines(payload)
+            if lines and ledger.get(reservation_id) is None:
+                ledger.reserve(reservation_id, lines)
     try:
+        if direct:
+            with stage("create_order"):
+                response = create_order_impl(payload)
+            print(response)
+            return _settle_reservation(reservation_id, response)
+
         # Convert the Python dict to a properly escaped JSON string
         payload_json = json.dumps(payload)
 
         # Construct a human-readable prompt with embedded JSON
         input_prompt = f"Create a sales order using a properly structured JSON payload:\n{payload_json}"
 
-        response = order_create_agent(input_prompt)
+        with stage("order_create_agent"):
+            response = order_create_agent(input_prompt)
         print(response)
+    except BaseException:
+        if reservation_id:
+            ledger.release(reservation_id)
+        raise
 
-        return JSONResponse(content={"final_answer": response})
+    return _settle_reservation(reservation_id, response)
+
+
+def _settle_reservation(reservation_id: str | None, response: str) -> str:
+    if reservation_id:
+        ledger = get_allocation_ledger()
+        (ledger.release if _create_failed(response) else ledger.commit)(reservation_id)
+    return response
+
+
+@app.post("/orders/create")
+async def create_sales_order(payload: Dict = Body(...), idempotency_key: str | None = Header(None),
+                             mode: CreateMode = "auto"):
+    """
+    Create an order from a structured JSON payload. A create-order payload (with lines) is posted
+    to Fusion directly; anything else, or mode=agent, goes through the OCI AI agent.
+    Retries with the same Idempotency-Key (or SourceTransactionNumber) replay the first response.
+    """
+    direct = _create_direct(payload, mode)
+    try:
+        response, replayed = await agent_executor.run("create", _create_order, payload, None, idempotency_key, direct)
+        return JSONResponse(content={"final_answer": response, "mode": "direct" if direct else "agent"},
+                            headers={"Idempotent-Replayed": "true" if replayed else "false"})
+    except (AgentOverloadedError, IdempotencyConflictError):
+        raise
     except Exception as e:
         # Print the full stack trace to stdout/logs
         traceback.print_exc()
@@ -124,12 +445,330 @@ async def email_sales_order(payload: SalesEmailRequest):
             f"body: {body}"
         )
 
-        response = order_create_agent(input_prompt)
+        response = await agent_executor.run("create", order_create_agent, input_prompt)
         return JSONResponse(content={"final_answer": response})
 
+    except AgentOverloadedError:
+        raise
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e), "traceback": traceback.format_exc()},
+        )
+
+
+# ---------- end-to-end pipeline (intake -> inventory -> create -> notify) ----------
+def _notify_job(job: Job, to: str, subject: str, body: str) -> Dict:
+    with job.stage("send_email"):
+        return json.loads(send_email_dummy_impl([to], subject, body))
+
+
+def _pipeline_order(job: Job, order: Dict, bu: str, transaction_number: str, stop_if_unavailable: bool) -> Dict:
+    """Inventory check (with a hold for the order) and direct create for one order of the document."""
+    item_numbers, required, bu = inventory_request(order, bu)
+    with job.stage("inventory_check"):
+        inventory = aidp_fdi_inventory_check_impl(item_numbers, required, bu, reservation_id=transaction_number)
+    try:
+        inventory = json.loads(inventory)
+    except ValueError:
+        pass  # "Error: ..." string
+    all_available = isinstance(inventory, list) and all(line["is_available"] == "Yes" for line in inventory)
+
+    result = {
+        "transaction_number": transaction_number,
+        "business_unit": bu,
+        "order": order,
+        "inventory": inventory,
+        "all_available": all_available,
+    }
+    if stop_if_unavailable and not all_available:
+        get_allocation_ledger().release(transaction_number)
+        result["status"] = "inventory_unavailable"
+        return result
+
+    create, replayed = _create_order(order, job, direct=True)  # already a create-order payload: no agent
+    result["create"] = create
+    result["create_replayed"] = replayed
+    result["status"] = "failed" if _create_failed(create) else "created"
+    return result
+
+
+def _run_pipeline(job: Job, data: bytes, question: str, transaction_number: str,
+                  email_to: str, email_subject: str | None, email_note: str | None,
+                  stop_if_unavailable: bool = False) -> Dict:
+    """
+    The four steps of the Streamlit flow in one process: stages hand Python objects to each
+    other, inventory is checked (and held for the order) with a direct tool call, and the
+    email goes out as a separate background job so it is not on the critical path.
+
+    A document with several orders creates each of them (transaction_number-1, -2, ...); the
+    per-order results are under "orders". A document without any readable item is a 422.
+    """
+    intake, duplicate, digest = _intake_order(data, question, job)
+    with job.stage("parse_order"):
+        orders = parse_orders_from_intake(intake, transaction_number)
+    if not orders:
+        raise HTTPException(status_code=422, detail=f"no order items found in the document: {str(intake)[:500]}")
+
+    per_order = [_pipeline_order(job, order, bu, order["SourceTransactionNumber"], stop_if_unavailable)
+                 for order, bu in orders]
+    result = {
+        "transaction_number": transaction_number,
+        "image_sha256": digest,
+        "intake_duplicate": duplicate,
+        "intake": intake,
+    }
+    if len(per_order) == 1:
+        result.update(per_order[0])
+    else:
+        statuses = {r["status"] for r in per_order}
+        result["orders"] = per_order
+        result["all_available"] = all(r["all_available"] for r in per_order)
+        result["status"] = statuses.pop() if len(statuses) == 1 else "partial"
+    if result["status"] == "inventory_unavailable":
+        return result
+
+    subject = email_subject or f"Sales Order Status for orderid: {transaction_number}"
+    create = "\n\n".join(str(r["create"]) for r in per_order if "create" in r)
+    body = f"{email_note}\n\n{create}" if email_note else create
+    try:
+        with job.stage("notify_queued"):
+            notify = job_manager.submit("orders/notify", _notify_job, email_to, subject, body)
+    except JobQueueFullError as e:
+        # the orders are already created: report them, a retry would create them again
+        result["notify"] = {"status": "not_queued", "error": str(e)}
+        return result
+    result["notify"] = {"job_id": notify.id, "status_url": f"/jobs/{notify.id}"}
+    return result
+
+
+def _pipeline_args(data: bytes, question: str, transaction_number: str | None,
+                   email_to: str, email_subject: str | None, email_note: str | None, stop_if_unavailable: bool) -> tuple:
+    txn = transaction_number or f"OPS_{uuid.uuid4().hex[:12]}"
+    return data, question, txn, email_to, email_subject, email_note, stop_if_unavailable
+
+
+@app.post("/orders/pipeline")
+async def order_pipeline(
+    image: UploadFile = File(...),
+    question: str = Form("Get all information about the order"),
+    transaction_number: str | None = Form(None),
+    email_to: str = Form("ops@example.com"),
+    email_subject: str | None = Form(None),
+    email_note: str | None = Form(None),
+    stop_if_unavailable: bool = Form(False),
+):
+    """
+    Intake -> inventory -> create -> notify in one request (replaces the four client round trips).
+    The notification is sent in the background; its job id is returned under "notify".
+    """
+    args = _pipeline_args(await _read_upload(image), question, transaction_number,
+                          email_to, email_subject, email_note, stop_if_unavailable)
+    try:
+        job = Job(id=uuid.uuid4().hex, kind="orders/pipeline")
+        result = await agent_executor.run("pipeline", _run_pipeline, job, *args)
+        result["stages"] = job.to_dict()["stages"]
+        return JSONResponse(content=result)
+    except (AgentOverloadedError, HTTPException):
+        raise
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "traceback": traceback.format_exc()},
-        )
\ No newline at end of file
+        )
+
+
+# ---------- async jobs ----------
+def _image_job(job: Job, data: bytes, question: str) -> Dict:
+    response, duplicate, digest = _intake_order(data, question, job)
+    return {"final_answer": response, "sha256": digest, "duplicate": duplicate}
+
+
+def _inventory_job(job: Job, input_prompt: str | None, item_numbers: List[str] | None = None,
+                   required_quantities: List[int] | None = None, bu: str | None = None) -> Dict:
+    response, mode = _check_inventory(input_prompt, item_numbers, required_quantities, bu, job)
+    return {"final_answer": response, "mode": mode}
+
+
+def _create_job(job: Job, payload: Dict, idempotency_key: str = None, direct: bool = False) -> Dict:
+    response, replayed = _create_order(payload, job, idempotency_key, direct)
+    return {"final_answer": response, "replayed": replayed, "mode": "direct" if direct else "agent"}
+
+
+def _accepted(job: Job) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"},
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+def _submit(endpoint: str, kind: str, fn, *args) -> JSONResponse:
+    """Queue fn(job, *args) as a job; it runs under the `endpoint` limiter like the synchronous call."""
+    loop = asyncio.get_running_loop()
+
+    def limited(job: Job, *args):
+        return agent_executor.run_from_thread(loop, endpoint, fn, job, *args)
+
+    try:
+        return _accepted(job_manager.submit(kind, limited, *args))
+    except JobQueueFullError as e:
+        raise AgentOverloadedError(str(e), 429)
+
+
+@app.post("/jobs/orders/image")
+async def submit_image_job(
+    image: UploadFile = File(...),
+    question: str = Form(...)
+):
+    """Same as /orders/image, but returns a job id at once; poll GET /jobs/{job_id}."""
+    return _submit("image", "orders/image", _image_job, await _read_upload(image), question)
+
+
+@app.post("/jobs/orders/inventory")
+async def submit_inventory_job(
+    input_prompt: str | None = None,
+    item_numbers: List[str] | None = Query(None),
+    required_quantities: List[int] | None = Query(None),
+    bu: str | None = None,
+):
+    """Same as /orders/inventory, but returns a job id at once; poll GET /jobs/{job_id}."""
+    _validate_inventory_input(input_prompt, item_numbers, required_quantities, bu)
+    return _submit("inventory", "orders/inventory", _inventory_job, input_prompt, item_numbers, required_quantities, bu)
+
+
+@app.post("/jobs/orders/create")
+async def submit_create_job(payload: Dict = Body(...), idempotency_key: str | None = Header(None),
+                            mode: CreateMode = "auto"):
+    """Same as /orders/create, but returns a job id at once; poll GET /jobs/{job_id}."""
+    _create_idempotency.check(*_create_key(payload, idempotency_key))
+    return _submit("create", "orders/create", _create_job, payload, idempotency_key, _create_direct(payload, mode))
+
+
+@app.post("/jobs/orders/pipeline")
+async def submit_pipeline_job(
+    image: UploadFile = File(...),
+    question: str = Form("Get all information about the order"),
+    transaction_number: str | None = Form(None),
+    email_to: str = Form("ops@example.com"),
+    email_subject: str | None = Form(None),
+    email_note: str | None = Form(None),
+    stop_if_unavailable: bool = Form(False),
+):
+    """Same as /orders/pipeline, but returns a job id at once; poll GET /jobs/{job_id}."""
+    args = _pipeline_args(await _read_upload(image), question, transaction_number,
+                          email_to, email_subject, email_note, stop_if_unavailable)
+    return _submit("pipeline", "orders/pipeline", _run_pipeline, *args)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return JSONResponse(content=job.to_dict())
+
+
+@app.get("/metrics/extraction")
+async def extraction_metrics():
+    return JSONResponse(content={**get_extraction_cache().stats(), "preprocess": preprocess_stats(),
+                                 "normalizer": normalizer_stats(), "llm_cache": get_llm_cache().stats(),
+                                 "llm_cassette": get_cassette().stats()})
+
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """Per-model OCI GenAI limiter: queueing, AIMD window, retries and recent throttles."""
+    return JSONResponse(content=limiter_stats())
+
+
+@app.get("/metrics/jobs")
+async def job_metrics():
+    return JSONResponse(content=job_manager.stats())
+
+
+# ---------- SSE streaming ----------
+def _streaming(endpoint: str, kind: str, fn, *args) -> StreamingResponse:
+    """
+    Run fn(job, *args) like the job API does, but stream its progress as Server-Sent Events:
+    an "accepted" frame right away, agent/LLM/tool/stage frames as they happen, then
+    "result" (or "error") with the final payload.
+    """
+    agent_executor.limiters[endpoint].check()  # 429 before the 200 stream starts
+
+    async def frames():
+        stream = AgentEventStream(asyncio.get_running_loop())
+        job = Job(id=uuid.uuid4().hex, kind=kind, on_stage=stream.on_stage)
+        yield sse("accepted", {"job_id": job.id, "kind": kind, "t_ms": 0.0})
+
+        def work():
+            # wayflowcore listeners are context-local: register them in the executor thread
+            with register_event_listeners([stream]):
+                return fn(job, *args)
+
+        task = asyncio.create_task(agent_executor.run(endpoint, work))
+        task.add_done_callback(lambda _: stream.close())
+        async for frame in stream.frames():
+            yield frame
+        try:
+            result = task.result()
+            yield sse("result", {**result, "stages": job.to_dict()["stages"]})
+        except AgentOverloadedError as e:
+            yield sse("error", {"error": str(e), "status_code": e.status_code, "retry_after": e.retry_after})
+        except HTTPException as e:  # e.g. the 422 for a document without items, as the JSON endpoint answers
+            yield sse("error", {"error": e.detail, "status_code": e.status_code, "stages": job.to_dict()["stages"]})
+        except IdempotencyConflictError as e:
+            yield sse("error", {"error": str(e), "status_code": 422})
+        except Exception as e:
+            traceback.print_exc()
+            yield sse("error", {"error": str(e), "status_code": 500, "stages": job.to_dict()["stages"]})
+
+    return StreamingResponse(frames(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/stream/orders/image")
+async def stream_image(
+    image: UploadFile = File(...),
+    question: str = Form(...)
+):
+    """/orders/image as Server-Sent Events."""
+    return _streaming("image", "orders/image", _image_job, await _read_upload(image), question)
+
+
+@app.get("/stream/orders/inventory")
+async def stream_inventory(
+    input_prompt: str | None = None,
+    item_numbers: List[str] | None = Query(None),
+    required_quantities: List[int] | None = Query(None),
+    bu: str | None = None,
+):
+    """/orders/inventory as Server-Sent Events."""
+    _validate_inventory_input(input_prompt, item_numbers, required_quantities, bu)
+    return _streaming("inventory", "orders/inventory", _inventory_job, input_prompt, item_numbers, required_quantities, bu)
+
+
+@app.post("/stream/orders/create")
+async def stream_create(payload: Dict = Body(...), idempotency_key: str | None = Header(None),
+                        mode: CreateMode = "auto"):
+    """/orders/create as Server-Sent Events."""
+    _create_idempotency.check(*_create_key(payload, idempotency_key))
+    return _streaming("create", "orders/create", _create_job, payload, idempotency_key, _create_direct(payload, mode))
+
+
+@app.post("/stream/orders/pipeline")
+async def stream_pipeline(
+    image: UploadFile = File(...),
+    question: str = Form("Get all information about the order"),
+    transaction_number: str | None = Form(None),
+    email_to: str = Form("ops@example.com"),
+    email_subject: str | None = Form(None),
+    email_note: str | None = Form(None),
+    stop_if_unavailable: bool = Form(False),
+):
+    """/orders/pipeline as Server-Sent Events."""
+    args = _pipeline_args(await _read_upload(image), question, transaction_number,
+                          email_to, email_subject, email_note, stop_if_unavailable)
+    return _streaming("pipeline", "orders/pipeline", _run_pipeline, *args)
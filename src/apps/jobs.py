@@ -0,0 +1,147 @@
+# src/apps/jobs.py
+"""
+Asynchronous jobs for the long order endpoints.
+
+POST /jobs/... submits the work to a local worker pool and returns a job id at
+once; GET /jobs/{id} polls status, per-stage timings and the result. Queued and
+running jobs are always retrievable; finished jobs move to a bounded TTLCache
+and are kept for JOB_RESULT_TTL seconds (or until JOB_STORE_MAX_ITEMS newer
+jobs push them out).
+"""
+import time
+import uuid
+import threading
+import contextvars
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.common.cache import TTLCache
+from src.common.config import JOB_WORKERS, JOB_MAX_PENDING, JOB_RESULT_TTL, JOB_STORE_MAX_ITEMS
+
+
+class JobQueueFullError(RuntimeError):
+    """More than JOB_MAX_PENDING jobs are waiting for a worker."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "queued"                  # queued -> running -> succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    on_stage: Optional[Callable[[str, str, Optional[float]], None]] = None  # (name, status, ms) for live progress
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one step of the job: `with job.stage("agent"): ...`."""
+        started = time.perf_counter()
+        entry = {"name": name, "status": "running", "ms": None}
+        self.stages.append(entry)
+        if self.on_stage is not None:
+            self.on_stage(name, "running", None)
+        try:
+            yield
+            entry["status"] = "succeeded"
+        except BaseException:
+            entry["status"] = "failed"
+            raise
+        finally:
+            entry["ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if self.on_stage is not None:
+                self.on_stage(name, entry["status"], entry["ms"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_ms": round((self.started_at - self.created_at) * 1000, 1) if self.started_at else None,
+            "total_ms": round((self.finished_at - self.created_at) * 1000, 1) if self.finished_at else None,
+            "stages": [dict(s) for s in self.stages],
+        }
+        if self.status == "succeeded":
+            out["result"] = self.result
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class JobManager:
+    """
+    - workers:     threads running jobs
+    - max_pending: queued (not yet running) jobs before submit() raises JobQueueFullError
+    - ttl:         seconds a finished job stays retrievable
+    - max_items:   bound on retained finished jobs (LRU)
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING,
+                 ttl: float = JOB_RESULT_TTL, max_items: int = JOB_STORE_MAX_ITEMS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._store = TTLCache(maxsize=max_items, ttl=ttl)  # finished jobs
+        self._active: Dict[str, Job] = {}                   # queued / running jobs, never evicted
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queue fn(job, *args, **kwargs); its return value becomes the job result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise JobQueueFullError(f"{self._pending} jobs already queued")
+            self._pending += 1
+            self._stats["submitted"] += 1
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            self._active[job.id] = job
+        # run under the submitter's contextvars (e.g. an LLM cache bypass), like asyncio tasks do
+        self._executor.submit(contextvars.copy_context().run, self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        job.status, job.started_at = "running", time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "succeeded"
+        except Exception as e:
+            traceback.print_exc()
+            job.error, job.status = str(e), "failed"
+        finally:
+            job.finished_at = time.time()
+            self._store.set(job.id, job)
+            with self._lock:
+                self._running -= 1
+                self._stats[job.status] += 1
+                del self._active[job.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._active.get(job_id)
+        return job if job is not None else self._store.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats, pending=self._pending, running=self._running)
+        s.update(workers=self.workers, max_pending=self.max_pending, retained=len(self._store), ttl=self.ttl)
+        return s
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,71 @@
+# src/common/blobs.py
+"""
+In-memory blobs addressed by content.
+
+Uploaded images are not written to disk: the endpoint holds the bytes here
+and hands the agent a mem://<sha256> reference instead of a file path; the
+vision tool resolves the reference back to bytes. A blob lives while at
+least one request holds it, so identical concurrent uploads share one copy
+and nothing collides on a client-supplied file name.
+"""
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+SCHEME = "mem://"
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    def __init__(self):
+        self._blobs: Dict[str, Tuple[bytes, int]] = {}   # digest -> (data, holders)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, data: bytes, digest: Optional[str] = None) -> Iterator[str]:
+        """`with store.hold(data) as ref:` -> "mem://<sha256>" valid inside the block."""
+        digest = digest or sha256_hex(data)
+        with self._lock:
+            _, holders = self._blobs.get(digest, (data, 0))
+            self._blobs[digest] = (data, holders + 1)
+        try:
+            yield SCHEME + digest
+        finally:
+            with self._lock:
+                data, holders = self._blobs[digest]
+                if holders > 1:
+                    self._blobs[digest] = (data, holders - 1)
+                else:
+                    del self._blobs[digest]
+
+    def get(self, ref: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._blobs.get(ref[len(SCHEME):].strip().rstrip("/"))
+        return None if entry is None else entry[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"blobs": len(self._blobs), "bytes": sum(len(d) for d, _ in self._blobs.values())}
+
+
+_store = BlobStore()
+
+
+def get_blob_store() -> BlobStore:
+    return _store
+
+
+def read_bytes(path_or_ref: str) -> bytes:
+    """Bytes of a mem:// reference or of a file on disk (CLI / tests)."""
+    path_or_ref = path_or_ref.strip()
+    if path_or_ref.startswith(SCHEME):
+        data = _store.get(path_or_ref)
+        if data is None:
+            raise FileNotFoundError(f"{path_or_ref} is no longer held in memory")
+        return data
+    with open(path_or_ref, "rb") as f:
+        return f.read()
@@ -17,6 +17,139 @@ OCI_CONFIG_FILE       	= os.getenv("OCI_CONFIG_FILE")
 JDBC_DRIVER_CLASS_NAME  = os.getenv("JDBC_DRIVER_CLASS_NAME")
 JDBC_URL       			= os.getenv("JDBC_URL")
 
+#────────────────────────────────────────────────────────
+# Inventory backend: "jdbc" (AIDP/FDI) or "sqlite" (local stand-in for load tests)
+# ───────────────────────────────────────────────────────
+INVENTORY_BACKEND           = os.getenv("INVENTORY_BACKEND", "jdbc")
+INVENTORY_SQLITE_PATH       = os.getenv("INVENTORY_SQLITE_PATH", str(PROJECT_ROOT / "data" / "inventory_fdi.sqlite"))
+
+#────────────────────────────────────────────────────────
+# AIDP JDBC worker pool (warm JVM + connection per worker)
+# ───────────────────────────────────────────────────────
+JDBC_POOL_SIZE              = int(os.getenv("JDBC_POOL_SIZE", "2"))
+JDBC_POOL_MAX_QUERIES       = int(os.getenv("JDBC_POOL_MAX_QUERIES", "500"))        # recycle worker after N queries
+JDBC_POOL_HEALTH_INTERVAL   = float(os.getenv("JDBC_POOL_HEALTH_INTERVAL", "30"))   # seconds between idle health checks
+JDBC_QUERY_TIMEOUT          = float(os.getenv("JDBC_QUERY_TIMEOUT", "60"))          # seconds per inventory query
+JDBC_FETCH_SIZE             = int(os.getenv("JDBC_FETCH_SIZE", "1000"))             # rows per fetchmany chunk
+JDBC_STREAM_MAX_INFLIGHT    = int(os.getenv("JDBC_STREAM_MAX_INFLIGHT", "4"))       # chunks buffered between worker and caller
+JDBC_CANCEL_GRACE           = float(os.getenv("JDBC_CANCEL_GRACE", "5"))            # seconds for a cancel before the worker is killed
+
+#────────────────────────────────────────────────────────
+# Inventory cache, keyed by (business_unit, item_number)
+# ───────────────────────────────────────────────────────
+INVENTORY_CACHE_TTL         = float(os.getenv("INVENTORY_CACHE_TTL", "60"))         # seconds; 0 disables
+INVENTORY_CACHE_MAX_ITEMS   = int(os.getenv("INVENTORY_CACHE_MAX_ITEMS", "10000"))  # LRU bound
+
+#────────────────────────────────────────────────────────
+# Inventory micro-batching (coalesce concurrent lookups per BU)
+# ───────────────────────────────────────────────────────
+INVENTORY_BATCH_WINDOW_MS   = float(os.getenv("INVENTORY_BATCH_WINDOW_MS", "20"))   # 0 disables
+INVENTORY_BATCH_MAX_ITEMS   = int(os.getenv("INVENTORY_BATCH_MAX_ITEMS", "500"))    # flush early at this IN-list size
+
+#────────────────────────────────────────────────────────
+# Local inventory snapshot (optional; live AIDP for stale/missing keys)
+# ───────────────────────────────────────────────────────
+INVENTORY_SNAPSHOT_ENABLED              = os.getenv("INVENTORY_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+INVENTORY_SNAPSHOT_PATH                 = os.getenv("INVENTORY_SNAPSHOT_PATH", str(PROJECT_ROOT / "data" / "inventory_snapshot.sqlite"))
+INVENTORY_SNAPSHOT_REFRESH_INTERVAL     = float(os.getenv("INVENTORY_SNAPSHOT_REFRESH_INTERVAL", "300"))  # seconds
+INVENTORY_SNAPSHOT_MAX_AGE              = float(os.getenv("INVENTORY_SNAPSHOT_MAX_AGE", "900"))           # seconds before stale
+INVENTORY_SNAPSHOT_FULL_REFRESH_EVERY   = int(os.getenv("INVENTORY_SNAPSHOT_FULL_REFRESH_EVERY", "24"))   # every Nth refresh is full
+INVENTORY_SNAPSHOT_REFRESH_TIMEOUT      = float(os.getenv("INVENTORY_SNAPSHOT_REFRESH_TIMEOUT", "600"))   # seconds per refresh query
+
+#────────────────────────────────────────────────────────
+# Soft-allocation ledger (reservations for in-flight orders)
+# ───────────────────────────────────────────────────────
+INVENTORY_RESERVATION_TTL           = float(os.getenv("INVENTORY_RESERVATION_TTL", "300"))          # seconds before an unconfirmed hold is released
+INVENTORY_RESERVATION_COMMIT_HOLD   = float(os.getenv("INVENTORY_RESERVATION_COMMIT_HOLD", "900"))  # keep created orders' qty held until FDI reflects them
+
+#────────────────────────────────────────────────────────
+# Agent execution in the API (sized executor + per-endpoint limits)
+# ───────────────────────────────────────────────────────
+AGENT_EXECUTOR_WORKERS          = int(os.getenv("AGENT_EXECUTOR_WORKERS", "8"))           # threads running blocking agent calls
+AGENT_CONCURRENCY_IMAGE         = int(os.getenv("AGENT_CONCURRENCY_IMAGE", "2"))          # concurrent /orders/image agent runs
+AGENT_CONCURRENCY_INVENTORY     = int(os.getenv("AGENT_CONCURRENCY_INVENTORY", "4"))      # concurrent /orders/inventory agent runs
+AGENT_CONCURRENCY_CREATE        = int(os.getenv("AGENT_CONCURRENCY_CREATE", "2"))         # concurrent /orders/create + /orders/email agent runs
+AGENT_CONCURRENCY_PIPELINE      = int(os.getenv("AGENT_CONCURRENCY_PIPELINE", "2"))       # concurrent /orders/pipeline runs
+AGENT_QUEUE_SIZE                = int(os.getenv("AGENT_QUEUE_SIZE", "16"))                # waiters per endpoint before 429
+AGENT_QUEUE_TIMEOUT             = float(os.getenv("AGENT_QUEUE_TIMEOUT", "30"))           # seconds a request may wait before 503
+AGENT_RETRY_AFTER               = int(os.getenv("AGENT_RETRY_AFTER", "5"))                # Retry-After seconds on 429/503
+
+#────────────────────────────────────────────────────────
+# Async job API (POST /jobs/..., GET /jobs/{id})
+# ───────────────────────────────────────────────────────
+JOB_WORKERS             = int(os.getenv("JOB_WORKERS", "4"))                 # threads running jobs
+JOB_MAX_PENDING         = int(os.getenv("JOB_MAX_PENDING", "64"))            # queued jobs before 429
+JOB_RESULT_TTL          = float(os.getenv("JOB_RESULT_TTL", "3600"))         # seconds a finished job is kept
+JOB_STORE_MAX_ITEMS     = int(os.getenv("JOB_STORE_MAX_ITEMS", "1000"))      # retained jobs (LRU bound)
+
+#────────────────────────────────────────────────────────
+# Idempotent order create (SourceTransactionNumber / Idempotency-Key)
+# ───────────────────────────────────────────────────────
+IDEMPOTENCY_TTL         = float(os.getenv("IDEMPOTENCY_TTL", "86400"))       # seconds a create response is replayed
+IDEMPOTENCY_MAX_ITEMS   = int(os.getenv("IDEMPOTENCY_MAX_ITEMS", "10000"))   # retained responses (LRU bound)
+
+#────────────────────────────────────────────────────────
+# Image uploads (kept in memory, deduplicated by SHA-256)
+# ───────────────────────────────────────────────────────
+UPLOAD_MAX_BYTES        = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))  # larger uploads -> 413
+UPLOAD_DEDUP_TTL        = float(os.getenv("UPLOAD_DEDUP_TTL", "3600"))      # seconds an intake result is reused (0 = off)
+UPLOAD_DEDUP_MAX_ITEMS  = int(os.getenv("UPLOAD_DEDUP_MAX_ITEMS", "1000"))  # retained intake results (LRU bound)
+
+#────────────────────────────────────────────────────────
+# Image extraction cache (vision + structuring result per image/question/model)
+# ───────────────────────────────────────────────────────
+EXTRACTION_CACHE_TTL        = float(os.getenv("EXTRACTION_CACHE_TTL", "604800"))    # seconds; 0 disables
+EXTRACTION_CACHE_MAX_ITEMS  = int(os.getenv("EXTRACTION_CACHE_MAX_ITEMS", "1000"))  # in-memory LRU bound
+EXTRACTION_CACHE_PATH       = os.getenv("EXTRACTION_CACHE_PATH", str(PROJECT_ROOT / "data" / "extraction_cache.sqlite"))  # "" = memory only
+EXTRACTION_CACHE_MAX_ROWS   = int(os.getenv("EXTRACTION_CACHE_MAX_ROWS", "50000"))  # on-disk LRU bound
+
+#────────────────────────────────────────────────────────
+# LLM response cache (exact prompt match; see src/llm/llm_cache.py)
+# ───────────────────────────────────────────────────────
+LLM_CACHE_TTL               = float(os.getenv("LLM_CACHE_TTL", "3600"))         # seconds; 0 disables
+LLM_CACHE_MAX_ITEMS         = int(os.getenv("LLM_CACHE_MAX_ITEMS", "2000"))     # in-memory LRU bound
+LLM_CACHE_PATH              = os.getenv("LLM_CACHE_PATH", str(PROJECT_ROOT / "data" / "llm_cache.sqlite"))  # "" = memory only
+LLM_CACHE_MAX_ROWS          = int(os.getenv("LLM_CACHE_MAX_ROWS", "20000"))     # on-disk LRU bound
+
+#────────────────────────────────────────────────────────
+# LLM record / replay (see src/llm/cassette.py)
+# ───────────────────────────────────────────────────────
+LLM_MODE                    = os.getenv("LLM_MODE", "live").lower()            # live | record | replay
+LLM_CASSETTE_DIR            = os.getenv("LLM_CASSETTE_DIR", str(PROJECT_ROOT / "data" / "cassettes"))
+LLM_REPLAY_LATENCY          = os.getenv("LLM_REPLAY_LATENCY", "recorded")      # recorded | none | fixed:MS | uniform:LO:HI | normal:MEAN:SD | lognormal:MEDIAN:SIGMA
+LLM_REPLAY_LATENCY_SCALE    = float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0"))
+
+#────────────────────────────────────────────────────────
+# OCI GenAI client-side throttling and retry (see src/llm/rate_limit.py)
+# ───────────────────────────────────────────────────────
+LLM_TEXT_RPS                = float(os.getenv("LLM_TEXT_RPS", "10"))          # MODEL_ID calls/s (0 = unlimited)
+LLM_TEXT_BURST              = int(os.getenv("LLM_TEXT_BURST", "20"))
+LLM_TEXT_MAX_CONCURRENCY    = int(os.getenv("LLM_TEXT_MAX_CONCURRENCY", "16"))
+LLM_VISION_RPS              = float(os.getenv("LLM_VISION_RPS", "4"))         # MODEL_ID_VISION calls/s (0 = unlimited)
+LLM_VISION_BURST            = int(os.getenv("LLM_VISION_BURST", "8"))
+LLM_VISION_MAX_CONCURRENCY  = int(os.getenv("LLM_VISION_MAX_CONCURRENCY", "8"))
+LLM_AIMD_MIN_CONCURRENCY    = int(os.getenv("LLM_AIMD_MIN_CONCURRENCY", "1"))  # floor of the adaptive window
+LLM_RETRY_MAX_ATTEMPTS      = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "4"))    # retries after the first call
+LLM_RETRY_BASE_DELAY        = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # seconds, doubled per attempt
+LLM_RETRY_MAX_DELAY         = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))    # seconds, backoff cap
+LLM_QUEUE_TIMEOUT           = float(os.getenv("LLM_QUEUE_TIMEOUT", "60"))      # seconds a call may wait for a slot
+
+#────────────────────────────────────────────────────────
+# Image preprocessing before the vision call (needs Pillow; skipped without it)
+# ───────────────────────────────────────────────────────
+IMAGE_PREPROCESS_ENABLED    = os.getenv("IMAGE_PREPROCESS_ENABLED", "true").lower() in ("1", "true", "yes")
+IMAGE_MAX_EDGE              = int(os.getenv("IMAGE_MAX_EDGE", "1600"))       # px, longest side after downscale
+IMAGE_GRAYSCALE             = os.getenv("IMAGE_GRAYSCALE", "true").lower() in ("1", "true", "yes")
+IMAGE_AUTOCONTRAST          = os.getenv("IMAGE_AUTOCONTRAST", "true").lower() in ("1", "true", "yes")
+IMAGE_JPEG_QUALITY          = int(os.getenv("IMAGE_JPEG_QUALITY", "80"))     # re-encode quality (1-95)
+
+#────────────────────────────────────────────────────────
+# Multi-page documents (PDF needs pypdfium2)
+# ───────────────────────────────────────────────────────
+DOCUMENT_PAGE_CONCURRENCY   = int(os.getenv("DOCUMENT_PAGE_CONCURRENCY", "10"))  # pages extracted at once (process-wide)
+DOCUMENT_MAX_PAGES          = int(os.getenv("DOCUMENT_MAX_PAGES", "20"))         # pages beyond this are ignored
+DOCUMENT_RASTER_DPI         = int(os.getenv("DOCUMENT_RASTER_DPI", "150"))       # PDF rasterization resolution
+
 #────────────────────────────────────────────────────────
 # OCI Security configuration
 # ───────────────────────────────────────────────────────
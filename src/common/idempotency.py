@@ -0,0 +1,120 @@
+# src/common/idempotency.py
+"""
+Idempotent execution keyed by a client-supplied key.
+
+The first call for a key runs; concurrent duplicates wait on its in-flight
+future; completed results are replayed from a bounded TTLCache. Results the
+caller marks as not cacheable (failures) are only shared with the duplicates
+that were already waiting, so a later retry runs again.
+
+A call may pass a fingerprint of its request (e.g. a hash of the payload);
+it is stored with the result, and reusing the key for a request with another
+fingerprint raises IdempotencyConflictError instead of replaying.
+"""
+import json
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.common.cache import TTLCache
+
+
+def payload_fingerprint(payload: Any) -> str:
+    """sha256 of the canonical JSON of a request payload (a JSON string is parsed first)."""
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            pass
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyConflictError(ValueError):
+    """The key was already used for a request with a different fingerprint."""
+
+
+class IdempotentCalls:
+    """
+    - maxsize / ttl: bound and retention of completed results
+    - cacheable:     result -> bool; False keeps the result out of the cache (default: cache everything)
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400.0,
+                 cacheable: Optional[Callable[[Any], bool]] = None):
+        self._done = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[Hashable, Tuple[Future, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._cacheable = cacheable or (lambda result: True)
+        self._stats = {"executed": 0, "replayed": 0, "joined": 0, "conflicts": 0}
+
+    def _check(self, key: Hashable, fingerprint: Optional[str], stored: Optional[str]) -> None:
+        """Caller holds the lock."""
+        if fingerprint is not None and stored is not None and fingerprint != stored:
+            self._stats["conflicts"] += 1
+            raise IdempotencyConflictError(f"idempotency key {key!r} was already used for a different request")
+
+    def check(self, key: Optional[Hashable], fingerprint: Optional[str]) -> None:
+        """Raise IdempotencyConflictError now if run(key, ..., fingerprint) would."""
+        if key is None:
+            return
+        with self._lock:
+            found = self._done.get_many([key])
+            if key in found:
+                self._check(key, fingerprint, found[key][0])
+            elif key in self._inflight:
+                self._check(key, fingerprint, self._inflight[key][1])
+
+    def run(self, key: Optional[Hashable], fn: Callable[[], Any], refresh: bool = False,
+            fingerprint: Optional[str] = None) -> Tuple[Any, bool]:
+        """
+        Return (result, replayed); replayed is True when fn did not run for this call.
+        refresh ignores a completed result (the new one replaces it); in-flight calls are still joined.
+        """
+        if key is None:
+            return fn(), False
+
+        with self._lock:
+            found = {} if refresh else self._done.get_many([key])
+            if key in found:
+                stored, result = found[key]
+                self._check(key, fingerprint, stored)
+                self._stats["replayed"] += 1
+                return result, True
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                future = Future()
+                self._inflight[key] = (future, fingerprint)
+                self._stats["executed"] += 1
+            else:
+                future, stored = inflight
+                self._check(key, fingerprint, stored)
+                self._stats["joined"] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self._cacheable(result):
+                self._done.set(key, (fingerprint, result))
+            del self._inflight[key]
+        future.set_result(result)
+        return result, False
+
+    def forget(self, key: Hashable) -> None:
+        self._done.pop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats, in_flight=len(self._inflight))
+        s["cached"] = len(self._done)
+        return s
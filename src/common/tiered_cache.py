@@ -0,0 +1,138 @@
+# src/common/tiered_cache.py
+"""
+Two-tier string cache: an in-memory TTLCache (LRU, per process) in front of a
+SQLite table (WAL) that survives restarts and is shared by every process on
+the host. Rows expire after the TTL; the least recently used rows are pruned
+past max_rows.
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from src.common.cache import TTLCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    used_at     REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {table}_used_at ON {table} (used_at);
+"""
+
+_PRUNE_EVERY = 100  # writes between LRU prunes of the disk tier
+
+
+class TieredCache:
+    """
+    - path:      SQLite file for the shared disk tier ("" keeps the cache in memory only)
+    - table:     table name inside that file
+    - ttl:       seconds a value stays valid (<= 0 disables both tiers)
+    - maxsize:   in-memory LRU bound
+    - max_rows:  disk-tier LRU bound
+    """
+
+    def __init__(self, path: str, table: str, ttl: float, maxsize: int, max_rows: int):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        if self.disk_enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = self._conn()
+            conn.executescript(_SCHEMA.format(table=table))
+            conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def disk_enabled(self) -> bool:
+        return self.enabled and bool(self.path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        value = self._memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk_enabled:
+            now = time.time()
+            conn = self._conn()
+            row = conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                with conn:
+                    conn.execute(f"UPDATE {self.table} SET used_at = ? WHERE key = ?", (now, key))
+                self._memory.set(key, row[0])
+                self._count("disk_hits")
+                return row[0]
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        self._memory.set(key, value)
+        self._count("stores")
+        if not self.disk_enabled:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % _PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop expired rows and the least recently used rows beyond max_rows. Returns rows deleted."""
+        if not self.disk_enabled:
+            return 0
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at <= ?", (time.time() - self.ttl,)
+            ).rowcount
+            deleted += conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            ).rowcount
+        return deleted
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            s = dict(self._stats)
+        s.update(memory=self._memory.stats(), path=self.path or None)
+        if self.disk_enabled:
+            s["disk_rows"] = self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return s
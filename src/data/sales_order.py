@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 
 class BillToCustomer(BaseModel):
@@ -58,3 +58,35 @@ class Transaction(BaseModel):
     billToCustomer: Optional[List[BillToCustomer]] = Field(None, description="List of bill-to customer details")
     shipToCustomer: Optional[List[ShipToCustomer]] = Field(None, description="List of ship-to customer details")
     lines: Optional[List[LineItem]] = Field(None, description="List of transaction line items")
+
+
+class IntakeCustomer(BaseModel):
+    """
+    BillToCustomer as read from an order image by the vision model
+    """
+    Name: Optional[str] = Field(None, description="Customer name")
+    BusinessUnit: Optional[str] = Field(None, description="Business unit name")
+
+
+class IntakeItem(BaseModel):
+    """
+    OrderItems entry as read from an order image by the vision model
+    """
+    Item: str = Field(..., min_length=1, description="Item / product number")
+    Quantity: int = Field(..., gt=0, description="Quantity ordered")
+    RequestedDate: Optional[str] = Field(None, description="Requested date as written on the order")
+
+    @field_validator("Quantity", mode="before")
+    @classmethod
+    def _no_bool_quantity(cls, value):
+        if isinstance(value, bool):
+            raise ValueError("Quantity must be a number")
+        return value
+
+
+class IntakeOrder(BaseModel):
+    """
+    IntakeOrder (vision model output schema)
+    """
+    BillToCustomer: Optional[IntakeCustomer] = Field(None, description="Bill-to customer")
+    OrderItems: List[IntakeItem] = Field(..., min_length=1, description="Ordered items")
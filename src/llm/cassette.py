@@ -0,0 +1,201 @@
+# src/llm/cassette.py
+"""
+Record / replay of LLM calls, to run the agents without OCI GenAI.
+
+LLM_MODE:
+- live     calls go to OCI GenAI (default)
+- record   as live, and each model response is also written to LLM_CASSETTE_DIR
+- replay   responses are served from LLM_CASSETTE_DIR; no OCI config, client or
+           network is needed. A prompt that was never recorded raises CassetteMissError.
+
+A cassette is one JSON file per prompt, named by the LLM cache key of that
+prompt (src/llm/llm_cache.py), so it covers every client built in src/llm/.
+The LLM cache sits in front of the cassette in every mode: record with
+LLM_CACHE_TTL=0 to capture repeated prompts too, and leave it on in replay to
+measure what it saves.
+
+Replayed calls wait for a synthetic latency (ms) given by LLM_REPLAY_LATENCY,
+multiplied by LLM_REPLAY_LATENCY_SCALE:
+
+    recorded                 the latency measured while recording (default)
+    none                     no wait
+    fixed:MS
+    uniform:LO:HI
+    normal:MEAN:SD           (clipped at 0)
+    lognormal:MEDIAN:SIGMA
+
+    python -m src.llm.cassette            # summary of the recorded cassettes
+"""
+import os
+import json
+import math
+import time
+import asyncio
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from src.common.config import LLM_MODE, LLM_CASSETTE_DIR, LLM_REPLAY_LATENCY, LLM_REPLAY_LATENCY_SCALE
+
+MODES = ("live", "record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """Replay mode got a prompt that has no recording."""
+
+
+def parse_latency(spec: str, scale: float = 1.0) -> Callable[[float], float]:
+    """LLM_REPLAY_LATENCY spec -> fn(recorded_ms) returning the ms to wait."""
+    name, *args = (spec or "recorded").strip().lower().split(":")
+    try:
+        params = [float(a) for a in args]
+    except ValueError:
+        raise ValueError(f"LLM_REPLAY_LATENCY: bad number in {spec!r}") from None
+    arity = {"recorded": 0, "none": 0, "fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    if arity.get(name) != len(params):
+        raise ValueError(f"LLM_REPLAY_LATENCY: unknown or malformed spec {spec!r}")
+
+    if name == "recorded":
+        draw = lambda recorded: recorded
+    elif name == "none":
+        draw = lambda recorded: 0.0
+    elif name == "fixed":
+        draw = lambda recorded: params[0]
+    elif name == "uniform":
+        draw = lambda recorded: random.uniform(params[0], params[1])
+    elif name == "normal":
+        draw = lambda recorded: max(0.0, random.gauss(params[0], params[1]))
+    else:
+        draw = lambda recorded: random.lognormvariate(math.log(params[0]), params[1])
+    return lambda recorded: draw(recorded) * scale
+
+
+class Cassette:
+    """
+    - directory:  where the <key>.json recordings live
+    - mode:       live | record | replay
+    - latency:    LLM_REPLAY_LATENCY spec, used in replay
+    - scale:      multiplier on the replay latency
+    """
+
+    def __init__(self, directory: str = LLM_CASSETTE_DIR, mode: str = LLM_MODE,
+                 latency: str = LLM_REPLAY_LATENCY, scale: float = LLM_REPLAY_LATENCY_SCALE):
+        if mode not in MODES:
+            raise ValueError(f"LLM_MODE must be one of {', '.join(MODES)}, got {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self._delay_ms = parse_latency(latency, scale)
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0, "replay_wait_ms": 0.0}
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def record(self, key: str, model: Optional[str], response: str, latency_ms: float) -> None:
+        entry = {
+            "key": key,
+            "model": model,
+            "latency_ms": round(latency_ms, 1),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "response": response,
+        }
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))  # readers never see a partial file
+        with self._lock:
+            self._stats["recorded"] += 1
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self._stats["misses"] += 1
+            raise CassetteMissError(f"no recording for prompt {key} in {self.directory}") from None
+        wait_ms = self._delay_ms(entry.get("latency_ms") or 0.0)
+        entry["wait_ms"] = wait_ms
+        with self._lock:
+            self._stats["replayed"] += 1
+            self._stats["replay_wait_ms"] += wait_ms
+        return entry
+
+    def play(self, key: str) -> str:
+        """Recorded response for key, after the synthetic latency (blocking sleep)."""
+        entry = self._entry(key)
+        time.sleep(entry["wait_ms"] / 1000)
+        return entry["response"]
+
+    async def aplay(self, key: str) -> str:
+        """play() for event-loop callers."""
+        entry = self._entry(key)
+        await asyncio.sleep(entry["wait_ms"] / 1000)
+        return entry["response"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+        s["replay_wait_ms"] = round(s["replay_wait_ms"], 1)
+        s.update(mode=self.mode, directory=self.directory, latency=self.latency)
+        return s
+
+
+# ---------- process-wide cassette ----------
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette()
+        return _cassette
+
+
+# ---------- summary ----------
+def summarize(directory: str = LLM_CASSETTE_DIR) -> Dict[str, Any]:
+    """Recordings per model with their latency percentiles (ms)."""
+    latencies: Dict[str, List[float]] = {}
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                entry = json.load(f)
+            latencies.setdefault(entry.get("model") or "?", []).append(entry.get("latency_ms") or 0.0)
+
+    def pct(values: List[float], p: float) -> float:
+        return values[min(len(values) - 1, int(p * len(values)))]
+
+    models = {}
+    for model, values in sorted(latencies.items()):
+        values.sort()
+        models[model] = {"recordings": len(values), "p50_ms": pct(values, 0.5),
+                         "p95_ms": pct(values, 0.95), "max_ms": values[-1]}
+    return {"directory": directory, "models": models}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=LLM_CASSETTE_DIR)
+    args = parser.parse_args()
+    print(json.dumps(summarize(args.dir), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+# src/llm/llm_cache.py
+"""
+Exact-match cache of LLM responses for the clients built in src/llm/.
+
+A response is keyed by sha256 of the model id, the generation parameters, the
+normalized message list, the tool schemas and the response format, so a
+replayed prompt (client retries, demos, the unit_test() flows) is answered
+from the cache instead of the OCI endpoint. Storage is a TieredCache
+(src/common/tiered_cache.py): in-memory LRU in front of a SQLite table at
+LLM_CACHE_PATH, both expiring after LLM_CACHE_TTL.
+
+- CachedOCIGenAIModel:  wayflowcore OCIGenAIModel (agents), generate and stream
+- LangchainLlmCache:    langchain BaseCache, passed as cache= to CachedChatOCIGenAI
+
+Both model classes also record / replay through src/llm/cassette.py (LLM_MODE)
+and send what reaches the model through src/llm/rate_limit.py.
+
+Wrap a call in bypass_llm_cache() to always go to the model (and not store
+the answer), e.g. when the caller asked for a fresh response.
+"""
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_oci import ChatOCIGenAI
+from wayflowcore.messagelist import ImageContent, Message, MessageType, TextContent
+from wayflowcore.models import OCIGenAIModel
+from wayflowcore.models._requesthelpers import StreamChunkType
+from wayflowcore.models.llmmodel import LlmCompletion, Prompt
+from wayflowcore.retrypolicy import RetryPolicy
+from wayflowcore.tools import ToolRequest
+
+from src.common.tiered_cache import TieredCache
+from src.llm.cassette import get_cassette
+from src.llm.rate_limit import get_model_limiter
+from src.common.config import LLM_CACHE_TTL, LLM_CACHE_MAX_ITEMS, LLM_CACHE_PATH, LLM_CACHE_MAX_ROWS
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """
+    LLM calls made inside this block skip the cache in both directions; the image
+    extraction cache and the intake dedup re-run and refresh their entry.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+class LlmResponseCache(TieredCache):
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 maxsize: int = LLM_CACHE_MAX_ITEMS, max_rows: int = LLM_CACHE_MAX_ROWS):
+        super().__init__(path, "llm_cache", ttl, maxsize, max_rows)
+
+    @property
+    def active(self) -> bool:
+        """Enabled and not bypassed for the current call."""
+        return self.enabled and not cache_bypassed()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+# ---------- process-wide cache ----------
+_cache: Optional[LlmResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LlmResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LlmResponseCache()
+        return _cache
+
+
+# ---------- wayflowcore ----------
+def _content_key(content: Any) -> Any:
+    if isinstance(content, TextContent):
+        return content.content
+    if isinstance(content, ImageContent):
+        return {"image_sha256": hashlib.sha256(content.base64_content.encode()).hexdigest()}
+    return repr(content)
+
+
+def _message_key(message: Message) -> Dict[str, Any]:
+    """What the model sees of a message; ids of tool calls are kept since results refer to them."""
+    tool_result = message.tool_result
+    return {
+        "role": message.role,
+        "type": message.message_type.value if message.message_type else None,
+        "contents": [_content_key(c) for c in message.contents],
+        "tool_requests": [
+            {"name": t.name, "args": t.args, "id": t.tool_request_id} for t in message.tool_requests or []
+        ],
+        "tool_result": None if tool_result is None else {"id": tool_result.tool_request_id, "content": tool_result.content},
+    }
+
+
+def prompt_key(model_id: str, prompt: Prompt) -> str:
+    response_format = prompt.response_format
+    generation_config = prompt.generation_config
+    normalized = {
+        "model": model_id,
+        "config": generation_config.to_dict() if generation_config is not None else None,
+        "messages": [_message_key(m) for m in prompt.messages],
+        "tools": [t.to_openai_format() for t in prompt.tools or []],
+        "response_format": response_format.to_json_schema() if response_format is not None else None,
+    }
+    return LlmResponseCache.key("wayflow", json.dumps(normalized, sort_keys=True, default=str))
+
+
+def _dump_message(message: Message) -> Optional[str]:
+    if not (message.content or message.tool_requests) or message.message_type == MessageType.ERROR:
+        return None  # nothing worth replaying
+    return json.dumps({
+        "content": message.content,
+        "message_type": message.message_type.value,
+        "tool_requests": [
+            {"name": t.name, "args": t.args, "id": t.tool_request_id} for t in message.tool_requests or []
+        ],
+    })
+
+
+def _load_message(value: str) -> Message:
+    data = json.loads(value)
+    return Message(
+        content=data["content"],
+        message_type=MessageType(data["message_type"]),
+        tool_requests=[
+            ToolRequest(name=t["name"], args=t["args"], tool_request_id=t["id"]) for t in data["tool_requests"]
+        ] or None,
+    )
+
+
+# in replay mode the OCI client is never built, but the constructors still want these
+_OFFLINE_SETTINGS = {"service_endpoint": "https://offline.invalid", "compartment_id": "offline", "auth_type": "API_KEY"}
+
+
+class _OfflineClient:
+    def __getattr__(self, name: str):
+        raise RuntimeError("LLM_MODE=replay makes no OCI calls")
+
+
+class CachedOCIGenAIModel(OCIGenAIModel):
+    """
+    OCIGenAIModel answering repeated prompts from get_llm_cache(), recording or
+    replaying its calls through get_cassette() (src/llm/cassette.py), and sending
+    the rest through the model's limiter (src/llm/rate_limit.py). Responses that
+    did not come from the model report no token usage.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if get_cassette().replaying:
+            for name, placeholder in _OFFLINE_SETTINGS.items():
+                kwargs[name] = kwargs.get(name) or placeholder
+        # retries happen in the limiter, where throttles also shrink the concurrency window
+        kwargs.setdefault("retry_policy", RetryPolicy(max_attempts=0))
+        super().__init__(*args, **kwargs)
+
+    def _init_client_if_needed(self) -> None:
+        if not get_cassette().replaying:
+            super()._init_client_if_needed()
+
+    def _key(self, prompt: Prompt) -> Optional[str]:
+        """None when neither the cache nor the cassette needs one."""
+        if not get_llm_cache().active and get_cassette().mode == "live":
+            return None
+        return prompt_key(self.model_id, prompt)
+
+    @staticmethod
+    def _cached(key: Optional[str]) -> Optional[str]:
+        cache = get_llm_cache()
+        return cache.get(key) if key is not None and cache.active else None
+
+    def _remember(self, key: Optional[str], value: Optional[str], latency_ms: Optional[float] = None) -> None:
+        if key is None or value is None:
+            return
+        cache = get_llm_cache()
+        if cache.active:
+            cache.set(key, value)
+        cassette = get_cassette()
+        if cassette.recording and latency_ms is not None:
+            cassette.record(key, self.model_id, value, latency_ms)
+
+    async def _generate_impl(self, prompt: Prompt) -> LlmCompletion:
+        key = self._key(prompt)
+        value = self._cached(key)
+        if value is not None:
+            return LlmCompletion(message=_load_message(value), token_usage=None)
+        return await get_model_limiter(self.model_id).acall(self._generate_uncached, prompt, key)
+
+    async def _generate_uncached(self, prompt: Prompt, key: Optional[str]) -> LlmCompletion:
+        cassette = get_cassette()
+        if cassette.replaying:
+            value = await cassette.aplay(key)
+            self._remember(key, value)
+            return LlmCompletion(message=_load_message(value), token_usage=None)
+        started = time.perf_counter()
+        completion = await super()._generate_impl(prompt)
+        self._remember(key, _dump_message(completion.message), (time.perf_counter() - started) * 1000)
+        return completion
+
+    async def _stream_generate_impl(self, prompt: Prompt) -> AsyncIterator[Any]:
+        key = self._key(prompt)
+        value = self._cached(key)
+        if value is not None:
+            for chunk in _chunks(value):
+                yield chunk
+            return
+        async for chunk in get_model_limiter(self.model_id).astream(self._stream_uncached, prompt, key):
+            yield chunk
+
+    async def _stream_uncached(self, prompt: Prompt, key: Optional[str]) -> AsyncIterator[Any]:
+        cassette = get_cassette()
+        if cassette.replaying:
+            value = await cassette.aplay(key)
+            self._remember(key, value)
+            for chunk in _chunks(value):
+                yield chunk
+            return
+        started = time.perf_counter()
+        final = None
+        async for chunk in super()._stream_generate_impl(prompt):
+            if chunk[0] == StreamChunkType.END_CHUNK:
+                final = chunk[1]
+            yield chunk
+        if final is not None:
+            self._remember(key, _dump_message(final), (time.perf_counter() - started) * 1000)
+
+
+def _chunks(value: str):
+    """A stored response as the start / text / end chunks of a stream."""
+    message = _load_message(value)
+    yield StreamChunkType.START_CHUNK, Message(content="", message_type=MessageType.AGENT), None
+    if message.content:
+        yield StreamChunkType.TEXT_CHUNK, Message(content=message.content, message_type=MessageType.AGENT), None
+    yield StreamChunkType.END_CHUNK, message, None
+
+
+# ---------- langchain ----------
+class LangchainLlmCache(BaseCache):
+    """
+    langchain calls lookup/update with the serialized messages and the model's
+    llm_string (class, model id, model_kwargs, bound tools / structured output).
+    """
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return LlmResponseCache.key("langchain", llm_string, prompt)
+
+    def lookup(self, prompt: str, llm_string: str):
+        cache = get_llm_cache()
+        if not cache.active:
+            return None
+        hit = cache.get(self._key(prompt, llm_string))
+        return None if hit is None else loads(hit, allowed_objects="core")
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        cache = get_llm_cache()
+        if cache.active and return_val:
+            cache.set(self._key(prompt, llm_string), dumps(list(return_val)))
+
+    def clear(self, **kwargs: Any) -> None:
+        """Entries expire by TTL / LRU; nothing to do here."""
+
+
+_langchain_cache = LangchainLlmCache()
+
+
+def get_langchain_cache() -> LangchainLlmCache:
+    return _langchain_cache
+
+
+class CachedChatOCIGenAI(ChatOCIGenAI):
+    """
+    ChatOCIGenAI whose langchain cache key names the model (the stock llm_string is
+    only the class type and stop words, so two models shared entries), whose calls
+    are recorded or replayed through get_cassette() and go through the model's
+    limiter. Pass cache=get_langchain_cache().
+    """
+
+    def __init__(self, **kwargs):
+        if get_cassette().replaying and kwargs.get("client") is None:
+            kwargs["client"] = _OfflineClient()
+        super().__init__(**kwargs)
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_id": self.model_id, "provider": self.provider, "model_kwargs": self.model_kwargs or {}}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        key = None
+        if get_cassette().mode != "live":
+            key = LangchainLlmCache._key(dumps(messages), self._get_llm_string(stop=stop, **kwargs))
+        return get_model_limiter(self.model_id).call(self._generate_uncached, messages, stop, run_manager, key, **kwargs)
+
+    def _generate_uncached(self, messages: List[BaseMessage], stop: Optional[List[str]], run_manager: Any,
+                           key: Optional[str], **kwargs: Any) -> ChatResult:
+        cassette = get_cassette()
+        if cassette.replaying:
+            return ChatResult(generations=loads(cassette.play(key), allowed_objects="core"))
+        started = time.perf_counter()
+        result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        if cassette.recording:
+            cassette.record(key, self.model_id, dumps(result.generations), (time.perf_counter() - started) * 1000)
+        return result
@@ -1,9 +1,9 @@
 import os
 from pathlib import Path
 # ─── OCI LLM ──────────────────────────────────────────
-from wayflowcore.models import OCIGenAIModel
 from wayflowcore.agent import Agent
 from src.common.config import *
+from src.llm.llm_cache import CachedOCIGenAIModel
 
 # print(f"AUTH_TYPE: {AUTH_TYPE}")
 # print(f"MODEL_ID: {MODEL_ID}")
@@ -13,7 +13,7 @@ from src.common.config import *
 
 def initialize_llm():
     try:
-        return OCIGenAIModel(
+        return CachedOCIGenAIModel(
             model_id=MODEL_ID,
             service_endpoint=ENDPOINT,
             compartment_id=COMPARTMENT_ID,
@@ -1,4 +1,3 @@
-from langchain_oci import ChatOCIGenAI
 from pydantic import BaseModel
 
 class Joke(BaseModel):
@@ -6,6 +5,7 @@ class Joke(BaseModel):
     punchline: str
 
 from src.common.config import *
+from src.llm.llm_cache import CachedChatOCIGenAI, get_langchain_cache
 
 # print(f"AUTH_TYPE: {AUTH_TYPE}")
 # print(f"MODEL_ID: {MODEL_ID}")
@@ -15,7 +15,7 @@ from src.common.config import *
 
 def initialize_llm_so():
     try:
-        return ChatOCIGenAI(
+        return CachedChatOCIGenAI(
             model_id=MODEL_ID,
             service_endpoint=ENDPOINT,
             compartment_id=COMPARTMENT_ID,
@@ -26,6 +26,7 @@ def initialize_llm_so():
                 # remove any unsupported kwargs like citation_types
             },
             auth_type=AUTH_TYPE,
+            cache=get_langchain_cache(),
         )
     except Exception as e:
         print(f"Error initializing LLM: {e}")
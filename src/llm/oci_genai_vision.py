@@ -1,14 +1,14 @@
 import os
 from pathlib import Path
 # ─── OCI LLM ──────────────────────────────────────────
-from langchain_oci import ChatOCIGenAI
 from dotenv import load_dotenv
 import base64
 from langchain_core.messages import HumanMessage
 from src.common.config import *
+from src.llm.llm_cache import CachedChatOCIGenAI, get_langchain_cache
 
 def initialize_llm_vision():
-    return ChatOCIGenAI(
+    return CachedChatOCIGenAI(
         model_id=MODEL_ID_VISION,
         service_endpoint=ENDPOINT,
         compartment_id=COMPARTMENT_ID,
@@ -21,6 +21,7 @@ def initialize_llm_vision():
             "top_p": 0.75
         },
         auth_type=AUTH_TYPE,
+        cache=get_langchain_cache(),
         auth_profile=CONFIG_PROFILE,
     )
 
@@ -0,0 +1,322 @@
+# src/llm/rate_limit.py
+"""
+Client-side throttling and retry of OCI GenAI calls, one limiter per model.
+
+Every call that would reach the endpoint (or, in LLM_MODE=replay, the
+cassette standing in for it) goes through ModelLimiter:
+
+- token bucket:  at most LLM_<ROLE>_RPS calls/s, bursts of LLM_<ROLE>_BURST
+- AIMD window:   at most `window` calls in flight. The window grows by one per
+                 window of successful calls and halves on each throttle (429),
+                 between LLM_AIMD_MIN_CONCURRENCY and LLM_<ROLE>_MAX_CONCURRENCY
+- retry:         transient failures (429, 5xx, timeouts / connection errors)
+                 are retried up to LLM_RETRY_MAX_ATTEMPTS times after a
+                 full-jitter backoff, uniform(0, min(max, base * 2**attempt)),
+                 or Retry-After if the service sent a longer one
+
+ROLE is TEXT for MODEL_ID and VISION for MODEL_ID_VISION (any other model
+gets the TEXT settings). A call that cannot start within LLM_QUEUE_TIMEOUT
+raises LlmQueueTimeoutError. The limiters are shared by all threads and
+event loops of the process; waiting is done by short sleeps, so they work
+from wayflowcore's per-conversation loops as well as langchain's threads.
+"""
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from src.common.config import (
+    MODEL_ID, MODEL_ID_VISION,
+    LLM_TEXT_RPS, LLM_TEXT_BURST, LLM_TEXT_MAX_CONCURRENCY,
+    LLM_VISION_RPS, LLM_VISION_BURST, LLM_VISION_MAX_CONCURRENCY,
+    LLM_AIMD_MIN_CONCURRENCY, LLM_RETRY_MAX_ATTEMPTS, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY,
+    LLM_QUEUE_TIMEOUT,
+)
+
+_POLL_S = 0.01          # sleep while the window is full
+_THROTTLE_EVENTS = 50   # recent throttle events kept for /metrics/llm
+_TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LlmQueueTimeoutError(RuntimeError):
+    """No rate-limit token / concurrency slot for this model within the queue timeout."""
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    """HTTP status of an OCI ServiceError (or anything else carrying .status / .status_code)."""
+    for attr in ("status", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_throttle(exc: BaseException) -> bool:
+    status = _status(exc)
+    if status is not None:
+        return status == 429
+    text = str(exc)
+    return "429" in text or "TooManyRequests" in text
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = _status(exc)
+    if status is not None:
+        return status in _TRANSIENT_STATUSES
+    return is_throttle(exc) or type(exc).__name__ in ("RequestException", "ConnectTimeout", "ReadTimeout")
+
+
+def _retry_after(exc: BaseException) -> float:
+    headers = getattr(exc, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After") or 0)
+    except (TypeError, ValueError, AttributeError):
+        return 0.0
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `burst`; rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token and return 0, or return the seconds until one is available. Caller holds the lock."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class ModelLimiter:
+    """
+    - name:             model id (for metrics)
+    - rate / burst:     token bucket
+    - max_concurrency:  AIMD window ceiling (and starting value)
+    - min_concurrency:  AIMD window floor
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_concurrency: int,
+                 min_concurrency: int = LLM_AIMD_MIN_CONCURRENCY, max_attempts: int = LLM_RETRY_MAX_ATTEMPTS,
+                 base_delay: float = LLM_RETRY_BASE_DELAY, max_delay: float = LLM_RETRY_MAX_DELAY,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue_timeout = queue_timeout
+        self.window = float(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self._bucket = TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+        self._throttle_events = deque(maxlen=_THROTTLE_EVENTS)
+        self._stats = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "throttled": 0,
+                       "queue_timeouts": 0, "queue_ms_total": 0.0, "queue_ms_max": 0.0,
+                       "backoff_ms_total": 0.0}
+
+    # ----- admission -----
+    def _try_acquire(self) -> float:
+        """0 when a slot and a token were taken, else the seconds to wait before trying again."""
+        with self._lock:
+            if self.in_flight >= int(self.window):
+                return _POLL_S
+            wait = self._bucket.take()
+            if wait == 0:
+                self.in_flight += 1
+            return wait
+
+    def _admitted(self, started: float) -> None:
+        queue_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["queue_ms_total"] += queue_ms
+            self._stats["queue_ms_max"] = max(self._stats["queue_ms_max"], queue_ms)
+
+    def _timed_out(self) -> LlmQueueTimeoutError:
+        with self._lock:
+            self._stats["queue_timeouts"] += 1
+        return LlmQueueTimeoutError(f"{self.name}: no LLM slot within {self.queue_timeout:g}s")
+
+    def _enter(self) -> float:
+        with self._lock:
+            self.waiting += 1
+        return time.monotonic()
+
+    def acquire(self) -> None:
+        started = self._enter()
+        deadline = started + self.queue_timeout
+        try:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return self._admitted(started)
+                if time.monotonic() + wait > deadline:
+                    raise self._timed_out()
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    async def aacquire(self) -> None:
+        started = self._enter()
+        deadline = started + self.queue_timeout
+        try:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return self._admitted(started)
+                if time.monotonic() + wait > deadline:
+                    raise self._timed_out()
+                await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    # ----- AIMD + retry bookkeeping -----
+    def _release(self, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if exc is None:
+                self._stats["succeeded"] += 1
+                self.window = min(self.max_concurrency, self.window + 1 / self.window)
+            elif is_throttle(exc):
+                self._stats["throttled"] += 1
+                self.window = max(self.min_concurrency, self.window / 2)
+                self._throttle_events.append({"at": time.time(), "window": round(self.window, 2),
+                                              "error": str(exc)[:200]})
+            else:
+                self._stats["failed"] += 1
+
+    def _abandon(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _backoff(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to sleep before retrying after attempt `attempt` (0-based) failed; None = give up."""
+        if attempt >= self.max_attempts or not is_transient(exc):
+            return None
+        delay = max(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)), _retry_after(exc))
+        with self._lock:
+            self._stats["retries"] += 1
+            self._stats["backoff_ms_total"] += delay * 1000
+        return delay
+
+    # ----- call wrappers -----
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(*args, **kwargs) under the limits, retried on transient errors."""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._release(e)
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:  # cancelled / interrupted: give the slot back, no AIMD signal
+                self._abandon()
+                raise
+            self._release()
+            return result
+
+    async def acall(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """await fn(*args, **kwargs) under the limits, retried on transient errors."""
+        attempt = 0
+        while True:
+            await self.aacquire()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                self._release(e)
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:  # cancelled / interrupted: give the slot back, no AIMD signal
+                self._abandon()
+                raise
+            self._release()
+            return result
+
+    async def astream(self, fn: Callable[..., AsyncIterator[Any]], *args, **kwargs) -> AsyncIterator[Any]:
+        """Chunks of fn(*args, **kwargs) under the limits; retried only while nothing was yielded."""
+        attempt = 0
+        while True:
+            await self.aacquire()
+            yielded = False
+            try:
+                async for chunk in fn(*args, **kwargs):
+                    yielded = True
+                    yield chunk
+            except Exception as e:
+                self._release(e)
+                delay = None if yielded else self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:  # cancelled / generator closed by the consumer
+                self._abandon()
+                raise
+            self._release()
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s.update(window=round(self.window, 2), in_flight=self.in_flight, queue_depth=self.waiting,
+                     max_concurrency=self.max_concurrency, rate=self._bucket.rate, burst=self._bucket.burst,
+                     recent_throttles=list(self._throttle_events))
+        s["avg_queue_ms"] = round(s.pop("queue_ms_total") / (s["calls"] or 1), 2)
+        s["queue_ms_max"] = round(s["queue_ms_max"], 2)
+        s["backoff_ms_total"] = round(s["backoff_ms_total"], 1)
+        return s
+
+
+# ---------- process-wide limiters ----------
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _settings(model_id: Optional[str]) -> Dict[str, Any]:
+    if model_id and model_id == MODEL_ID_VISION and model_id != MODEL_ID:
+        return {"rate": LLM_VISION_RPS, "burst": LLM_VISION_BURST, "max_concurrency": LLM_VISION_MAX_CONCURRENCY}
+    return {"rate": LLM_TEXT_RPS, "burst": LLM_TEXT_BURST, "max_concurrency": LLM_TEXT_MAX_CONCURRENCY}
+
+
+def get_model_limiter(model_id: Optional[str]) -> ModelLimiter:
+    """The shared limiter for model_id (same model id, same OCI quota, same limiter)."""
+    name = model_id or "default"
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = ModelLimiter(name, **_settings(model_id))
+        return limiter
+
+
+def limiter_stats() -> Dict[str, Any]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,141 @@
+# src/llm/registry.py
+"""
+Process-wide LLM clients and agent templates.
+
+Building an OCIGenAIModel / ChatOCIGenAI parses the OCI config, sets up the
+signer and opens a TLS session; building an Agent validates its tools. None
+of that depends on the request, so each is built once here (at FastAPI
+startup via warm()) and shared; requests only start a fresh conversation.
+
+    python -m src.llm.registry --iterations 20     # per-request setup cost: fresh vs shared
+"""
+import time
+import argparse
+import threading
+import traceback
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.llm.oci_genai import initialize_llm
+from src.llm.oci_genai_vision import initialize_llm_vision
+from src.llm.oci_genai_structured_output import initialize_llm_so
+
+
+class Registry:
+    """name -> object built once by its factory; concurrent first callers wait for one build."""
+
+    def __init__(self):
+        self._items: Dict[str, Any] = {}
+        self._build_ms: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        item = self._items.get(name)
+        if item is not None:
+            self._hits += 1
+            return item
+        with self._lock:
+            build_lock = self._locks.setdefault(name, threading.Lock())
+        with build_lock:
+            item = self._items.get(name)
+            if item is None:
+                started = time.perf_counter()
+                item = factory()
+                self._build_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+                self._items[name] = item
+        return item
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Drop one (or every) entry; it is rebuilt on next use (e.g. after rotating credentials)."""
+        with self._lock:
+            for key in ([name] if name else list(self._items)):
+                self._items.pop(key, None)
+                self._build_ms.pop(key, None)
+
+    def warm(self, getters: Iterable[Callable[[], Any]]) -> Dict[str, str]:
+        """Call each getter now; a failure is reported, not raised (the next request retries it)."""
+        errors = {}
+        for getter in getters:
+            try:
+                getter()
+            except Exception as e:
+                traceback.print_exc()
+                errors[getattr(getter, "__name__", str(getter))] = str(e)
+        return errors
+
+    def stats(self) -> Dict[str, Any]:
+        return {"items": dict(self._build_ms), "hits": self._hits}
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+# ---------- shared LLM clients ----------
+def _chat_llm():
+    llm = initialize_llm()
+    # OCIGenAIModel creates its OCI client on first generation; do it now, off the request path
+    init_client = getattr(llm, "_init_client_if_needed", None)
+    if callable(init_client):
+        init_client()
+    return llm
+
+
+def get_llm():
+    """Shared OCIGenAIModel (MODEL_ID) for the wayflow agents."""
+    return _registry.get("llm", _chat_llm)
+
+
+def get_vision_llm():
+    """Shared ChatOCIGenAI (MODEL_ID_VISION)."""
+    return _registry.get("llm_vision", initialize_llm_vision)
+
+
+def get_structured_llm(schema: type):
+    """Shared ChatOCIGenAI (MODEL_ID) bound to structured output for `schema`."""
+    return _registry.get(f"llm_structured:{schema.__name__}", lambda: initialize_llm_so().with_structured_output(schema))
+
+
+# ---------- benchmark ----------
+def benchmark(iterations: int = 20) -> Dict[str, Any]:
+    """Mean ms of the per-request setup: building everything fresh (old behaviour) vs. the shared registry."""
+    from src.data.sales_order import Transaction
+    from src.agents.inventory_check_agent import _build_agent, get_inventory_check_agent
+
+    def fresh():
+        _registry.reset()
+        _build_agent().start_conversation()
+        initialize_llm_vision()
+        initialize_llm_so().with_structured_output(Transaction)
+
+    def shared():
+        get_inventory_check_agent().start_conversation()
+        get_vision_llm()
+        get_structured_llm(Transaction)
+
+    results = {}
+    for name, fn in (("fresh", fresh), ("shared", shared)):
+        fn()  # warm imports / first build
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        results[f"{name}_ms"] = round((time.perf_counter() - started) * 1000 / iterations, 2)
+    results["saved_ms_per_request"] = round(results["fresh_ms"] - results["shared_ms"], 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    import json
+    print(json.dumps(benchmark(args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
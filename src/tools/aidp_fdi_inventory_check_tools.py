@@ -1,160 +1,376 @@
 # src/tools/aidp_inventory_check_tool.py
-import os
-from multiprocessing import Process, Queue
+import os, json, time
+from datetime import datetime, timezone
 from wayflowcore.agent import Agent
 from wayflowcore.tools import tool
 from wayflowcore.executors.executionstatus import UserMessageRequestStatus
-from typing import List
+from typing import Dict, List, Tuple, Union
 
 from src.common.config import (
-    PROJECT_ROOT, JDBC_DRIVER_CLASS_NAME, JDBC_URL, AUTH_TYPE,
-    OCI_CONFIG_FILE, CONFIG_PROFILE
+    PROJECT_ROOT, JDBC_QUERY_TIMEOUT, INVENTORY_CACHE_TTL, INVENTORY_CACHE_MAX_ITEMS,
+    INVENTORY_BATCH_WINDOW_MS, INVENTORY_BATCH_MAX_ITEMS, INVENTORY_SNAPSHOT_ENABLED
 )
+from src.common.cache import TTLCache
+from src.tools.aidp_jdbc_pool import get_jdbc_pool, JdbcPoolError
+from src.tools.inventory_batcher import InventoryBatcher
+from src.tools.inventory_snapshot import get_inventory_snapshot
+from src.tools.inventory_ledger import get_allocation_ledger
 
-# ---------- child worker (runs JPype + JDBC in separate process) ----------
-def _jdbc_worker(item_numbers: List[str], item_required_quantities: List[int], bu: str, q) -> None:
+# per-item totals summed in SQL; inventory_check3.sql keeps the per-org/subinventory rows for breakdowns
+TOTALS_SQL_PATH = os.path.join(PROJECT_ROOT, "config", "inventory_check_totals.sql")
+BREAKDOWN_SQL_PATH = os.path.join(PROJECT_ROOT, "config", "inventory_check3.sql")
+# several business units in one round trip (bulk check)
+BULK_SQL_PATH = os.path.join(PROJECT_ROOT, "config", "inventory_check_bulk.sql")
+
+# (business_unit, item_number) -> available_quantity
+_inventory_cache = TTLCache(maxsize=INVENTORY_CACHE_MAX_ITEMS, ttl=INVENTORY_CACHE_TTL)
+
+
+# ---------- SQL + result shaping (parent process) ----------
+def _build_inventory_sql(n_items: int, sql_path: str = TOTALS_SQL_PATH, n_bus: int = 0) -> str:
     """
-    item_numbers: list[str]
-    item_required_quantities: list[int]  (same length as item_numbers)
-    bu: str
-    q: multiprocessing.Queue  -> puts a list[dict] or 'Error: ...'
+    SQL file must contain:  ... item.item_number IN ({items}) ... AND bu.business_unit_name = ?
+    (bulk SQL: ... AND bu.business_unit_name IN ({bus}), sized by n_bus)
     """
-    import os, json
-    import jpype, jaydebeapi
+    if not os.path.isfile(sql_path):
+        raise JdbcPoolError(f"SQL file not found: {sql_path}")
+    sql_template = open(sql_path, "r").read()
+    if "{items}" not in sql_template:
+        raise JdbcPoolError("SQL template must contain a {items} token for the IN list")
+    return sql_template.format(items=", ".join(["?"] * n_items), bus=", ".join(["?"] * n_bus))
 
+
+def _to_int(value) -> int:
+    if value is None:
+        return 0
     try:
-        # validate inputs
-        if not isinstance(item_numbers, (list, tuple)) or not item_numbers:
-            q.put("Error: item_numbers must be a non-empty list")
-            return
-        if not isinstance(item_required_quantities, (list, tuple)) or \
-           len(item_required_quantities) != len(item_numbers):
-            q.put("Error: item_required_quantity must be a list with same length as item_numbers")
-            return
-        if not isinstance(bu, str) or not bu.strip():
-            q.put("Error: bu must be a non-empty string")
-            return
-
-        # locate jar(s)
-        JAR_CANDIDATES = [
-            os.path.join(PROJECT_ROOT, "config", "SparkJDBC42.jar"),
-            os.path.join(PROJECT_ROOT, "config", "SimbaSparkJDBC42.jar"),
-        ]
-        jars = [p for p in JAR_CANDIDATES if os.path.isfile(p)]
-        if not jars:
-            q.put("Error: JDBC jar not found at expected locations: " + ", ".join(JAR_CANDIDATES))
-            return
-
-        # start JVM with explicit classpath
-        if not jpype.isJVMStarted():
-            jpype.startJVM(convertStrings=True, classpath=jars)
-
-        # sanity check driver
-        DRIVER_CLASS = "com.simba.spark.jdbc.Driver"
-        try:
-            _ = jpype.JClass(DRIVER_CLASS)
-        except Exception as e:
-            q.put(f"Error: Driver class '{DRIVER_CLASS}' not found on classpath ({os.pathsep.join(jars)}): {e}")
-            return
-
-        # connect
-        props = {
-            "oracle.jdbc.authenticationMethod": AUTH_TYPE,
-            "oracle.jdbc.oci.config.file": OCI_CONFIG_FILE,
-            "oracle.jdbc.oci.profile.name": CONFIG_PROFILE,
+        return int(value)
+    except (TypeError, ValueError):
+        # fallback if types are odd (DECIMAL strings, floats)
+        return int(float(value))
+
+
+def _columns_to_quantities(chunks) -> dict:
+    # columnar chunks expected as: (available_quantity[], item_number[]), already summed per item in SQL
+    qty_by_item = {}
+    for quantities, items in chunks:
+        qty_by_item.update(zip(map(str, items), map(_to_int, quantities)))
+    return qty_by_item
+
+
+def _fetch_from_fdi(bu: str, items: List[str], timeout: float = JDBC_QUERY_TIMEOUT) -> dict:
+    sql = _build_inventory_sql(len(items))
+    # Params: all item_numbers first (for IN list), then BU (for the trailing '?')
+    chunks = get_jdbc_pool().execute_columns(sql, tuple(items) + (bu,), timeout=timeout)
+    return _columns_to_quantities(chunks)
+
+
+def _fetch_breakdown(bu: str, items: List[str], timeout: float = JDBC_QUERY_TIMEOUT) -> dict:
+    """Return {item_number: {"<org_code>/<subinventory>": quantity}} from inventory_check3.sql."""
+    sql = _build_inventory_sql(len(items), BREAKDOWN_SQL_PATH)
+    # rows expected as: (available_quantity, item_number, org_code, org_id, subinv, bu_name)
+    breakdown = {}
+    for rows in get_jdbc_pool().execute_iter(sql, tuple(items) + (bu,), timeout=timeout):
+        for qty, item, org_code, _, subinv, _ in rows:
+            per_item = breakdown.setdefault(str(item), {})
+            key = f"{org_code}/{subinv}"
+            per_item[key] = per_item.get(key, 0) + _to_int(qty)
+    return breakdown
+
+
+# coalesces concurrent lookups per BU into one merged IN-list query
+_inventory_batcher = InventoryBatcher(
+    _fetch_from_fdi, window_s=INVENTORY_BATCH_WINDOW_MS / 1000, max_items=INVENTORY_BATCH_MAX_ITEMS
+)
+
+
+def _query_available(item_numbers: List[str], bu: str, timeout: float = JDBC_QUERY_TIMEOUT) -> dict:
+    """
+    Return {item_number: (available_quantity, as_of_epoch)} for the given items.
+    Lookup order: in-memory cache -> local snapshot (if enabled and fresh) -> live AIDP.
+    Only the keys still missing go into the {items} IN-list, merged with whatever
+    other requests for the same BU arrive in the batch window.
+    """
+    items = list(dict.fromkeys(str(it) for it in item_numbers))  # dedupe, keep order
+    cached = _inventory_cache.get_many((bu, it) for it in items)
+    qty_by_item = {it: value for (_, it), value in cached.items()}
+
+    missing = [it for it in items if it not in qty_by_item]
+    if missing and INVENTORY_SNAPSHOT_ENABLED:
+        snap, refreshed_at = get_inventory_snapshot().lookup(bu, missing)
+        qty_by_item.update({it: (qty, refreshed_at) for it, qty in snap.items()})
+        missing = [it for it in missing if it not in snap]
+
+    if missing:
+        fetched = _inventory_batcher.fetch(bu, missing, timeout)
+        as_of = time.time()
+        # items with no on-hand rows are cached as 0 too, so they don't hit FDI again
+        fresh = {it: (fetched.get(it, 0), as_of) for it in missing}
+        _inventory_cache.set_many({(bu, it): value for it, value in fresh.items()})
+        qty_by_item.update(fresh)
+    return qty_by_item
+
+
+def _format_as_of(as_of) -> str:
+    return datetime.fromtimestamp(as_of, timezone.utc).isoformat() if as_of else None
+
+
+def _build_result(item_numbers: List[str], item_required_quantities: List[int], bu: str, qty_by_item: dict,
+                  breakdown: dict = None, reserved_by_item: dict = None) -> list:
+    # available = on_hand - quantities held by other in-flight orders (allocation ledger)
+    reserved_by_item = reserved_by_item or {}
+    lookups = [qty_by_item.get(str(it), (0, None)) for it in item_numbers]
+    result = [
+        {
+            "item_number": str(it),
+            "available_quantity": int(on_hand) - reserved_by_item.get(str(it), 0),
+            "required_quantity": int(required),
+            "is_available": "Yes" if int(on_hand) - reserved_by_item.get(str(it), 0) >= int(required) else "No",
+            "business_unit": bu,
+            "as_of": _format_as_of(as_of),
+            "on_hand_quantity": int(on_hand),
+            "reserved_quantity": reserved_by_item.get(str(it), 0),
         }
-        conn = jaydebeapi.connect(DRIVER_CLASS, JDBC_URL, props, jars)
+        for it, required, (on_hand, as_of) in zip(item_numbers, item_required_quantities, lookups)
+    ]
+    if breakdown is not None:
+        for line in result:
+            line["breakdown"] = breakdown.get(line["item_number"], {})
+    return result
 
-        try:
-            cur = conn.cursor()
-            sql_path = os.path.join(PROJECT_ROOT, "config", "inventory_check3.sql")
-            if not os.path.isfile(sql_path):
-                q.put(f"Error: SQL file not found: {sql_path}")
-                return
-
-            sql_template = open(sql_path, "r").read()
-
-            # Build IN list placeholders and finalize SQL.
-            # SQL file must contain:  ... item.item_number IN ({items}) ... AND bu.business_unit_name = ?
-            placeholders = ", ".join(["?"] * len(item_numbers))
-            if "{items}" not in sql_template:
-                q.put("Error: SQL template must contain a {items} token for the IN list")
-                return
-            sql = sql_template.format(items=placeholders)
-
-            # Params: all item_numbers first (for IN list), then BU (for the trailing '?')
-            params = tuple(item_numbers) + (bu,)
-
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-        finally:
-            try: cur.close()
-            except Exception: pass
-            try: conn.close()
-            except Exception: pass
-
-        # rows expected as: (available_quantity, item_number, org_code, org_id, subinv, bu_name)
-        # Build a map for quick lookup by item_number
-        qty_by_item = {}
-        for r in rows or []:
-            try:
-                qty_by_item[str(r[1])] = int(r[0]) if r[0] is not None else 0
-            except Exception:
-                # fallback if types are odd
-                qty_by_item[str(r[1])] = int(float(r[0])) if r and r[0] is not None else 0
-
-        result = []
-        for i, it in enumerate(item_numbers):
-            available = qty_by_item.get(str(it), 0)
-            required = int(item_required_quantities[i])
-            result.append({
-                "item_number": str(it),
-                "available_quantity": int(available),
-                "required_quantity": required,
-                "is_available": "Yes" if available >= required else "No",
-                "business_unit": bu
-            })
-
-        q.put(json.dumps(result))  # return JSON string (Wayflow tools usually return str)
 
+def _reserve_or_lookup(item_numbers: List[str], item_required_quantities: List[int], bu: str, qty_by_item: dict,
+                       reservation_id: str = None) -> Tuple[dict, bool]:
+    """Return ({item_number: quantity reserved by other orders}, held) from the allocation ledger."""
+    ledger = get_allocation_ledger()
+    items = list(dict.fromkeys(str(it) for it in item_numbers))
+    if not reservation_id:
+        reserved = ledger.reserved_many((bu, it) for it in items)
+        return {it: qty for (_, it), qty in reserved.items()}, False
+
+    demand = {}
+    for it, required in zip(item_numbers, item_required_quantities):
+        demand[(bu, str(it))] = demand.get((bu, str(it)), 0) + int(required)
+    on_hand = {(bu, it): int(qty_by_item.get(it, (0, None))[0]) for it in items}
+    # check + hold in one step, so concurrent checks cannot both get the same stock
+    held, available = ledger.reserve(reservation_id, demand, on_hand=on_hand)
+    return {it: on_hand[(bu, it)] - available[(bu, it)] for it in items if (bu, it) in available}, held
+
+
+def aidp_fdi_inventory_check_impl(
+    item_numbers: List[str],
+    item_required_quantity: List[int],
+    bu: str,
+    include_breakdown: bool = False,
+    timeout: float = JDBC_QUERY_TIMEOUT,
+    reservation_id: str = None,
+) -> str:
+    """
+    Plain callable that actually does the work (cache first, then a warm pooled JDBC worker).
+    include_breakdown: also return per "<org_code>/<subinventory>" quantities; always queries live.
+    timeout: seconds before the live query is cancelled; reported as {"error": "timeout", ...}.
+    reservation_id: also hold the required quantities for this in-flight order (all lines or none);
+                    held lines carry "reservation_id". Re-checking with the same id replaces the hold.
+    """
+    # validate inputs
+    if not isinstance(item_numbers, (list, tuple)) or not item_numbers:
+        return "Error: item_numbers must be a non-empty list"
+    if not isinstance(item_required_quantity, (list, tuple)) or \
+       len(item_required_quantity) != len(item_numbers):
+        return "Error: item_required_quantity must be a list with same length as item_numbers"
+    if not isinstance(bu, str) or not bu.strip():
+        return "Error: bu must be a non-empty string"
+
+    try:
+        breakdown = None
+        if include_breakdown:
+            items = list(dict.fromkeys(str(it) for it in item_numbers))
+            breakdown = _fetch_breakdown(bu, items, timeout)
+            as_of = time.time()
+            qty_by_item = {it: (sum(breakdown.get(it, {}).values()), as_of) for it in items}
+            _inventory_cache.set_many({(bu, it): value for it, value in qty_by_item.items()})
+        else:
+            qty_by_item = _query_available(item_numbers, bu, timeout)
+        reserved_by_item, held = _reserve_or_lookup(item_numbers, item_required_quantity, bu, qty_by_item, reservation_id)
+        result = _build_result(item_numbers, item_required_quantity, bu, qty_by_item, breakdown, reserved_by_item)
+        if held:
+            for line in result:
+                line["reservation_id"] = reservation_id
+    except TimeoutError as e:
+        # structured so the agent can tell "slow" from "failed" and retry with fewer items
+        return json.dumps({
+            "error": "timeout",
+            "message": str(e),
+            "timeout_s": timeout,
+            "business_unit": bu,
+            "item_numbers": [str(it) for it in item_numbers],
+        })
     except Exception as e:
-        q.put(f"Error: {e}")
-    finally:
+        return f"Error: {e}"
+
+    return json.dumps(result)  # return JSON string (Wayflow tools usually return str)
+
+
+# ---------- bulk (many business units / orders in one query) ----------
+def _fetch_bulk(pairs: List[Tuple[str, str]], timeout: float = JDBC_QUERY_TIMEOUT) -> Dict[Tuple[str, str], int]:
+    """Return {(bu, item_number): available_quantity} for the requested pairs with one query."""
+    bus = list(dict.fromkeys(bu for bu, _ in pairs))
+    items = list(dict.fromkeys(it for _, it in pairs))
+    sql = _build_inventory_sql(len(items), BULK_SQL_PATH, n_bus=len(bus))
+    # rows expected as: (available_quantity, item_number, business_unit_name)
+    wanted = set(pairs)
+    qty_by_pair = {}
+    for rows in get_jdbc_pool().execute_iter(sql, tuple(items) + tuple(bus), timeout=timeout):
+        for qty, item, bu_name in rows:
+            key = (str(bu_name), str(item))
+            if key in wanted:  # the IN-lists select a BU x item cross product
+                qty_by_pair[key] = _to_int(qty)
+    return qty_by_pair
+
+
+def _query_available_bulk(pairs: List[Tuple[str, str]], timeout: float = JDBC_QUERY_TIMEOUT) -> dict:
+    """Same lookup order as _query_available, for (bu, item_number) pairs across business units."""
+    pairs = list(dict.fromkeys(pairs))
+    qty_by_pair = _inventory_cache.get_many(pairs)
+
+    missing = [p for p in pairs if p not in qty_by_pair]
+    if missing and INVENTORY_SNAPSHOT_ENABLED:
+        snapshot = get_inventory_snapshot()
+        for bu in dict.fromkeys(bu for bu, _ in missing):
+            snap, refreshed_at = snapshot.lookup(bu, [it for b, it in missing if b == bu])
+            qty_by_pair.update({(bu, it): (qty, refreshed_at) for it, qty in snap.items()})
+        missing = [p for p in missing if p not in qty_by_pair]
+
+    if missing:
+        fetched = _fetch_bulk(missing, timeout)
+        as_of = time.time()
+        fresh = {p: (fetched.get(p, 0), as_of) for p in missing}
+        _inventory_cache.set_many(fresh)
+        qty_by_pair.update(fresh)
+    return qty_by_pair
+
+
+def _normalize_bulk_lines(lines) -> List[Tuple[str, str, str, int]]:
+    """
+    Accept [bu, item_number, required_quantity(, order_id)] sequences or
+    {"bu", "item_number", "required_quantity", "order_id"} dicts -> [(order_id, bu, item, qty)].
+    """
+    normalized = []
+    for i, line in enumerate(lines):
+        if isinstance(line, dict):
+            bu = line.get("bu") or line.get("business_unit")
+            item, required, order_id = line.get("item_number"), line.get("required_quantity"), line.get("order_id")
+        elif isinstance(line, (list, tuple)) and len(line) in (3, 4):
+            bu, item, required = line[:3]
+            order_id = line[3] if len(line) == 4 else None
+        else:
+            raise ValueError(f"line {i}: expected [bu, item_number, required_quantity(, order_id)]")
+        if not isinstance(bu, str) or not bu.strip():
+            raise ValueError(f"line {i}: bu must be a non-empty string")
+        if item is None or str(item).strip() == "":
+            raise ValueError(f"line {i}: item_number is required")
         try:
-            if jpype.isJVMStarted():
-                jpype.shutdownJVM()
-        except Exception:
-            pass
+            required = int(required)
+        except (TypeError, ValueError):
+            raise ValueError(f"line {i}: required_quantity must be an integer")
+        normalized.append(("default" if order_id is None else str(order_id), bu, str(item), required))
+    return normalized
 
 
-# ---------- tool wrapper (calls child process, then kills it) ----------
+def aidp_fdi_inventory_check_bulk_impl(lines: list, timeout: float = JDBC_QUERY_TIMEOUT) -> str:
+    """
+    Check many (bu, item_number, required_quantity[, order_id]) lines in one round trip.
+    Returns JSON {"business_units": {bu: [line, ...]}, "orders": {order_id: {"all_available", "lines"}}}.
+    """
+    if not isinstance(lines, (list, tuple)) or not lines:
+        return "Error: lines must be a non-empty list"
+    try:
+        normalized = _normalize_bulk_lines(lines)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    try:
+        qty_by_pair = _query_available_bulk([(bu, item) for _, bu, item, _ in normalized], timeout)
+    except TimeoutError as e:
+        return json.dumps({
+            "error": "timeout",
+            "message": str(e),
+            "timeout_s": timeout,
+            "business_units": list(dict.fromkeys(bu for _, bu, _, _ in normalized)),
+        })
+    except Exception as e:
+        return f"Error: {e}"
+
+    reserved_by_pair = get_allocation_ledger().reserved_many(qty_by_pair)
+    by_bu, by_order = {}, {}
+    for order_id, bu, item, required in normalized:
+        on_hand, as_of = qty_by_pair.get((bu, item), (0, None))
+        available = int(on_hand) - reserved_by_pair.get((bu, item), 0)
+        line = {
+            "order_id": order_id,
+            "item_number": item,
+            "available_quantity": available,
+            "required_quantity": required,
+            "is_available": "Yes" if available >= required else "No",
+            "business_unit": bu,
+            "as_of": _format_as_of(as_of),
+            "on_hand_quantity": int(on_hand),
+            "reserved_quantity": reserved_by_pair.get((bu, item), 0),
+        }
+        by_bu.setdefault(bu, []).append(line)
+        by_order.setdefault(order_id, {"all_available": "Yes", "lines": []})["lines"].append(line)
+        if line["is_available"] == "No":
+            by_order[order_id]["all_available"] = "No"
+    return json.dumps({"business_units": by_bu, "orders": by_order})
+
+
+def inventory_metrics() -> dict:
+    """Cache, micro-batching and snapshot counters for the inventory path."""
+    metrics = {"cache": _inventory_cache.stats(), "batching": _inventory_batcher.stats(),
+               "ledger": get_allocation_ledger().stats()}
+    if INVENTORY_SNAPSHOT_ENABLED:
+        metrics["snapshot"] = get_inventory_snapshot().stats()
+    return metrics
+
+
+# ---------- tool wrapper ----------
 @tool(description_mode="only_docstring")
 def aidp_fdi_inventory_check(
     item_numbers: List[str],
     item_required_quantity: List[int],
     bu: str,
     question: str,
+    include_breakdown: bool = False,
+    reservation_id: str = "",
 ) -> str:
     """
     Check item availability in FDI using AIDP for a LIST of item_numbers.
+    Set include_breakdown=true only when per organization/subinventory quantities are asked for.
+    Set reservation_id to the order's SourceTransactionNumber to also hold the required quantities
+    for that order until it is created (all lines or none); held lines carry "reservation_id".
+    On a slow backend the result is {"error": "timeout", ...} instead; retry with fewer items.
     Returns a JSON array with:
-      [{ "item_number": "...", "available_quantity": int, "required_quantity": int, "is_available": "Yes|No", "business_unit": "..." }, ...]
+      [{ "item_number": "...", "available_quantity": int, "required_quantity": int, "is_available": "Yes|No", "business_unit": "...", "as_of": "ISO-8601" }, ...]
+    available_quantity is on_hand_quantity minus reserved_quantity held for other in-flight orders.
+    With include_breakdown each entry also has "breakdown": {"<org_code>/<subinventory>": int}.
     """
-    q = Queue()
-    p = Process(target=_jdbc_worker, args=(item_numbers, item_required_quantity, bu, q), daemon=False)
-    p.start()
-    p.join(timeout=60)
-
-    if p.is_alive():
-        p.terminate()
-        p.join(5)
+    return aidp_fdi_inventory_check_impl(item_numbers, item_required_quantity, bu, include_breakdown,
+                                         reservation_id=reservation_id or None)
 
-    try:
-        return q.get_nowait()
-    except Exception:
-        return "Error: JDBC worker timed out"
 
 
+@tool(description_mode="only_docstring")
+def aidp_fdi_inventory_check_bulk(lines: List[Dict[str, Union[str, int]]], question: str) -> str:
+    """
+    Check item availability in FDI for several business units and/or orders in ONE call.
+    lines: [{"bu": "...", "item_number": "...", "required_quantity": int, "order_id": "..."}, ...]  (order_id optional)
+    Prefer this over repeated aidp_fdi_inventory_check calls when more than one bu or order is involved.
+    Returns JSON:
+      { "business_units": { "<bu>": [line, ...] },
+        "orders": { "<order_id>": { "all_available": "Yes|No", "lines": [line, ...] } } }
+    where each line is { "order_id", "item_number", "available_quantity", "required_quantity", "is_available", "business_unit", "as_of" }.
+    """
+    return aidp_fdi_inventory_check_bulk_impl(lines)
 
 # ---------- quick test ----------
 def test():
@@ -0,0 +1,429 @@
+# src/tools/aidp_jdbc_pool.py
+"""
+Long-lived pool of JDBC worker processes for AIDP/FDI queries.
+
+Each worker process opens its backend once (for jdbc: boots the JVM and keeps
+a warm jaydebeapi connection) and serves queries sent over its task queue.
+Callers check a worker out, push (sql, params) and receive the rows as
+columnar fetchmany chunks over a bounded queue, so an inventory check only
+pays the query time instead of JVM startup + connect, and large results
+never sit fully materialized on either side.
+"""
+import time
+import queue
+import traceback
+import atexit
+import threading
+import multiprocessing as mp
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from src.common.config import (
+    INVENTORY_BACKEND, JDBC_POOL_SIZE, JDBC_POOL_MAX_QUERIES, JDBC_POOL_HEALTH_INTERVAL, JDBC_QUERY_TIMEOUT,
+    JDBC_FETCH_SIZE, JDBC_STREAM_MAX_INFLIGHT, JDBC_CANCEL_GRACE,
+)
+from src.tools.inventory_backends import get_backend
+
+HEALTH_CHECK_SQL = "SELECT 1"
+
+
+class JdbcPoolError(RuntimeError):
+    """Raised when the pool cannot serve a query (worker error, timeout, pool closed)."""
+
+
+class JdbcTimeoutError(JdbcPoolError, TimeoutError):
+    """Raised when a query (or the wait for a free worker) exceeds its deadline."""
+
+    def __init__(self, message: str, timeout: float = 0.0, cancelled: bool = False):  # defaults: copy / pickle
+        super().__init__(message)
+        self.timeout = timeout
+        self.cancelled = cancelled  # True when the statement was cancelled and the worker kept
+
+
+# ---------- child side (runs the backend, e.g. JPype + JDBC, in the worker process) ----------
+def _close(conn) -> None:
+    if conn is None:
+        return
+    try: conn.close()
+    except Exception: pass
+
+
+_PLAIN_TYPES = (type(None), bool, int, float, str)
+
+
+def _plain_column(values) -> tuple:
+    # Java objects leaking through jaydebeapi converters are not picklable
+    return tuple(v if type(v) in _PLAIN_TYPES else str(v) for v in values)
+
+
+class _Watchdog(threading.Thread):
+    """
+    Worker-side canceller: cancels the running statement through the backend when the
+    task deadline passes or the parent sets cancel_event. The connection (and JVM) stay up.
+    """
+
+    def __init__(self, backend, cancel_event):
+        super().__init__(name="jdbc-watchdog", daemon=True)
+        self.backend = backend
+        self.cancel_event = cancel_event
+        self.conn = None
+        self.deadline: Optional[float] = None
+        self.fired = False
+        self._lock = threading.Lock()
+
+    def arm(self, conn, timeout: float) -> None:
+        with self._lock:
+            self.conn, self.deadline, self.fired = conn, time.monotonic() + timeout, False
+
+    def disarm(self) -> None:
+        with self._lock:
+            self.conn, self.deadline = None, None
+
+    def run(self) -> None:
+        while True:
+            time.sleep(0.05)
+            with self._lock:
+                if self.deadline is None or self.fired:
+                    continue
+                if self.cancel_event.is_set() or time.monotonic() >= self.deadline:
+                    self.fired = True
+                    try:
+                        self.backend.cancel(self.conn)
+                    except Exception:
+                        pass
+
+
+def _stream_query(backend, conn, sql: str, params: Sequence[Any], timeout: float, result_q, fetch_size: int) -> int:
+    """
+    Execute and stream the result set as columnar chunks: ("chunk", (col0, col1, ...)) per
+    fetchmany batch. result_q is bounded, so a slow consumer throttles the fetch loop
+    instead of the worker buffering the whole result. Returns the row count.
+    """
+    cur = None
+    try:
+        cur = backend.execute(conn, sql, tuple(params), timeout)
+        total = 0
+        while True:
+            batch = cur.fetchmany(fetch_size)
+            if not batch:
+                return total
+            total += len(batch)
+            result_q.put(("chunk", tuple(_plain_column(col) for col in zip(*batch))))
+    finally:
+        try: cur.close()
+        except Exception: pass
+        backend.finish(conn)
+
+
+def _jdbc_worker(task_q, result_q, cancel_event, backend_name: str, fetch_size: int = JDBC_FETCH_SIZE) -> None:
+    """
+    Worker process main loop.
+    task_q:       receives (sql, params, timeout) tuples, or None to exit
+    result_q:     streams ("chunk", columns)* then ("done", row_count), ("timeout", message)
+                  or ("error", message) per task
+    cancel_event: set by the parent to cancel the running statement
+    backend_name: inventory backend to connect with (see inventory_backends)
+    """
+    backend = get_backend(backend_name)
+    watchdog = _Watchdog(backend, cancel_event)
+    watchdog.start()
+    conn = None
+    try:
+        conn = backend.connect()  # warm up eagerly so the first request doesn't pay for it
+    except Exception:
+        conn = None        # retried on the first task; the error is reported there
+
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        sql, params, timeout = task
+        cancel_event.clear()
+        try:
+            if conn is None:
+                conn = backend.connect()
+            watchdog.arm(conn, timeout)
+            result_q.put(("done", _stream_query(backend, conn, sql, params, timeout, result_q, fetch_size)))
+        except Exception as e:
+            if watchdog.fired:
+                # cancelled cooperatively: the statement is gone, the connection is still good
+                result_q.put(("timeout", f"query cancelled after {timeout:.1f}s: {e}"))
+            else:
+                # drop the connection so the next task reconnects on a clean one
+                _close(conn)
+                conn = None
+                result_q.put(("error", str(e)))
+        finally:
+            watchdog.disarm()
+
+    _close(conn)
+    backend.shutdown()
+
+
+# ---------- parent side ----------
+class _Worker:
+    def __init__(self, ctx, backend_name: str):
+        self.task_q = ctx.Queue()
+        self.result_q = ctx.Queue(maxsize=JDBC_STREAM_MAX_INFLIGHT)  # backpressure on the fetch loop
+        self.cancel_event = ctx.Event()
+        self.process = ctx.Process(
+            target=_jdbc_worker, args=(self.task_q, self.result_q, self.cancel_event, backend_name), daemon=True
+        )
+        self.process.start()
+        self.queries = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self, timeout: float = 5) -> None:
+        try:
+            self.task_q.put(None)
+        except Exception:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+
+
+class JdbcWorkerPool:
+    """
+    Fixed-size pool of warm JDBC worker processes.
+
+    - backend:               inventory backend name ("jdbc" or "sqlite")
+    - size:                  number of worker processes (each holds one JVM + connection)
+    - max_queries:           recycle a worker after this many queries
+    - health_check_interval: seconds between `SELECT 1` pings of idle workers
+    - cancel_grace:          seconds to wait for a cancelled statement before killing the worker
+    Dead, failing or recycled workers are replaced transparently; timed-out queries are
+    cancelled in the worker, which stays warm.
+    """
+
+    def __init__(
+        self,
+        size: int = JDBC_POOL_SIZE,
+        max_queries: int = JDBC_POOL_MAX_QUERIES,
+        health_check_interval: float = JDBC_POOL_HEALTH_INTERVAL,
+        backend: str = INVENTORY_BACKEND,
+        cancel_grace: float = JDBC_CANCEL_GRACE,
+    ):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.backend = backend
+        self.size = size
+        self.max_queries = max_queries
+        self.health_check_interval = health_check_interval
+        self.cancel_grace = cancel_grace
+        self._ctx = mp.get_context("spawn")  # never fork a process that may host a JVM
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._stats = {"queries": 0, "errors": 0, "timeouts": 0, "cancelled": 0,
+                       "spawned": 0, "recycled": 0, "replaced": 0}
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+        self._health_thread = None
+        if health_check_interval and health_check_interval > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, name="jdbc-pool-health", daemon=True)
+            self._health_thread.start()
+
+    # ----- public API -----
+    def execute(self, sql: str, params: Sequence[Any] = (), timeout: float = JDBC_QUERY_TIMEOUT) -> List[tuple]:
+        """Run one query on a warm worker and return its rows as plain tuples."""
+        rows: List[tuple] = []
+        for columns in self.execute_columns(sql, params, timeout):
+            rows.extend(zip(*columns))
+        return rows
+
+    def execute_iter(self, sql: str, params: Sequence[Any] = (), timeout: float = JDBC_QUERY_TIMEOUT) -> Iterator[List[tuple]]:
+        """Run one query and yield its rows batch by batch (JDBC_FETCH_SIZE rows per batch)."""
+        for columns in self.execute_columns(sql, params, timeout):
+            yield list(zip(*columns))
+
+    def execute_columns(self, sql: str, params: Sequence[Any] = (), timeout: float = JDBC_QUERY_TIMEOUT) -> Iterator[tuple]:
+        """
+        Run one query and yield columnar chunks (col0_values, col1_values, ...) as the worker
+        fetches them. `timeout` bounds the whole stream; the worker stays checked out until
+        the generator is exhausted or closed.
+        """
+        return self._execute(sql, params, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+        out.update(backend=self.backend, size=self.size, idle=self._idle.qsize())
+        return out
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    # ----- internals -----
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            self._stats["spawned"] += 1
+        return _Worker(self._ctx, self.backend)
+
+    def _execute(self, sql: str, params: Sequence[Any], timeout: float) -> Iterator[tuple]:
+        if self._closed.is_set():
+            raise JdbcPoolError("JDBC pool is closed")
+        deadline = time.monotonic() + timeout
+        worker = self._checkout(deadline, timeout)
+        healthy = False
+        try:
+            # the worker enforces the deadline itself (query timeout / cancel); the parent only
+            # signals cancel_event as a backstop and kills the worker if even that goes unanswered
+            worker.task_q.put((sql, tuple(params), max(deadline - time.monotonic(), 0.001)))
+            while True:
+                status, payload = self._await_result(worker, deadline, timeout)
+                if status == "chunk":
+                    yield payload
+                    continue
+                healthy = True  # a failed query leaves the worker usable: it reconnects by itself
+                worker.queries += 1
+                with self._lock:
+                    self._stats["queries"] += 1
+                if status == "timeout":
+                    self._count("timeouts", "cancelled")
+                    raise JdbcTimeoutError(f"JDBC query timed out after {timeout}s ({payload})", timeout, cancelled=True)
+                if status == "error":
+                    self._count("errors")
+                    raise JdbcPoolError(payload)
+                return
+        finally:
+            # a stream abandoned mid-way leaves chunks in flight: healthy stays False -> replaced
+            self._checkin(worker, healthy)
+
+    def _count(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._stats[key] += 1
+
+    def _await_result(self, worker: _Worker, deadline: float, timeout: float, probe: bool = False):
+        # poll so a crashed worker is detected without waiting for the full deadline
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._cancel(worker, timeout, probe)
+            try:
+                return worker.result_q.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                if not worker.is_alive():
+                    raise JdbcPoolError("JDBC worker died while running the query")
+
+    def _cancel(self, worker: _Worker, timeout: float, probe: bool = False):
+        """Deadline passed without a final status: ask the worker to cancel and wait a grace period."""
+        worker.cancel_event.set()
+        grace_deadline = time.monotonic() + self.cancel_grace
+        while time.monotonic() < grace_deadline:
+            try:
+                status, payload = worker.result_q.get(timeout=min(grace_deadline - time.monotonic(), 0.5))
+            except queue.Empty:
+                if not worker.is_alive():
+                    break
+                continue
+            if status != "chunk":
+                # finished or cancelled in time; report it as a timeout either way, worker stays warm
+                worker.cancel_event.clear()
+                return ("timeout", payload if status != "done" else "result arrived after the deadline")
+        # unresponsive: _checkin replaces the worker (last resort, loses its JVM)
+        if not probe:
+            self._count("timeouts")
+        raise JdbcTimeoutError(f"JDBC query timed out after {timeout}s and did not cancel", timeout)
+
+    def _checkout(self, deadline: float, timeout: float) -> _Worker:
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                worker = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                self._count("timeouts")
+                raise JdbcTimeoutError(f"Timed out after {timeout}s waiting for a free JDBC worker", timeout)
+            if worker.is_alive():
+                return worker
+            self._replace(worker, "replaced")
+
+    def _checkin(self, worker: _Worker, healthy: bool) -> None:
+        if self._closed.is_set():
+            worker.stop()
+        elif not healthy or not worker.is_alive():
+            self._replace(worker, "replaced")
+        elif self.max_queries and worker.queries >= self.max_queries:
+            self._replace(worker, "recycled")
+        else:
+            self._idle.put(worker)
+
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        with self._lock:
+            self._stats[reason] += 1
+        # stop the old one off the request path; the new one starts warming immediately
+        threading.Thread(target=worker.stop, daemon=True).start()
+        self._idle.put(self._spawn())
+
+    def _probe(self) -> None:
+        """
+        `SELECT 1` on one idle worker (skipped when none is free, so probes never queue behind
+        queries); anything but a clean result replaces the worker. Not counted in stats().
+        """
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            return
+        healthy = False
+        timeout = min(self.health_check_interval, 10)
+        deadline = time.monotonic() + timeout
+        try:
+            if not worker.is_alive():
+                return
+            worker.task_q.put((HEALTH_CHECK_SQL, (), timeout))
+            while True:
+                status, _ = self._await_result(worker, deadline, timeout, probe=True)
+                if status != "chunk":
+                    healthy = status == "done"
+                    return
+        except JdbcPoolError:
+            pass  # died or did not cancel
+        finally:
+            self._checkin(worker, healthy)
+
+    def _health_loop(self) -> None:
+        while not self._closed.wait(self.health_check_interval):
+            for _ in range(self.size):
+                if self._closed.is_set():
+                    return
+                try:
+                    self._probe()
+                except Exception:
+                    traceback.print_exc()  # keep checking: one bad probe must not end the health thread
+
+
+# ---------- process-wide pool ----------
+_pool: Optional[JdbcWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_jdbc_pool() -> JdbcWorkerPool:
+    """Lazily create the shared pool (first call spawns and warms the workers)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JdbcWorkerPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def shutdown_jdbc_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -53,6 +53,19 @@ def send_email_dummy(
     body: str
     Returns a JSON string: {status, message_id, saved_path, to, subject, size_bytes}.
     """
+    return send_email_dummy_impl(to, subject, body, is_html, cc, bcc, attachments)
+
+
+def send_email_dummy_impl(
+    to: List[str],
+    subject: str,
+    body: str,
+    is_html: bool = False,
+    cc: Optional[List[str]] = None,
+    bcc: Optional[List[str]] = None,
+    attachments: Optional[List[str]] = None,
+) -> str:
+    """Plain callable that actually does the work."""
     if not to:
         raise ValueError("`to` must include at least one recipient.")
     msg_id = f"dummy-{uuid.uuid4().hex}"
@@ -0,0 +1,46 @@
+# src/tools/extraction_cache.py
+"""
+Content-addressed cache of image extraction results (normalized Transaction JSON).
+
+Keyed by sha256(image bytes) + question + model ids + preprocessing + prompt, so a resubmitted
+or retried order scan skips the vision and structuring LLM calls. Two tiers
+(src/common/tiered_cache.py):
+
+- memory: TTLCache (LRU), per process
+- disk:   SQLite (WAL) at EXTRACTION_CACHE_PATH, survives restarts and is shared
+          by all uvicorn workers on the host; least recently used rows are
+          pruned past EXTRACTION_CACHE_MAX_ROWS
+"""
+import hashlib
+import threading
+from typing import Optional
+
+from src.common.tiered_cache import TieredCache
+from src.common.config import (
+    EXTRACTION_CACHE_TTL, EXTRACTION_CACHE_MAX_ITEMS, EXTRACTION_CACHE_PATH, EXTRACTION_CACHE_MAX_ROWS,
+)
+
+
+class ExtractionCache(TieredCache):
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH, ttl: float = EXTRACTION_CACHE_TTL,
+                 maxsize: int = EXTRACTION_CACHE_MAX_ITEMS, max_rows: int = EXTRACTION_CACHE_MAX_ROWS):
+        super().__init__(path, "extraction_cache", ttl, maxsize, max_rows)
+
+    @staticmethod
+    def key(image_sha256: str, question: str, *variant: Optional[str], prompt: str = "") -> str:
+        """variant: anything else the result depends on (model ids, preprocessing settings)."""
+        parts = [image_sha256, question, *(v or "" for v in variant), hashlib.sha256(prompt.encode()).hexdigest()]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+# ---------- process-wide cache ----------
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
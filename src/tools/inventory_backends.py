@@ -0,0 +1,219 @@
+# src/tools/inventory_backends.py
+"""
+Inventory query backends used by the pooled JDBC workers.
+
+- jdbc:   JPype + Simba Spark JDBC against AIDP/FDI (production)
+- sqlite: pure-Python stand-in holding the same star schema as
+          config/inventory_check3.sql, for load tests and benchmarks
+          without FDI access (see src/utils/generate_inventory_data.py)
+
+Selected with INVENTORY_BACKEND; every backend hands back a DB-API connection
+that accepts the repo's SQL files with '?' placeholders.
+"""
+import os
+import re
+import math
+import sqlite3
+from abc import ABC, abstractmethod
+
+from src.common.config import (
+    PROJECT_ROOT, JDBC_URL, AUTH_TYPE, OCI_CONFIG_FILE, CONFIG_PROFILE,
+    INVENTORY_BACKEND, INVENTORY_SQLITE_PATH,
+)
+
+
+class InventoryBackendError(RuntimeError):
+    """Raised when a backend cannot open a connection."""
+
+
+class InventoryBackend(ABC):
+    name = ""
+
+    @abstractmethod
+    def connect(self):
+        """Open a DB-API connection (called once per worker, then kept warm)."""
+
+    def prepare_sql(self, sql: str) -> str:
+        """Adapt a repo SQL file to the backend dialect."""
+        return sql
+
+    def execute(self, conn, sql: str, params: tuple, timeout: float):
+        """Execute with a server-side deadline where the backend supports one; returns the open cursor."""
+        cur = conn.cursor()
+        cur.execute(self.prepare_sql(sql), params)
+        return cur
+
+    def cancel(self, conn) -> None:
+        """Cancel the statement currently running on `conn` (called from another thread)."""
+
+    def finish(self, conn) -> None:
+        """The task's statement is done (ran, failed or was cancelled) and its cursor closed."""
+
+    def shutdown(self) -> None:
+        """Release process-wide resources when the worker exits."""
+
+
+# ---------- jdbc (AIDP / FDI) ----------
+# jaydebeapi has no query-timeout hook, so JdbcBackend.execute runs the steps of
+# Cursor.execute itself. These two helpers are the only code touching jaydebeapi
+# internals (_close_last, _prep, _set_stmt_parms, _rs, _meta, _handle_sql_exception);
+# they mirror Cursor.execute of jaydebeapi 1.2.3 and must be re-checked on upgrade.
+def _prepare_statement(cur, sql: str, params: tuple):
+    cur._close_last()
+    cur._prep = cur._connection.jconn.prepareStatement(sql)
+    cur._set_stmt_parms(cur._prep, params)
+    return cur._prep
+
+
+def _execute_prepared(cur) -> None:
+    import jaydebeapi
+
+    try:
+        is_rs = cur._prep.execute()
+    except Exception:
+        jaydebeapi._handle_sql_exception()
+    if is_rs:
+        cur._rs = cur._prep.getResultSet()
+        cur._meta = cur._rs.getMetaData()
+        cur.rowcount = -1
+    else:
+        cur.rowcount = cur._prep.getUpdateCount()
+
+
+class JdbcBackend(InventoryBackend):
+    name = "jdbc"
+    DRIVER_CLASS = "com.simba.spark.jdbc.Driver"
+    JAR_CANDIDATES = [
+        os.path.join(PROJECT_ROOT, "config", "SparkJDBC42.jar"),
+        os.path.join(PROJECT_ROOT, "config", "SimbaSparkJDBC42.jar"),
+    ]
+
+    def connect(self):
+        import jpype, jaydebeapi
+
+        jars = [p for p in self.JAR_CANDIDATES if os.path.isfile(p)]
+        if not jars:
+            raise InventoryBackendError("JDBC jar not found at expected locations: " + ", ".join(self.JAR_CANDIDATES))
+
+        # start JVM with explicit classpath (once per worker process)
+        if not jpype.isJVMStarted():
+            jpype.startJVM(convertStrings=True, classpath=jars)
+
+        # sanity check driver
+        try:
+            _ = jpype.JClass(self.DRIVER_CLASS)
+        except Exception as e:
+            raise InventoryBackendError(
+                f"Driver class '{self.DRIVER_CLASS}' not found on classpath ({os.pathsep.join(jars)}): {e}"
+            )
+
+        props = {
+            "oracle.jdbc.authenticationMethod": AUTH_TYPE,
+            "oracle.jdbc.oci.config.file": OCI_CONFIG_FILE,
+            "oracle.jdbc.oci.profile.name": CONFIG_PROFILE,
+        }
+        return jaydebeapi.connect(self.DRIVER_CLASS, JDBC_URL, props, jars)
+
+    _active_stmt = None
+
+    def execute(self, conn, sql: str, params: tuple, timeout: float):
+        cur = conn.cursor()
+        prep = _prepare_statement(cur, self.prepare_sql(sql), params)
+        if timeout and timeout > 0:
+            # Statement.setQueryTimeout so the driver cancels the remote query itself
+            prep.setQueryTimeout(max(1, math.ceil(timeout)))
+        self._active_stmt = prep  # cancelled through here until finish(): covers the fetch loop too
+        _execute_prepared(cur)
+        return cur
+
+    def cancel(self, conn) -> None:
+        stmt = self._active_stmt
+        if stmt is not None:
+            stmt.cancel()
+
+    def finish(self, conn) -> None:
+        self._active_stmt = None
+
+    def shutdown(self) -> None:
+        try:
+            import jpype
+            if jpype.isJVMStarted():
+                jpype.shutdownJVM()
+        except Exception:
+            pass
+
+
+# ---------- sqlite (local stand-in) ----------
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dw_business_unit_d_tl (
+    business_unit_id    INTEGER PRIMARY KEY,
+    business_unit_name  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dw_internal_org_d (
+    organization_id       INTEGER PRIMARY KEY,
+    organization_code     TEXT NOT NULL,
+    inv_business_unit_id  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dw_inv_subinventory_d (
+    organization_id           INTEGER NOT NULL,
+    secondary_inventory_name  TEXT NOT NULL,
+    PRIMARY KEY (organization_id, secondary_inventory_name)
+);
+CREATE TABLE IF NOT EXISTS dw_inventory_item_d (
+    inventory_item_id  INTEGER NOT NULL,
+    organization_id    INTEGER NOT NULL,
+    item_number        TEXT NOT NULL,
+    PRIMARY KEY (inventory_item_id, organization_id)
+);
+CREATE TABLE IF NOT EXISTS dw_inv_onhand_details_cf (
+    inventory_item_id             INTEGER NOT NULL,
+    organization_id               INTEGER NOT NULL,
+    subinventory_code             TEXT NOT NULL,
+    business_unit_id              INTEGER NOT NULL,
+    primary_transaction_quantity  REAL NOT NULL,
+    last_update_date              TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_item_number        ON dw_inventory_item_d (item_number, organization_id);
+CREATE INDEX IF NOT EXISTS ix_bu_name            ON dw_business_unit_d_tl (business_unit_name);
+CREATE INDEX IF NOT EXISTS ix_onhand_item_org    ON dw_inv_onhand_details_cf (inventory_item_id, organization_id);
+CREATE INDEX IF NOT EXISTS ix_onhand_item_bu     ON dw_inv_onhand_details_cf (inventory_item_id, business_unit_id);
+CREATE INDEX IF NOT EXISTS ix_onhand_last_update ON dw_inv_onhand_details_cf (last_update_date);
+"""
+
+# AIDP three-part names -> plain SQLite table names
+_CATALOG_PREFIX = re.compile(r"\bfdi_idl_catalog\.default\.", re.IGNORECASE)
+
+
+class SqliteBackend(InventoryBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str = INVENTORY_SQLITE_PATH):
+        self.path = path
+
+    def connect(self):
+        if not os.path.isfile(self.path):
+            raise InventoryBackendError(
+                f"SQLite inventory database not found: {self.path} "
+                "(create one with: python -m src.utils.generate_inventory_data)"
+            )
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def prepare_sql(self, sql: str) -> str:
+        return _CATALOG_PREFIX.sub("", sql)
+
+    def cancel(self, conn) -> None:
+        # no deadline of its own: the worker's watchdog interrupts at the task deadline and
+        # reports the timeout (an own deadline would surface as a plain "interrupted" error)
+        conn.interrupt()
+
+
+_BACKENDS = {JdbcBackend.name: JdbcBackend, SqliteBackend.name: SqliteBackend}
+
+
+def get_backend(name: str = INVENTORY_BACKEND) -> InventoryBackend:
+    try:
+        return _BACKENDS[name.lower()]()
+    except KeyError:
+        raise InventoryBackendError(f"Unknown INVENTORY_BACKEND '{name}' (expected one of: {', '.join(_BACKENDS)})")
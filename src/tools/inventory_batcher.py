@@ -0,0 +1,147 @@
+# src/tools/inventory_batcher.py
+"""
+Cross-request micro-batching of inventory lookups.
+
+Concurrent callers asking for items of the same business unit within a short
+window are coalesced: the first caller (leader) waits `window_s`, then sends
+one query with the merged IN-list and every caller picks its own items from
+the shared result.
+"""
+import copy
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+FLUSH_WORKERS = 4  # concurrent queries for the batches a large request is split into
+
+
+class _Batch:
+    def __init__(self):
+        self.items: Dict[str, None] = {}      # ordered set
+        self.callers = 0
+        self.full = threading.Event()         # leader flushes early when set
+        self.done = threading.Event()
+        self.deadline = 0.0                   # latest caller deadline; the shared query may run until then
+        self.result: Optional[Dict[str, int]] = None
+        self.error: Optional[BaseException] = None
+
+
+def _fresh(error: BaseException) -> BaseException:
+    """
+    A copy of a batch's exception (same type, args and attributes) for one caller: every
+    caller raising the shared instance from its own thread would interleave their tracebacks.
+    """
+    try:
+        return copy.copy(error)
+    except Exception:  # an exception type that cannot be rebuilt from its args
+        return (TimeoutError if isinstance(error, TimeoutError) else RuntimeError)(str(error))
+
+
+class InventoryBatcher:
+    """
+    fetch_fn(bu, items, timeout) -> {item_number: available_quantity}
+    window_s:  how long the leader waits for more callers (<= 0 disables batching)
+    max_items: a batch is closed and flushed once its merged IN-list reaches this size;
+               a request for more items is split across several batches
+    """
+
+    def __init__(self, fetch_fn: Callable[[str, List[str], float], Dict[str, int]], window_s: float = 0.02, max_items: int = 500):
+        self.fetch_fn = fetch_fn
+        self.window_s = window_s
+        self.max_items = max_items
+        self._pending: Dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None  # flushes the extra batches of a split request
+        self._stats = {"requests": 0, "batches": 0, "items": 0, "max_batch_items": 0,
+                       "max_batch_callers": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def fetch(self, bu: str, items: List[str], timeout: float) -> Dict[str, int]:
+        """Raises TimeoutError when no result arrives within `timeout` seconds."""
+        if self.window_s <= 0:
+            return self.fetch_fn(bu, list(items), timeout)
+
+        started = time.monotonic()
+        deadline = started + timeout
+        joined: List[_Batch] = []   # batches holding this caller's items, in order
+        led: List[_Batch] = []      # the ones this caller opened and must flush
+        with self._lock:
+            for item in dict.fromkeys(items):
+                batch = self._pending.get(bu)
+                if batch is None:
+                    batch = self._pending[bu] = _Batch()
+                    led.append(batch)
+                if not joined or joined[-1] is not batch:
+                    joined.append(batch)
+                    batch.callers += 1
+                    batch.deadline = max(batch.deadline, deadline)
+                batch.items[item] = None
+                if len(batch.items) >= self.max_items:
+                    # close it here, under the lock: nobody can add past max_items, the rest goes to a new batch
+                    del self._pending[bu]
+                    batch.full.set()
+
+        # full batches flush at once and in parallel; the caller itself flushes its last one
+        for batch in led[:-1]:
+            self._flusher().submit(self._flush, bu, batch)
+        if led:
+            self._flush(bu, led[-1])
+        for batch in joined:
+            if not batch.done.wait(max(deadline - time.monotonic(), 0.0)):
+                self._record_wait((time.monotonic() - started) * 1000)
+                raise TimeoutError(f"Inventory query exceeded {timeout:g}s (still running for other callers)")
+
+        self._record_wait((time.monotonic() - started) * 1000)
+        found: Dict[str, int] = {}
+        for batch in joined:
+            if batch.error is not None:
+                raise _fresh(batch.error) from batch.error
+            found.update(batch.result)
+        return {it: found.get(it, 0) for it in items}
+
+    def _flusher(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=FLUSH_WORKERS, thread_name_prefix="inventory-batch")
+            return self._executor
+
+    def _flush(self, bu: str, batch: _Batch) -> None:
+        """Leader side: wait for the window (or a full batch), close it and run the merged query."""
+        batch.full.wait(self.window_s)
+        with self._lock:
+            # close the batch: later callers start a new one
+            if self._pending.get(bu) is batch:
+                del self._pending[bu]
+        try:
+            batch.result = self.fetch_fn(bu, list(batch.items), max(batch.deadline - time.monotonic(), 0.0))
+        except BaseException as e:
+            batch.error = e
+        finally:
+            self._record(batch)
+            batch.done.set()
+
+    def _record(self, batch: _Batch) -> None:
+        with self._lock:
+            s = self._stats
+            s["batches"] += 1
+            s["items"] += len(batch.items)
+            s["max_batch_items"] = max(s["max_batch_items"], len(batch.items))
+            s["max_batch_callers"] = max(s["max_batch_callers"], batch.callers)
+
+    def _record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            s = self._stats
+            s["requests"] += 1
+            s["wait_ms_total"] += wait_ms
+            s["wait_ms_max"] = max(s["wait_ms_max"], wait_ms)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            s = dict(self._stats)
+        batches, requests = s["batches"] or 1, s["requests"] or 1
+        s["avg_batch_items"] = round(s["items"] / batches, 2)
+        s["avg_callers_per_batch"] = round(s["requests"] / batches, 2)
+        s["avg_wait_ms"] = round(s.pop("wait_ms_total") / requests, 2)
+        s["wait_ms_max"] = round(s["wait_ms_max"], 2)
+        s["window_ms"] = self.window_s * 1000
+        return s
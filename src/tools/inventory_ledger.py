@@ -0,0 +1,178 @@
+# src/tools/inventory_ledger.py
+"""
+Process-wide soft-allocation ledger layered over the inventory results.
+
+FDI on-hand only drops once Fusion has booked an order and AIDP has picked it
+up, so two orders checked at the same moment would both see the full
+quantity. The ledger holds the quantities of in-flight orders per
+(business_unit, item_number) and availability is answered as
+on_hand - reserved. Holds are released when the create fails, or expire
+after a TTL; a successful create keeps its hold for `commit_hold` seconds so
+the quantity stays subtracted until FDI reflects the order.
+"""
+import time
+import heapq
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.common.config import INVENTORY_RESERVATION_TTL, INVENTORY_RESERVATION_COMMIT_HOLD
+
+Key = Tuple[str, str]  # (business_unit, item_number)
+
+
+@dataclass
+class Reservation:
+    lines: Dict[Key, int]
+    expires_at: float
+    committed: bool = False
+    version: int = 0
+
+
+class AllocationLedger:
+    """
+    - ttl:         seconds an unconfirmed reservation is held
+    - commit_hold: seconds a committed reservation is still held (0 drops it on commit)
+
+    Running totals per key keep available()/reserved() O(1); expired holds are
+    dropped lazily from a min-heap on every call, under one lock.
+    """
+
+    def __init__(self, ttl: float = INVENTORY_RESERVATION_TTL, commit_hold: float = INVENTORY_RESERVATION_COMMIT_HOLD):
+        self.ttl = ttl
+        self.commit_hold = commit_hold
+        self._lock = threading.Lock()
+        self._reserved: Dict[Key, int] = {}
+        self._reservations: Dict[str, Reservation] = {}
+        self._expiry: List[Tuple[float, int, str]] = []  # (expires_at, version, reservation_id)
+        self._version = 0
+        self._stats = {"reserved": 0, "rejected": 0, "released": 0, "committed": 0, "expired": 0}
+
+    # ----- internals (lock held) -----
+    def _purge(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, version, reservation_id = heapq.heappop(self._expiry)
+            reservation = self._reservations.get(reservation_id)
+            if reservation is not None and reservation.version == version:  # else superseded
+                self._drop(reservation_id)
+                self._stats["expired"] += 1
+
+    def _drop(self, reservation_id: str) -> Optional[Reservation]:
+        reservation = self._reservations.pop(reservation_id, None)
+        if reservation is not None:
+            for key, qty in reservation.lines.items():
+                left = self._reserved[key] - qty
+                if left > 0:
+                    self._reserved[key] = left
+                else:
+                    del self._reserved[key]
+        return reservation
+
+    def _schedule(self, reservation_id: str, reservation: Reservation, ttl: float) -> None:
+        self._version += 1
+        reservation.version = self._version
+        reservation.expires_at = time.monotonic() + ttl
+        heapq.heappush(self._expiry, (reservation.expires_at, reservation.version, reservation_id))
+
+    # ----- reads -----
+    def reserved(self, bu: str, item: str) -> int:
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._reserved.get((bu, item), 0)
+
+    def available(self, bu: str, item: str, on_hand: int) -> int:
+        """on_hand - reserved for one (bu, item)."""
+        return on_hand - self.reserved(bu, item)
+
+    def reserved_many(self, keys) -> Dict[Key, int]:
+        with self._lock:
+            self._purge(time.monotonic())
+            return {key: self._reserved.get(key, 0) for key in keys}
+
+    # ----- writes -----
+    def reserve(
+        self,
+        reservation_id: str,
+        lines: Dict[Key, int],
+        on_hand: Optional[Dict[Key, int]] = None,
+        ttl: Optional[float] = None,
+    ) -> Tuple[bool, Dict[Key, int]]:
+        """
+        Hold `lines` ({(bu, item): qty}) under `reservation_id`, replacing any earlier hold with that id.
+
+        With `on_hand`, the hold is all-or-nothing: it is only taken if every line fits into
+        on_hand - reserved-by-others. Without it the hold is unconditional (order already decided).
+        Returns (held, {(bu, item): available before this hold}).
+        """
+        lines = {key: int(qty) for key, qty in lines.items() if int(qty) > 0}
+        with self._lock:
+            self._purge(time.monotonic())
+            previous = self._reservations.get(reservation_id)
+            own = previous.lines if previous is not None else {}
+            available = {
+                key: (on_hand or {}).get(key, 0) - (self._reserved.get(key, 0) - own.get(key, 0))
+                for key in lines
+            }
+            if on_hand is not None and any(qty > available[key] for key, qty in lines.items()):
+                self._stats["rejected"] += 1
+                return False, available
+
+            self._drop(reservation_id)
+            reservation = Reservation(lines=lines, expires_at=0.0)
+            for key, qty in lines.items():
+                self._reserved[key] = self._reserved.get(key, 0) + qty
+            self._reservations[reservation_id] = reservation
+            self._schedule(reservation_id, reservation, self.ttl if ttl is None else ttl)
+            self._stats["reserved"] += 1
+            return True, available
+
+    def release(self, reservation_id: str) -> bool:
+        """Give the quantities back (e.g. the create failed)."""
+        with self._lock:
+            released = self._drop(reservation_id) is not None
+            if released:
+                self._stats["released"] += 1
+            return released
+
+    def commit(self, reservation_id: str) -> bool:
+        """The order was created: keep the hold for `commit_hold` seconds, then let it lapse."""
+        with self._lock:
+            self._purge(time.monotonic())
+            reservation = self._reservations.get(reservation_id)
+            if reservation is None:
+                return False
+            if self.commit_hold <= 0:
+                self._drop(reservation_id)
+            else:
+                reservation.committed = True
+                self._schedule(reservation_id, reservation, self.commit_hold)
+            self._stats["committed"] += 1
+            return True
+
+    def get(self, reservation_id: str) -> Optional[Reservation]:
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._reservations.get(reservation_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._purge(time.monotonic())
+            s = dict(self._stats)
+            s["active"] = len(self._reservations)
+            s["committed_active"] = sum(1 for r in self._reservations.values() if r.committed)
+            s["keys"] = len(self._reserved)
+            s["units"] = sum(self._reserved.values())
+            return s
+
+
+# ---------- process-wide ledger ----------
+_ledger: Optional[AllocationLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_allocation_ledger() -> AllocationLedger:
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = AllocationLedger()
+        return _ledger
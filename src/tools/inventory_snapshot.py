@@ -0,0 +1,196 @@
+# src/tools/inventory_snapshot.py
+"""
+Optional local snapshot of FDI on-hand totals.
+
+A background thread pulls the on-hand data behind inventory_check3.sql into a
+local SQLite file on a schedule (one full load, then incremental refreshes
+driven by the max last_update_date seen so far). aidp_fdi_inventory_check
+answers from it and only goes to live AIDP for stale or missing keys.
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.common.config import (
+    PROJECT_ROOT, INVENTORY_SNAPSHOT_PATH, INVENTORY_SNAPSHOT_REFRESH_INTERVAL,
+    INVENTORY_SNAPSHOT_MAX_AGE, INVENTORY_SNAPSHOT_FULL_REFRESH_EVERY, INVENTORY_SNAPSHOT_REFRESH_TIMEOUT,
+)
+from src.tools.aidp_jdbc_pool import get_jdbc_pool
+
+FULL_SQL_PATH = os.path.join(PROJECT_ROOT, "config", "inventory_snapshot_full.sql")
+DELTA_SQL_PATH = os.path.join(PROJECT_ROOT, "config", "inventory_snapshot_delta.sql")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS onhand_snapshot (
+    business_unit_name  TEXT    NOT NULL,
+    item_number         TEXT    NOT NULL,
+    available_quantity  INTEGER NOT NULL,
+    last_update_date    TEXT,
+    PRIMARY KEY (business_unit_name, item_number)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshot_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT = """
+INSERT INTO onhand_snapshot (business_unit_name, item_number, available_quantity, last_update_date)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (business_unit_name, item_number) DO UPDATE SET
+    available_quantity = excluded.available_quantity,
+    last_update_date   = excluded.last_update_date
+"""
+
+
+class InventorySnapshot:
+    """
+    SQLite-backed (business_unit_name, item_number) -> available_quantity store.
+
+    - refresh_interval: seconds between scheduled refreshes
+    - max_age:          snapshot older than this (since last successful refresh) is treated as stale
+    - full_every:       every Nth refresh reloads everything (catches deleted on-hand rows)
+    """
+
+    def __init__(
+        self,
+        path: str = INVENTORY_SNAPSHOT_PATH,
+        refresh_interval: float = INVENTORY_SNAPSHOT_REFRESH_INTERVAL,
+        max_age: float = INVENTORY_SNAPSHOT_MAX_AGE,
+        full_every: int = INVENTORY_SNAPSHOT_FULL_REFRESH_EVERY,
+    ):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.full_every = full_every
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refreshes = 0
+        self.last_error: Optional[str] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    # ----- reads -----
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM snapshot_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        """Epoch seconds of the last successful refresh (full or incremental)."""
+        value = self._meta("refreshed_at")
+        return float(value) if value else None
+
+    def is_fresh(self) -> bool:
+        refreshed_at = self.refreshed_at
+        return refreshed_at is not None and (time.time() - refreshed_at) <= self.max_age
+
+    def lookup(self, bu: str, items: Iterable[str]) -> Tuple[Dict[str, int], Optional[float]]:
+        """
+        Return ({item_number: available_quantity}, refreshed_at) for the keys present in a fresh snapshot.
+        A stale snapshot answers nothing, so every key falls back to live AIDP.
+        """
+        refreshed_at = self.refreshed_at
+        if refreshed_at is None or (time.time() - refreshed_at) > self.max_age:
+            return {}, refreshed_at
+        items = list(items)
+        rows = self._conn().execute(
+            "SELECT item_number, available_quantity FROM onhand_snapshot "
+            f"WHERE business_unit_name = ? AND item_number IN ({', '.join(['?'] * len(items))})",
+            (bu, *items),
+        ).fetchall() if items else []
+        return {str(it): int(qty) for it, qty in rows}, refreshed_at
+
+    # ----- refresh -----
+    def refresh(self, full: bool = False) -> int:
+        """Pull on-hand totals from AIDP; incremental unless `full` or no watermark yet. Returns rows applied."""
+        with self._write_lock:
+            watermark = self._meta("watermark")
+            full = full or watermark is None
+            sql_path = FULL_SQL_PATH if full else DELTA_SQL_PATH
+            sql = open(sql_path, "r").read()
+            params = () if full else (watermark,)
+            started = time.time()
+            applied = 0
+            new_watermark = watermark
+
+            # stream chunk by chunk into one write transaction; readers keep seeing the old
+            # snapshot (WAL) until commit and the full result never sits in memory at once
+            conn = self._conn()
+            with conn:
+                if full:
+                    conn.execute("DELETE FROM onhand_snapshot")
+                for rows in get_jdbc_pool().execute_iter(sql, params, timeout=INVENTORY_SNAPSHOT_REFRESH_TIMEOUT):
+                    # rows expected as: (business_unit_name, item_number, available_quantity, last_update_date)
+                    records = [
+                        (str(r[0]), str(r[1]), int(float(r[2])) if r[2] is not None else 0,
+                         None if r[3] is None else str(r[3]))
+                        for r in rows
+                    ]
+                    conn.executemany(_UPSERT, records)
+                    applied += len(records)
+                    chunk_max = max((r[3] for r in records if r[3] is not None), default=None)
+                    if chunk_max is not None and (new_watermark is None or chunk_max > new_watermark):
+                        new_watermark = chunk_max
+                meta = {"refreshed_at": repr(started), "watermark": new_watermark}
+                conn.executemany(
+                    "INSERT OR REPLACE INTO snapshot_meta (key, value) VALUES (?, ?)",
+                    [(k, v) for k, v in meta.items() if v is not None],
+                )
+            return applied
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            full = self.full_every > 0 and self._refreshes % self.full_every == 0 and self._refreshes > 0
+            try:
+                self.refresh(full=full)
+                self._refreshes += 1
+                self.last_error = None
+            except Exception as e:
+                # keep serving the previous snapshot; it goes stale after max_age and live takes over
+                self.last_error = str(e)
+                print(f"Inventory snapshot refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="inventory-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, object]:
+        count = self._conn().execute("SELECT COUNT(*) FROM onhand_snapshot").fetchone()[0]
+        return {"path": self.path, "rows": count, "refreshed_at": self.refreshed_at,
+                "watermark": self._meta("watermark"), "fresh": self.is_fresh(),
+                "refreshes": self._refreshes, "last_error": self.last_error}
+
+
+# ---------- process-wide snapshot ----------
+_snapshot: Optional[InventorySnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_inventory_snapshot() -> InventorySnapshot:
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = InventorySnapshot()
+        return _snapshot
@@ -6,8 +6,15 @@ from wayflowcore.tools import tool
 from wayflowcore.executors.executionstatus import UserMessageRequestStatus
 
 from src.llm.oci_genai_vision import initialize_llm_vision
+from src.common.idempotency import IdempotentCalls, IdempotencyConflictError, payload_fingerprint
 from src.common.config import *
 
+# one Fusion POST per SourceTransactionNumber, even when the agent calls the tool twice or a request is retried;
+# the same number with a different payload raises IdempotencyConflictError instead of replaying
+_fusion_posts = IdempotentCalls(
+    maxsize=IDEMPOTENCY_MAX_ITEMS, ttl=IDEMPOTENCY_TTL, cacheable=lambda response: response.startswith("Response:")
+)
+
 # ---------- tool wrapper ----------
 @tool(description_mode="only_docstring")
 def create_order(payload: str) -> str:
@@ -16,10 +23,26 @@ def create_order(payload: str) -> str:
     :param payload str:
     :return: Fusion JSON string response
     """
-    return create_order_impl(payload)
+    try:
+        return create_order_impl(payload)
+    except IdempotencyConflictError as e:
+        return f"Error: {e}"
+
+def _source_transaction_number(payload):
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return None
+    return payload.get("SourceTransactionNumber") if isinstance(payload, dict) else None
 
 def create_order_impl(payload: str) -> str:
     """Plain callable that actually does the work."""
+    response, _ = _fusion_posts.run(_source_transaction_number(payload), lambda: _post_order(payload),
+                                    fingerprint=payload_fingerprint(payload))
+    return response
+
+def _post_order(payload) -> str:
     try:
 
         headers = {
@@ -1,50 +1,109 @@
 # --- imports minimal ---
 import base64, json
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 from wayflowcore.agent import Agent
 from wayflowcore.tools import tool
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from src.llm.oci_genai_vision import initialize_llm_vision
-from src.llm.oci_genai_structured_output import initialize_llm_so
+from src.llm.registry import get_vision_llm, get_structured_llm
 from src.data.sales_order import Transaction
-
-# ---------- tiny utility (not a JSON helper) ----------
-def _encode_image_as_base64(file_path: str) -> str:
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+from src.common.blobs import read_bytes, sha256_hex
+from src.common.config import MODEL_ID, MODEL_ID_VISION, DOCUMENT_PAGE_CONCURRENCY
+from src.tools.extraction_cache import get_extraction_cache
+from src.llm.llm_cache import cache_bypassed
+from src.utils.intake_normalizer import local_orders
+from src.utils.document_pages import split_pages
+from src.utils.image_preprocess import preprocess_image, SIGNATURE as PREPROCESS_SIGNATURE
 
 # ---------- tool wrapper ----------
 @tool(description_mode="only_docstring")
 def image_to_text(file_path: str, question: str) -> str:
     """
-    Convert an order image to structured JSON using a vision LLM,
-    then normalize with a structured LLM (Transaction schema).
-    Always returns a JSON string.
+    Convert an order image or document (multi-page PDF/TIFF) to structured JSON
+    using a vision LLM, normalized to the Transaction schema.
+    Always returns a JSON string: one Transaction object, or a list of them
+    when the document holds several orders.
     """
     return image_to_text_impl(file_path, question)
 
-def image_to_text_impl(file_path: str, question: str) -> str:
-    """
-    Fast path:
-    1) Vision LLM: produce structured text (it may include extra prose).
-    2) Structured LLM: normalize to Transaction and emit ONLY JSON.
-    3) Return JSON string (no heavy helper logic).
-    """
-    # 1) Vision call
-    image_b64 = _encode_image_as_base64(file_path)
-    vision_msgs = [
-        SystemMessage(
-            content=(
-                """
+_VISION_PROMPT = """
                 "Extract all order information with this schema:\n"
                 "BillToCustomer - Name, BusinessUnit \n"
                 "OrderItems - Item: {}, Quantity: {}, RequestedDate: {}\n"
                 "Return only JSON."
+                "If the page holds several orders, return a JSON list with one object per order."
                 "If BusinessUnit is empty, than replace by 'US-1 Business Unit'"
                 """
-            )
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+def _pages_executor() -> ThreadPoolExecutor:
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ThreadPoolExecutor(max_workers=DOCUMENT_PAGE_CONCURRENCY, thread_name_prefix="vision-page")
+        return _page_pool
+
+def image_to_text_impl(file_path: str, question: str) -> str:
+    """
+    Cached by document content + question + model ids: a resubmitted scan returns the
+    stored Transaction JSON without any LLM call. Otherwise:
+    1) Split the document into pages; pages are extracted concurrently.
+    2) Per page, vision LLM: produce structured text (it may include extra prose).
+    3) Normalize to Transaction locally (JSON repair + schema validation);
+       structured LLM only if that fails.
+    4) Merge continuation pages into the order they continue; return one
+       Transaction JSON, or a JSON list for several orders.
+    """
+    document = read_bytes(file_path)
+    cache = get_extraction_cache()
+    key = cache.key(sha256_hex(document), question, MODEL_ID_VISION, MODEL_ID, PREPROCESS_SIGNATURE, prompt=_VISION_PROMPT)
+    cached = None if cache_bypassed() else cache.get(key)  # Cache-Control: no-cache re-extracts (and refreshes)
+    if cached is not None:
+        return cached
+
+    pages = split_pages(document)
+    if len(pages) == 1:
+        per_page = [_extract_page(pages[0], question)]
+    else:
+        context = contextvars.copy_context()  # e.g. the caller's LLM cache bypass
+        per_page = list(_pages_executor().map(lambda page: context.copy().run(_extract_page, page, question), pages))
+    orders = _merge_pages(per_page)
+    result = json.dumps(orders[0] if len(orders) == 1 else orders, ensure_ascii=False)
+    if orders:  # a document nothing was read from is retried, not replayed
+        cache.set(key, result)
+    return result
+
+def _merge_pages(per_page: List[List[Tuple[Dict, bool]]]) -> List[Dict]:
+    """Orders in document order; an order without customer (an item-only page) extends the previous one."""
+    orders = []
+    for page in per_page:
+        for order, has_customer in page:
+            if orders and not has_customer:
+                previous = orders[-1]
+                offset = len(previous.get("lines") or [])
+                for i, line in enumerate(order.get("lines") or [], start=offset + 1):
+                    if line.get("SourceTransactionLineId") is not None:
+                        line["SourceTransactionLineId"] = line["SourceTransactionLineNumber"] = str(i)
+                    previous.setdefault("lines", []).append(line)
+            else:
+                orders.append(order)
+    return [order for order in orders if order.get("lines")]
+
+def _extract_page(image: bytes, question: str) -> List[Tuple[Dict, bool]]:
+    """[(transaction_dict, has_customer)] for the orders on one page."""
+    # 1) Vision call, on a downscaled grayscale JPEG
+    image, _ = preprocess_image(image)  # per-image reports are aggregated in preprocess_stats()
+    image_b64 = base64.b64encode(image).decode("utf-8")
+    vision_msgs = [
+        SystemMessage(
+            content=(_VISION_PROMPT)
         ),
         HumanMessage(
             content=[
@@ -53,22 +112,20 @@ def image_to_text_impl(file_path: str, question: str) -> str:
             ]
         ),
     ]
-    vision_llm = initialize_llm_vision()
-    vision_resp = vision_llm.invoke(vision_msgs)
-    #vision_text = str(getattr(vision_resp, "content", vision_resp))
-
-    # 2) Structured normalization (no local JSON parsing)
-    so_llm = initialize_llm_so().with_structured_output(Transaction)
-    normalized = so_llm.invoke(vision_resp.content)
-
-    # 3) Return as JSON string (minimal conversion only)
-    if isinstance(normalized, (dict, list)):
-        return json.dumps(normalized, ensure_ascii=False)
-    # Some SDKs return BaseModel-like objects; try model_dump if present, else str
-    dump_fn = getattr(normalized, "model_dump", None)
-    if callable(dump_fn):
-        return json.dumps(dump_fn(), ensure_ascii=False)
-    return str(normalized)
+    vision_resp = get_vision_llm().invoke(vision_msgs)
+
+    # 2) Local normalization; the structured LLM only runs when the vision text can't be parsed
+    orders = local_orders(vision_resp.content)
+    if orders is not None:
+        return orders
+    normalized = get_structured_llm(Transaction).invoke(vision_resp.content)
+
+    # Some SDKs return BaseModel-like objects rather than dicts
+    if not isinstance(normalized, dict):
+        normalized = normalized.model_dump()
+    if not any(line.get("ProductNumber") for line in normalized.get("lines") or []):
+        return []  # blank or unreadable page
+    return [(normalized, True)]
 
 # ---------- quick test ----------
 def test():
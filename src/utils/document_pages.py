@@ -0,0 +1,101 @@
+# src/utils/document_pages.py
+"""
+Split an uploaded order document into page images for the vision model.
+
+- PDF:            each page rasterized at DOCUMENT_RASTER_DPI (needs pypdfium2)
+- multi-page TIFF: each frame (needs Pillow)
+- anything else:   a single page, passed through untouched
+
+At most DOCUMENT_MAX_PAGES pages are returned.
+"""
+import io
+from typing import List
+
+from src.common.config import DOCUMENT_MAX_PAGES, DOCUMENT_RASTER_DPI
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency
+    Image = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional dependency
+    pdfium = None
+
+
+class DocumentError(ValueError):
+    """The document cannot be split into pages."""
+
+
+class UnsupportedDocumentError(DocumentError):
+    """The document type needs an optional package that is not installed."""
+
+
+def is_pdf(data: bytes) -> bool:
+    return data[:1024].lstrip().startswith(b"%PDF")
+
+
+def _jpeg(img) -> bytes:
+    out = io.BytesIO()
+    img.convert("RGB").save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def _open_pdf(data: bytes):
+    if pdfium is None or Image is None:
+        raise UnsupportedDocumentError("PDF input needs the optional pypdfium2 and Pillow packages")
+    try:
+        return pdfium.PdfDocument(data)
+    except Exception as e:
+        raise DocumentError(f"unreadable PDF: {e}") from e
+
+
+def check_document(data: bytes) -> None:
+    """Raise DocumentError now for a document split_pages could not handle (checked at upload)."""
+    if is_pdf(data):
+        pdf = _open_pdf(data)
+        try:
+            if len(pdf) == 0:
+                raise DocumentError("PDF has no pages")
+        finally:
+            pdf.close()
+
+
+def _pdf_pages(data: bytes, max_pages: int, dpi: int) -> List[bytes]:
+    pdf = _open_pdf(data)
+    try:
+        pages = []
+        for index in range(min(len(pdf), max_pages)):
+            page = pdf[index]
+            try:
+                pages.append(_jpeg(page.render(scale=dpi / 72).to_pil()))
+            finally:
+                page.close()
+        return pages
+    finally:
+        pdf.close()
+
+
+def _image_frames(data: bytes, max_pages: int) -> List[bytes]:
+    if Image is None:
+        return [data]
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            frames = getattr(img, "n_frames", 1)
+            if frames <= 1:
+                return [data]
+            pages = []
+            for index in range(min(frames, max_pages)):
+                img.seek(index)
+                pages.append(_jpeg(img))
+            return pages
+    except Exception:
+        return [data]  # not something Pillow reads; let the vision model try the raw bytes
+
+
+def split_pages(data: bytes, max_pages: int = DOCUMENT_MAX_PAGES, dpi: int = DOCUMENT_RASTER_DPI) -> List[bytes]:
+    """Page images (JPEG, or the original bytes for a single-page image) in document order."""
+    if is_pdf(data):
+        return _pdf_pages(data, max_pages, dpi)
+    return _image_frames(data, max_pages)
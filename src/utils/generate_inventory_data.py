@@ -0,0 +1,140 @@
+# src/utils/generate_inventory_data.py
+"""
+Synthetic FDI inventory data for the sqlite inventory backend.
+
+Builds the star schema queried by config/inventory_check3.sql
+(dw_inventory_item_d, dw_inv_onhand_details_cf, ...) in a local SQLite file
+and fills it with reproducible random on-hand rows, then optionally runs a
+throughput benchmark of the inventory path against it.
+
+    python -m src.utils.generate_inventory_data --rows 2000000
+    INVENTORY_BACKEND=sqlite python -m src.utils.generate_inventory_data --bench --skip-generate
+"""
+import os
+import time
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+from src.common.config import INVENTORY_SQLITE_PATH
+from src.tools.inventory_backends import SQLITE_SCHEMA
+
+BUSINESS_UNITS = ["US1 Business Unit", "EMEA1 Business Unit", "APAC1 Business Unit"]
+HOT_SKUS = ["AS6647431", "AS6647432", "AS6647433"]
+SUBINVENTORIES = ["Stores", "FGI", "RIP", "Staging"]
+ORG_CODES = ["002", "003", "004"]  # inventory_check3.sql only reads org '002'
+
+
+def _onhand_rows(n_rows: int, item_ids: List[int], orgs: List[Tuple[int, int]], rng: random.Random) -> Iterator[tuple]:
+    base = datetime(2025, 1, 1)
+    for _ in range(n_rows):
+        org_id, bu_id = rng.choice(orgs)
+        yield (
+            rng.choice(item_ids),
+            org_id,
+            rng.choice(SUBINVENTORIES),
+            bu_id,
+            float(rng.randint(0, 500)),
+            (base + timedelta(minutes=rng.randint(0, 60 * 24 * 300))).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+def generate(path: str = INVENTORY_SQLITE_PATH, n_items: int = 50_000, n_rows: int = 1_000_000, seed: int = 42) -> str:
+    """(Re)create the SQLite star schema at `path` with `n_items` SKUs and `n_rows` on-hand rows."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(SQLITE_SCHEMA)
+
+    with conn:
+        bus = [(300000046987012 + i, name) for i, name in enumerate(BUSINESS_UNITS)]
+        conn.executemany("INSERT INTO dw_business_unit_d_tl VALUES (?, ?)", bus)
+
+        orgs = []  # (organization_id, business_unit_id)
+        for b, (bu_id, _) in enumerate(bus):
+            for o, code in enumerate(ORG_CODES):
+                org_id = 300000047000000 + b * 100 + o
+                orgs.append((org_id, bu_id))
+                conn.execute("INSERT INTO dw_internal_org_d VALUES (?, ?, ?)", (org_id, code, bu_id))
+                conn.executemany("INSERT INTO dw_inv_subinventory_d VALUES (?, ?)",
+                                 [(org_id, sub) for sub in SUBINVENTORIES])
+
+        skus = HOT_SKUS + [f"AS{6700000 + i}" for i in range(max(n_items - len(HOT_SKUS), 0))]
+        item_ids = [100000000 + i for i in range(len(skus))]
+        conn.executemany(
+            "INSERT INTO dw_inventory_item_d VALUES (?, ?, ?)",
+            ((item_id, org_id, sku) for item_id, sku in zip(item_ids, skus) for org_id, _ in orgs),
+        )
+
+        conn.executemany("INSERT INTO dw_inv_onhand_details_cf VALUES (?, ?, ?, ?, ?, ?)",
+                         _onhand_rows(n_rows, item_ids, orgs, rng))
+    conn.execute("ANALYZE")
+    conn.close()
+    return path
+
+
+def benchmark(requests: int = 200, items_per_request: int = 20, concurrency: int = 8, seed: int = 7) -> dict:
+    """Run `requests` inventory checks through aidp_fdi_inventory_check_impl and report throughput/latency."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.tools.aidp_fdi_inventory_check_tools import aidp_fdi_inventory_check_impl, inventory_metrics
+
+    rng = random.Random(seed)
+    sku_space = HOT_SKUS + [f"AS{6700000 + i}" for i in range(1000)]
+    payloads = [
+        (rng.sample(sku_space, items_per_request), [rng.randint(1, 300)] * items_per_request, rng.choice(BUSINESS_UNITS))
+        for _ in range(requests)
+    ]
+
+    def _one(args):
+        started = time.perf_counter()
+        out = aidp_fdi_inventory_check_impl(*args)
+        return (time.perf_counter() - started) * 1000, out.startswith("Error")
+
+    aidp_fdi_inventory_check_impl(*payloads[0])  # warm the pool outside the measurement
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(_one, payloads))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _ in results)
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, err in results if err),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "max_ms": round(latencies[-1], 2),
+        "inventory": inventory_metrics(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=INVENTORY_SQLITE_PATH)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-generate", action="store_true")
+    parser.add_argument("--bench", action="store_true", help="run the inventory throughput benchmark (INVENTORY_BACKEND=sqlite)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    if not args.skip_generate:
+        started = time.perf_counter()
+        generate(args.path, args.items, args.rows, args.seed)
+        print(f"Generated {args.rows} on-hand rows for {args.items} items in {time.perf_counter() - started:.1f}s -> {args.path}")
+    if args.bench:
+        import json
+        print(json.dumps(benchmark(args.requests, concurrency=args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
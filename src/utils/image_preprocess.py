@@ -0,0 +1,142 @@
+# src/utils/image_preprocess.py
+"""
+Shrink order scans before they are base64-encoded for the vision model.
+
+EXIF-orientation fix -> downscale to IMAGE_MAX_EDGE -> grayscale -> contrast
+normalization -> JPEG re-encode at IMAGE_JPEG_QUALITY. Phone photos of
+handwritten orders are typically several MB; the model reads them just as
+well at a fraction of the size, and request size drives upload time and
+model latency.
+
+Pillow is optional: without it (or if an image cannot be decoded) the
+original bytes are sent unchanged.
+
+    python -m src.utils.image_preprocess                 # sizes + preprocessing time for order_inputs/
+    python -m src.utils.image_preprocess --vision        # also time the vision call, raw vs preprocessed
+"""
+import io
+import os
+import time
+import argparse
+import threading
+from typing import Dict, Tuple
+
+from src.common.config import (
+    PROJECT_ROOT, IMAGE_PREPROCESS_ENABLED, IMAGE_MAX_EDGE, IMAGE_GRAYSCALE, IMAGE_AUTOCONTRAST, IMAGE_JPEG_QUALITY,
+)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional dependency
+    Image = ImageOps = None
+
+# part of the extraction cache key: results from differently preprocessed images are not interchangeable
+SIGNATURE = (f"preprocess={int(IMAGE_PREPROCESS_ENABLED and Image is not None)};max_edge={IMAGE_MAX_EDGE};"
+             f"gray={int(IMAGE_GRAYSCALE)};autocontrast={int(IMAGE_AUTOCONTRAST)};q={IMAGE_JPEG_QUALITY}")
+
+_stats_lock = threading.Lock()
+_stats = {"images": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0, "ms_total": 0.0}
+
+
+def preprocess_image(data: bytes, max_edge: int = IMAGE_MAX_EDGE, grayscale: bool = IMAGE_GRAYSCALE,
+                     autocontrast: bool = IMAGE_AUTOCONTRAST, quality: int = IMAGE_JPEG_QUALITY,
+                     enabled: bool = IMAGE_PREPROCESS_ENABLED) -> Tuple[bytes, Dict]:
+    """
+    Return (jpeg_bytes, report). report has bytes_in, bytes_out, saved_bytes, ms and the
+    size before/after; "skipped" says why the original bytes were returned.
+    """
+    started = time.perf_counter()
+    report = {"bytes_in": len(data), "bytes_out": len(data), "saved_bytes": 0}
+    if not enabled or Image is None:
+        report["skipped"] = "disabled" if not enabled else "Pillow not installed"
+        return _record(data, report, started)
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            report["size_in"] = list(img.size)
+            rotated = img.getexif().get(0x0112, 1) != 1  # EXIF Orientation
+            img = ImageOps.exif_transpose(img)
+            if max_edge and max(img.size) > max_edge:
+                img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            img = img.convert("L") if grayscale else img.convert("RGB")
+            if autocontrast:
+                img = ImageOps.autocontrast(img, cutoff=1)
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=quality, optimize=True)
+            report["size_out"] = list(img.size)
+    except Exception as e:
+        report["skipped"] = f"not decodable: {e}"
+        return _record(data, report, started)
+
+    processed = out.getvalue()
+    if len(processed) >= len(data) and report["size_out"] == report["size_in"] and not rotated:
+        # already small: re-encoding only made it bigger
+        report["skipped"] = "no gain"
+        return _record(data, report, started)
+    report.update(bytes_out=len(processed), saved_bytes=len(data) - len(processed))
+    return _record(processed, report, started)
+
+
+def _record(data: bytes, report: Dict, started: float) -> Tuple[bytes, Dict]:
+    report["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    with _stats_lock:
+        _stats["images"] += 1
+        _stats["skipped"] += "skipped" in report
+        _stats["bytes_in"] += report["bytes_in"]
+        _stats["bytes_out"] += report["bytes_out"]
+        _stats["ms_total"] += report["ms"]
+    return data, report
+
+
+def preprocess_stats() -> Dict:
+    with _stats_lock:
+        s = dict(_stats)
+    s["saved_bytes"] = s["bytes_in"] - s["bytes_out"]
+    s["ms_total"] = round(s["ms_total"], 1)
+    s["signature"] = SIGNATURE
+    return s
+
+
+# ---------- benchmark ----------
+def _time_vision(data: bytes, question: str) -> float:
+    import base64
+    from langchain_core.messages import HumanMessage
+    from src.llm.registry import get_vision_llm
+
+    b64 = base64.b64encode(data).decode("utf-8")
+    msg = HumanMessage(content=[
+        {"type": "text", "text": question},
+        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
+    ])
+    started = time.perf_counter()
+    get_vision_llm().invoke([msg])
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def benchmark(directory: str, vision: bool = False, question: str = "Extract all order information. Return only JSON.") -> list:
+    results = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+            continue
+        raw = open(os.path.join(directory, name), "rb").read()
+        processed, report = preprocess_image(raw)
+        row = {"image": name, **report,
+               "base64_in": 4 * ((len(raw) + 2) // 3), "base64_out": 4 * ((len(processed) + 2) // 3)}
+        if vision:
+            row["vision_ms_raw"] = _time_vision(raw, question)
+            row["vision_ms_preprocessed"] = _time_vision(processed, question)
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=os.path.join(PROJECT_ROOT, "order_inputs"))
+    parser.add_argument("--vision", action="store_true", help="also time the vision LLM call on raw vs preprocessed bytes")
+    args = parser.parse_args()
+
+    import json
+    print(json.dumps(benchmark(args.dir, vision=args.vision), indent=2))
+
+
+if __name__ == "__main__":
+    main()
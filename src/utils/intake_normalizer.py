@@ -0,0 +1,119 @@
+# src/utils/intake_normalizer.py
+"""
+Local, deterministic normalization of the vision model's order text.
+
+The vision model is asked for JSON in the intake schema
+(BillToCustomer{Name, BusinessUnit}, OrderItems[{Item, Quantity, RequestedDate}])
+but tends to wrap it in prose or ``` fences, leave trailing commas or use
+single quotes. This module pulls the JSON out, repairs those defects,
+validates it against IntakeOrder (or Transaction, if the model already
+answered in that shape) and maps it to Transaction. A JSON list is read as
+several orders on one page. image_to_text_impl only falls back to the
+structured-output LLM when this returns None.
+"""
+import ast
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from src.data.sales_order import IntakeOrder, LineItem, Transaction
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_JSON_LITERALS = {"true": "True", "false": "False", "null": "None"}
+
+_stats_lock = threading.Lock()
+_stats = {"local": 0, "llm_fallback": 0}
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """The JSON object (or list) in text, after fence stripping and light repair; None if there is none."""
+    if not isinstance(text, str):
+        return None
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    end = text.rfind("}" if start >= 0 and text[start] == "{" else "]")
+    if start < 0 or end <= start:
+        return None
+    candidate = text[start:end + 1].translate(_SMART_QUOTES)
+
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            return json.loads(attempt)
+        except ValueError:
+            pass
+    # single-quoted / Python-literal dicts
+    python_like = re.sub(r"\b(true|false|null)\b", lambda m: _JSON_LITERALS[m.group(1)],
+                         _TRAILING_COMMA.sub(r"\1", candidate))
+    try:
+        value = ast.literal_eval(python_like)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return value if isinstance(value, (dict, list)) else None
+
+
+def to_transaction(order: IntakeOrder) -> Dict[str, Any]:
+    """
+    IntakeOrder -> Transaction dict. The business unit name is kept next to it for the inventory
+    check, and the customer as "BillToCustomer" {Name, BusinessUnit}, as the intake payload had it.
+    """
+    lines = [
+        LineItem(
+            SourceTransactionLineId=str(i),
+            SourceTransactionLineNumber=str(i),
+            ProductNumber=item.Item.strip(),
+            OrderedQuantity=item.Quantity,
+        )
+        for i, item in enumerate(order.OrderItems, start=1)
+    ]
+    requested = next((item.RequestedDate for item in order.OrderItems if item.RequestedDate), None)
+    out = Transaction(RequestedShipDate=requested, lines=lines).model_dump()
+    customer = order.BillToCustomer
+    if customer is not None:
+        if customer.BusinessUnit:
+            out["BusinessUnit"] = customer.BusinessUnit
+        if customer.Name or customer.BusinessUnit:
+            out["BillToCustomer"] = customer.model_dump(exclude_none=True)
+    return out
+
+
+def _order(data: Any) -> Optional[Tuple[Dict[str, Any], bool]]:
+    if not isinstance(data, dict):
+        return None
+    try:
+        if data.get("lines"):
+            transaction = Transaction.model_validate(data)
+            if not any(line.ProductNumber and line.OrderedQuantity for line in transaction.lines):
+                return None
+            return transaction.model_dump(), True
+        order = IntakeOrder.model_validate(data)
+    except ValidationError:
+        return None
+    return to_transaction(order), bool(order.BillToCustomer and order.BillToCustomer.Name)
+
+
+def local_orders(vision_text: str) -> Optional[List[Tuple[Dict[str, Any], bool]]]:
+    """
+    [(transaction_dict, has_customer)] for every order in the vision text, or None when the
+    LLM normalizer is needed. has_customer is False for item-only continuation pages.
+    """
+    data = extract_json(vision_text)
+    orders = [_order(d) for d in (data if isinstance(data, list) else [data])]
+    result = orders if orders and all(o is not None for o in orders) else None
+    with _stats_lock:
+        _stats["local" if result is not None else "llm_fallback"] += 1
+    return result
+
+
+def normalizer_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        s = dict(_stats)
+    total = s["local"] + s["llm_fallback"]
+    s["local_hit_rate"] = round(s["local"] / total, 3) if total else None
+    return s
@@ -0,0 +1,146 @@
+# src/utils/order_payload.py
+"""
+Order intake output -> Fusion create-order payload.
+
+Used server-side by /orders/pipeline and by the Streamlit client (src/apps/app.py)
+for the step-by-step flow. No UI state in here: the business unit found in the
+intake output is returned next to the payload.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from src.utils.intake_normalizer import extract_json
+
+DEFAULT_BUS = ["US1 Business Unit", "EMEA1 Business Unit", "APAC1 Business Unit"]
+DEFAULT_SKUS = ["AS6647431", "AS6647432", "AS6647433"]  # only for the interactive client's fallback
+
+# Bullet/text fallback "… Item AS#### … Quantity/Required: N …"
+_ITEM_QTY_PATTERN = re.compile(
+    r"(?:Item\s*)?(?P<sku>AS\d+)\D+?(?:Required:\s*(?P<q1>\d+)|Quantity\s*[:=]\s*(?P<q2>\d+))", re.I
+)
+
+
+def _bu_of(order: dict) -> Optional[str]:
+    return order.get("BusinessUnit") or (order.get("BillToCustomer") or {}).get("BusinessUnit")
+
+
+def _items_of(order: dict) -> List[Tuple[str, int]]:
+    """(sku, qty) of one order: Transaction/create shape ("lines") or intake shape ("OrderItems"/"Items"/"Lines")."""
+    items = []
+    for key in ("lines", "OrderItems", "Items", "Lines"):
+        if isinstance(order.get(key), list):
+            for it in order[key]:
+                if not isinstance(it, dict):
+                    continue
+                sku = it.get("ProductNumber") or it.get("Item") or it.get("item_number")
+                qty = it.get("OrderedQuantity") or it.get("Quantity") or it.get("qty")
+                try:
+                    if sku and qty is not None and int(qty) > 0:
+                        items.append((str(sku), int(qty)))
+                except (TypeError, ValueError):
+                    continue
+            break
+    return items
+
+
+def parse_orders_from_intake(intake_resp, fallback_txn: str, default_bu: Optional[str] = None) -> List[Tuple[dict, str]]:
+    """
+    Every order in /orders/image (order_intake_agent) output as [(create_payload, business_unit_name)].
+    The vision tool answers with one Transaction JSON or a list of them (several orders in one
+    document); orders get transaction numbers fallback_txn-1, -2, ... when there are several.
+    Returns [] when no item could be read: nothing is made up.
+    """
+    default_bu = default_bu or DEFAULT_BUS[0]
+    raw = intake_resp["final_answer"] if isinstance(intake_resp, dict) and "final_answer" in intake_resp else intake_resp
+
+    # Already shaped as create payload
+    if isinstance(raw, dict) and raw.get("lines") and raw.get("SourceTransactionNumber"):
+        return [(raw, _bu_of(raw) or default_bu)]
+
+    data = raw if isinstance(raw, (dict, list)) else extract_json(raw) if isinstance(raw, str) else None
+    orders = []
+    for order in (data if isinstance(data, list) else [data]):
+        if isinstance(order, dict):
+            items = _items_of(order)
+            if items:
+                orders.append((items, _bu_of(order) or default_bu, order.get("BillToCustomer")))
+
+    if not orders and isinstance(raw, str):
+        # Bullet/text answer
+        items = [(m.group("sku"), int(m.group("q1") or m.group("q2"))) for m in _ITEM_QTY_PATTERN.finditer(raw)]
+        if items:
+            orders.append((items, default_bu, None))
+
+    if len(orders) == 1:
+        items, bu, customer = orders[0]
+        return [(build_create_payload(fallback_txn, bu, items, customer), bu)]
+    return [(build_create_payload(f"{fallback_txn}-{i}", bu, items, customer), bu)
+            for i, (items, bu, customer) in enumerate(orders, start=1)]
+
+
+def parse_order_from_intake(intake_resp, fallback_txn: str, default_bu: Optional[str] = None) -> Tuple[dict, str]:
+    """
+    First order of the intake output as (payload, business_unit_name), for the step-by-step
+    Streamlit flow where a person reviews it before creating. Falls back to a placeholder
+    item when nothing could be read; the server pipeline uses parse_orders_from_intake instead.
+    """
+    orders = parse_orders_from_intake(intake_resp, fallback_txn, default_bu)
+    if orders:
+        return orders[0]
+    default_bu = default_bu or DEFAULT_BUS[0]
+    return build_create_payload(fallback_txn, default_bu, [(DEFAULT_SKUS[0], 1)]), default_bu
+
+
+def build_create_payload(txn: str, bu_name: str, items: List[Tuple[str, int]], customer: Optional[dict] = None) -> dict:
+    payload = {
+        "SourceTransactionNumber": txn,
+        "SourceTransactionSystem": "OPS",
+        "SourceTransactionId": txn,
+        "TransactionalCurrencyCode": "USD",
+        # Map BU name -> IDs here if needed
+        "BusinessUnitId": 300000046987012,
+        "RequestingBusinessUnitId": 300000046987012,
+        "BuyingPartyNumber": "10060",
+        "RequestedShipDate": "2018-09-19",
+        "SubmittedFlag": "true",
+        "FreezePriceFlag": "false",
+        "FreezeShippingChargeFlag": "false",
+        "FreezeTaxFlag": "false",
+        "lines": []
+    }
+    for i, (sku, qty) in enumerate(items, start=1):
+        payload["lines"].append({
+            "SourceTransactionLineId": str(i),
+            "SourceTransactionLineNumber": str(i),
+            "SourceScheduleNumber": "1",
+            "SourceTransactionScheduleId": "1",
+            "OrderedUOMCode": "zzu",
+            "OrderedQuantity": int(qty),
+            "ProductNumber": str(sku),
+            "FOBPoint": "Destination",
+            "FreightTerms": "Add freight",
+            "PaymentTerms": "30 Net",
+            "ShipmentPriority": "High",
+        })
+    # record BU name for inventory prompt derivation
+    payload["BusinessUnit"] = bu_name
+    # bill-to customer as read from the document ({Name, BusinessUnit}), sent as the intake had it
+    if isinstance(customer, dict) and customer:
+        payload["BillToCustomer"] = customer
+    return payload
+
+
+def inventory_request(order_json: dict, default_bu: Optional[str] = None) -> Tuple[List[str], List[int], str]:
+    """(item_numbers, item_required_quantity, bu) for the inventory check of a create payload."""
+    lines = order_json.get("lines", []) if isinstance(order_json, dict) else []
+    item_numbers = [str(l.get("ProductNumber")) for l in lines if l.get("ProductNumber")]
+    req_qty = [int(l.get("OrderedQuantity", 0)) for l in lines if l.get("ProductNumber")]
+    bu = ((order_json.get("BusinessUnit") if isinstance(order_json, dict) else None) or default_bu or DEFAULT_BUS[0]).strip()
+    if not item_numbers: item_numbers = [DEFAULT_SKUS[0]]
+    if not req_qty: req_qty = [1]
+    return item_numbers, req_qty, bu
+
+
+def build_inventory_prompt(order_json: dict, default_bu: Optional[str] = None) -> str:
+    item_numbers, req_qty, bu = inventory_request(order_json, default_bu)
+    return f"Return per-item availability for item_numbers: {item_numbers}, item_required_quantity: {req_qty} and bu: {bu}"
@@ -0,0 +1,6 @@
+# tests/conftest.py
+# the modules are imported as src.<package>.<module>, as with `python -m` from the repo root
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.apps.agent_executor import AgentExecutor, AgentOverloadedError, EndpointLimiter
+
+
+@pytest.fixture
+def executor():
+    agents = AgentExecutor(max_workers=4)
+    yield agents
+    agents.shutdown()
+
+
+def test_queue_full_is_rejected_with_429(executor):
+    limiter = executor.limiter("intake", concurrency=1, queue_size=1, queue_timeout=5)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.create_task(executor.run("intake", release.wait, 5))
+        queued = asyncio.create_task(executor.run("intake", lambda: "queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(AgentOverloadedError) as exc:
+            await executor.run("intake", lambda: "rejected")
+        assert exc.value.status_code == 429 and exc.value.retry_after > 0
+        release.set()
+        return await running, await queued
+
+    assert asyncio.run(main()) == (True, "queued")
+    stats = limiter.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["in_flight"] == 0
+
+
+def test_queue_timeout_is_rejected_with_503(executor):
+    limiter = executor.limiter("create", concurrency=1, queue_size=5, queue_timeout=0.1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.create_task(executor.run("create", release.wait, 5))
+        await asyncio.sleep(0.02)
+        with pytest.raises(AgentOverloadedError) as exc:
+            await executor.run("create", lambda: "late")
+        release.set()
+        await running
+        return exc.value.status_code
+
+    assert asyncio.run(main()) == 503
+    stats = limiter.stats()
+    assert stats["timed_out"] == 1 and stats["queue_depth"] == 0 and stats["in_flight"] == 0
+
+
+def test_slot_held_until_the_call_finishes(executor):
+    limiter = executor.limiter("check", concurrency=1, queue_size=0, queue_timeout=5)
+
+    async def main():
+        task = asyncio.create_task(executor.run("check", time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        task.cancel()  # client went away; the thread is still running
+        await asyncio.sleep(0)
+        with pytest.raises(AgentOverloadedError):
+            limiter.check()
+        await asyncio.sleep(0.3)
+        return await executor.run("check", lambda: "free again")
+
+    assert asyncio.run(main()) == "free again"
+
+
+def test_run_from_thread_uses_the_endpoint_slots(executor):
+    limiter = executor.limiter("jobs", concurrency=2, queue_size=0, queue_timeout=5)
+    peak, active, lock = [0], [0], threading.Lock()
+
+    def work(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return i
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        calls = [asyncio.to_thread(executor.run_from_thread, loop, "jobs", work, i) for i in range(5)]
+        return await asyncio.gather(*calls)
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    assert peak[0] == 2 and limiter.stats()["completed"] == 5
+
+
+def test_failed_call_frees_its_slot():
+    limiter = EndpointLimiter("x", concurrency=1, queue_size=0)
+
+    async def main():
+        with ThreadPoolExecutor(1) as pool:
+            with pytest.raises(ZeroDivisionError):
+                await limiter.run(pool, lambda: 1 / 0)
+            await asyncio.sleep(0)
+            return await limiter.run(pool, lambda: "ok")
+
+    assert asyncio.run(main()) == "ok"
+    assert limiter.stats()["failed"] == 1
@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from src.tools.aidp_jdbc_pool import JdbcPoolError, JdbcTimeoutError, JdbcWorkerPool
+from src.utils.generate_inventory_data import generate
+
+N_ROWS = 2500
+SLOW_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+@pytest.fixture(scope="module")
+def sqlite_db(tmp_path_factory):
+    return generate(str(tmp_path_factory.mktemp("inv") / "inventory.sqlite"), n_items=50, n_rows=N_ROWS)
+
+
+@pytest.fixture
+def make_pool(sqlite_db, monkeypatch):
+    # spawned workers read their config from the environment at import
+    monkeypatch.setenv("INVENTORY_SQLITE_PATH", sqlite_db)
+    monkeypatch.setenv("JDBC_FETCH_SIZE", "1000")
+    pools = []
+
+    def make(**kwargs):
+        kwargs.setdefault("size", 1)
+        kwargs.setdefault("health_check_interval", 0)
+        pools.append(JdbcWorkerPool(backend="sqlite", **kwargs))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_execute_returns_rows(make_pool):
+    pool = make_pool()
+    assert pool.execute("SELECT COUNT(*) FROM dw_inv_onhand_details_cf") == [(N_ROWS,)]
+    assert pool.execute("SELECT ? + ?", (2, 3)) == [(5,)]
+    stats = pool.stats()
+    assert stats["queries"] == 2 and stats["spawned"] == 1 and stats["idle"] == 1
+
+
+def test_catalog_prefix_is_stripped(make_pool):
+    pool = make_pool()
+    rows = pool.execute("SELECT COUNT(*) FROM fdi_idl_catalog.default.dw_business_unit_d_tl")
+    assert rows == [(3,)]
+
+
+def test_execute_columns_streams_chunks(make_pool):
+    pool = make_pool()
+    chunks = list(pool.execute_columns("SELECT inventory_item_id, subinventory_code FROM dw_inv_onhand_details_cf"))
+    assert [len(c[0]) for c in chunks] == [1000, 1000, 500]
+    assert all(len(c) == 2 for c in chunks)
+    batches = list(pool.execute_iter("SELECT inventory_item_id FROM dw_inv_onhand_details_cf"))
+    assert sum(map(len, batches)) == N_ROWS and isinstance(batches[0][0], tuple)
+
+
+def test_query_error_keeps_worker(make_pool):
+    pool = make_pool()
+    with pytest.raises(JdbcPoolError, match="no such table"):
+        pool.execute("SELECT * FROM missing_table")
+    assert pool.execute("SELECT 1") == [(1,)]
+    stats = pool.stats()
+    assert stats["errors"] == 1 and stats["replaced"] == 0 and stats["spawned"] == 1
+
+
+def test_timeout_cancels_in_worker(make_pool):
+    pool = make_pool()
+    with pytest.raises(JdbcTimeoutError) as exc:
+        pool.execute(SLOW_SQL, timeout=0.5)
+    assert exc.value.cancelled and exc.value.timeout == 0.5
+    assert pool.execute("SELECT 1") == [(1,)]
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["cancelled"] == 1 and stats["replaced"] == 0
+
+
+def test_abandoned_stream_replaces_worker(make_pool):
+    pool = make_pool()
+    stream = pool.execute_columns("SELECT inventory_item_id FROM dw_inv_onhand_details_cf")
+    next(stream)
+    stream.close()
+    assert pool.stats()["replaced"] == 1
+    assert pool.execute("SELECT 1") == [(1,)]
+
+
+def test_dead_worker_replaced_on_checkout(make_pool):
+    pool = make_pool()
+    worker = pool._idle.queue[0]
+    worker.process.kill()
+    worker.process.join(5)
+    assert pool.execute("SELECT 1") == [(1,)]
+    assert pool.stats()["replaced"] == 1 and pool.stats()["spawned"] == 2
+
+
+def test_checkout_times_out_when_busy(make_pool):
+    pool = make_pool()
+    stream = pool.execute_columns("SELECT inventory_item_id FROM dw_inv_onhand_details_cf")
+    next(stream)
+    try:
+        with pytest.raises(JdbcTimeoutError, match="free JDBC worker"):
+            pool.execute("SELECT 1", timeout=0.2)
+    finally:
+        stream.close()
+
+
+def test_health_probe_replaces_dead_worker(make_pool):
+    pool = make_pool(health_check_interval=0.2)
+    worker = pool._idle.queue[0]
+    worker.process.kill()
+    worker.process.join(5)
+    deadline = time.monotonic() + 10
+    while pool.stats()["replaced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    stats = pool.stats()
+    assert stats["replaced"] == 1 and stats["queries"] == 0 and stats["timeouts"] == 0
+    assert pool.execute("SELECT 1") == [(1,)]
+
+
+def test_recycled_after_max_queries(make_pool):
+    pool = make_pool(max_queries=2)
+    for _ in range(3):
+        pool.execute("SELECT 1")
+    assert pool.stats()["recycled"] == 1
@@ -0,0 +1,44 @@
+# tests/test_cache.py
+import time
+
+from src.common.cache import TTLCache
+
+
+def test_get_set_and_stats():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b", "missing") == "missing"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # b is now the oldest
+    cache.set("c", 3)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.1)
+    assert cache.get_many(["a", "b"]) == {"b": 2}
+    assert len(cache) == 1
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None and len(cache) == 0
+
+
+def test_pop_and_clear():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set_many({"a": 1, "b": 2})
+    assert cache.pop("a") == 1 and cache.pop("a", "gone") == "gone"
+    cache.clear()
+    assert len(cache) == 0
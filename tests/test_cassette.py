@@ -0,0 +1,77 @@
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.llm import cassette, llm_cache
+from src.llm.cassette import Cassette, CassetteMissError, parse_latency, summarize
+from src.llm.llm_cache import CachedChatOCIGenAI, LangchainLlmCache, LlmResponseCache
+
+
+def test_record_then_replay(tmp_path):
+    recorder = Cassette(str(tmp_path), "record")
+    recorder.record("k1", "cohere.command-r", "hello", 12.34)
+    entry = json.loads((tmp_path / "k1.json").read_text())
+    assert entry["response"] == "hello" and entry["latency_ms"] == 12.3 and entry["model"] == "cohere.command-r"
+
+    player = Cassette(str(tmp_path), "replay", latency="none")
+    assert player.play("k1") == "hello"
+    assert asyncio.run(player.aplay("k1")) == "hello"
+    assert player.stats()["replayed"] == 2 and player.stats()["replay_wait_ms"] == 0.0
+
+
+def test_replay_miss(tmp_path):
+    player = Cassette(str(tmp_path), "replay", latency="none")
+    with pytest.raises(CassetteMissError, match="no recording"):
+        player.play("unknown")
+    assert player.stats()["misses"] == 1
+
+
+def test_replay_waits_the_recorded_latency(tmp_path):
+    Cassette(str(tmp_path), "record").record("k1", None, "hello", 80)
+    player = Cassette(str(tmp_path), "replay", scale=0.5)
+    started = time.perf_counter()
+    player.play("k1")
+    assert time.perf_counter() - started >= 0.04 and player.stats()["replay_wait_ms"] == 40.0
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError, match="LLM_MODE"):
+        Cassette("unused", "playback")
+
+
+def test_parse_latency():
+    assert parse_latency("recorded")(120) == 120
+    assert parse_latency("none")(120) == 0
+    assert parse_latency("fixed:50", scale=2)(120) == 100
+    assert 10 <= parse_latency("uniform:10:20")(0) <= 20
+    assert parse_latency("normal:0:0")(0) == 0
+    assert parse_latency("lognormal:30:0")(0) == pytest.approx(30)
+    for bad in ("fixed", "uniform:1", "gamma:1:2", "fixed:abc"):
+        with pytest.raises(ValueError):
+            parse_latency(bad)
+
+
+def test_summarize(tmp_path):
+    recorder = Cassette(str(tmp_path), "record")
+    for i, ms in enumerate((10, 20, 30)):
+        recorder.record(f"k{i}", "m", "x", ms)
+    assert summarize(str(tmp_path))["models"] == {"m": {"recordings": 3, "p50_ms": 20.0, "p95_ms": 30.0, "max_ms": 30.0}}
+
+
+def test_langchain_model_replays_offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette, "_cassette", Cassette(str(tmp_path), "replay", latency="none"))
+    monkeypatch.setattr(llm_cache, "_cache", LlmResponseCache(path="", ttl=0))
+    model = CachedChatOCIGenAI(model_id="cohere.command-r", provider="cohere",
+                               compartment_id="offline", service_endpoint="https://offline.invalid")
+    messages = [HumanMessage("Get all information about the order")]
+    key = LangchainLlmCache._key(dumps(messages), model._get_llm_string(stop=None))
+    Cassette(str(tmp_path), "record").record(key, model.model_id, dumps([ChatGeneration(message=AIMessage("ok"))]), 5)
+
+    assert model.invoke(messages).content == "ok"
+    with pytest.raises(CassetteMissError):
+        model.invoke([HumanMessage("a prompt that was never recorded")])
@@ -0,0 +1,112 @@
+# tests/test_idempotency.py
+import json
+import threading
+
+import pytest
+
+from src.common.idempotency import IdempotentCalls, IdempotencyConflictError
+
+
+def test_replays_completed_result():
+    calls = IdempotentCalls()
+    assert calls.run("k", lambda: 1) == (1, False)
+    assert calls.run("k", lambda: 2) == (1, True)
+    assert calls.run(None, lambda: 3) == (3, False)
+
+
+def test_concurrent_duplicates_join_the_running_call():
+    calls = IdempotentCalls()
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(calls.run("k", slow)))
+    leader.start()
+    assert started.wait(5)
+    joiners = [threading.Thread(target=lambda: results.append(calls.run("k", slow))) for _ in range(3)]
+    for t in joiners:
+        t.start()
+    while calls.stats()["joined"] < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in [leader, *joiners]:
+        t.join(5)
+    assert len(runs) == 1
+    assert sorted(results) == [("done", False)] + [("done", True)] * 3
+
+
+def test_joiners_get_the_leaders_exception():
+    calls = IdempotentCalls()
+    started, release = threading.Event(), threading.Event()
+
+    def boom():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("fusion down")
+
+    errors = []
+
+    def call():
+        try:
+            calls.run("k", boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    assert started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while calls.stats()["joined"] < 1:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["fusion down", "fusion down"]
+    assert calls.run("k", lambda: "ok") == ("ok", False)  # failures are not cached
+
+
+def test_uncacheable_results_run_again():
+    calls = IdempotentCalls(cacheable=lambda result: result != "failed")
+    assert calls.run("k", lambda: "failed") == ("failed", False)
+    assert calls.run("k", lambda: "ok") == ("ok", False)
+    assert calls.run("k", lambda: "again") == ("ok", True)
+
+
+def test_refresh_reruns_and_replaces():
+    calls = IdempotentCalls()
+    calls.run("k", lambda: 1)
+    assert calls.run("k", lambda: 2, refresh=True) == (2, False)
+    assert calls.run("k", lambda: 3) == (2, True)
+
+
+def test_key_reused_with_another_fingerprint():
+    calls = IdempotentCalls()
+    calls.run("k", lambda: 1, fingerprint="a")
+    assert calls.run("k", lambda: 2, fingerprint="a") == (1, True)
+    with pytest.raises(IdempotencyConflictError):
+        calls.run("k", lambda: 2, fingerprint="b")
+    with pytest.raises(IdempotencyConflictError):
+        calls.check("k", "b")
+    calls.check("k", "a")
+
+
+def test_fusion_post_reused_number_with_other_lines(monkeypatch):
+    from src.tools import order_create_tools
+
+    posts = []
+    monkeypatch.setattr(order_create_tools, "_post_order", lambda payload: posts.append(payload) or "Response: {}")
+    monkeypatch.setattr(order_create_tools, "_fusion_posts", IdempotentCalls())
+    order = {"SourceTransactionNumber": "T1", "lines": [{"ProductNumber": "AS1", "OrderedQuantity": 1}]}
+    assert order_create_tools.create_order_impl(order) == "Response: {}"
+    assert order_create_tools.create_order_impl(json.dumps(order)) == "Response: {}"  # same order as a JSON string
+    other = dict(order, lines=[{"ProductNumber": "AS2", "OrderedQuantity": 5}])
+    with pytest.raises(IdempotencyConflictError):
+        order_create_tools.create_order_impl(other)
+    assert len(posts) == 1
@@ -0,0 +1,44 @@
+# tests/test_intake_normalizer.py
+from src.data.sales_order import IntakeOrder
+from src.utils.intake_normalizer import extract_json, to_transaction
+
+
+def test_plain_json():
+    assert extract_json('{"a": 1}') == {"a": 1}
+
+
+def test_fenced_json_with_prose():
+    text = 'Here is the order:\n```json\n{"OrderItems": [{"Item": "AS1", "Quantity": 2}]}\n```\nAnything else?'
+    assert extract_json(text) == {"OrderItems": [{"Item": "AS1", "Quantity": 2}]}
+
+
+def test_trailing_commas():
+    assert extract_json('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+
+
+def test_single_quotes_and_json_literals():
+    assert extract_json("{'a': true, 'b': null, 'c': 'x'}") == {"a": True, "b": None, "c": "x"}
+
+
+def test_smart_quotes():
+    assert extract_json("{“a”: “b”}") == {"a": "b"}
+
+
+def test_list_of_orders():
+    assert extract_json('orders: [{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+
+
+def test_no_json():
+    assert extract_json("no order in this answer") is None
+    assert extract_json("{not json at all}") is None
+    assert extract_json(None) is None
+
+
+def test_to_transaction_keeps_the_customer():
+    order = IntakeOrder(BillToCustomer={"Name": "Computer Service and Rentals", "BusinessUnit": "US1 Business Unit"},
+                        OrderItems=[{"Item": " AS1 ", "Quantity": 2, "RequestedDate": "5-Nov-25"}])
+    out = to_transaction(order)
+    assert out["BillToCustomer"] == {"Name": "Computer Service and Rentals", "BusinessUnit": "US1 Business Unit"}
+    assert out["BusinessUnit"] == "US1 Business Unit"
+    assert out["RequestedShipDate"] == "5-Nov-25"
+    assert [(l["ProductNumber"], l["OrderedQuantity"]) for l in out["lines"]] == [("AS1", 2)]
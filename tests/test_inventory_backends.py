@@ -0,0 +1,29 @@
+import sqlite3
+
+import pytest
+
+from src.tools.inventory_backends import InventoryBackendError, SqliteBackend, get_backend
+
+
+def test_get_backend_by_name():
+    assert isinstance(get_backend("SQLite"), SqliteBackend)
+    with pytest.raises(InventoryBackendError, match="Unknown INVENTORY_BACKEND"):
+        get_backend("oracle")
+
+
+def test_sqlite_prepare_sql_drops_catalog_prefix():
+    sql = "SELECT * FROM fdi_idl_catalog.default.dw_inventory_item_d i JOIN FDI_IDL_CATALOG.DEFAULT.dw_internal_org_d o"
+    assert SqliteBackend("x").prepare_sql(sql) == "SELECT * FROM dw_inventory_item_d i JOIN dw_internal_org_d o"
+
+
+def test_sqlite_missing_database(tmp_path):
+    with pytest.raises(InventoryBackendError, match="not found"):
+        SqliteBackend(str(tmp_path / "missing.sqlite")).connect()
+
+
+def test_sqlite_connection_is_read_only(tmp_path):
+    path = tmp_path / "inv.sqlite"
+    sqlite3.connect(path).execute("CREATE TABLE t (x)")
+    conn = SqliteBackend(str(path)).connect()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO t VALUES (1)")
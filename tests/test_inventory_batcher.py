@@ -0,0 +1,75 @@
+import threading
+
+from src.tools.inventory_batcher import InventoryBatcher
+
+BU = "US1 Business Unit"
+
+
+class _Fetch:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self, bu, items, timeout):
+        with self._lock:
+            self.calls.append((bu, list(items)))
+        if self.error is not None:
+            raise self.error
+        return {it: int(it[2:]) for it in items}
+
+
+def _concurrently(fn, args_list):
+    results, errors = [None] * len(args_list), [None] * len(args_list)
+
+    def run(i, args):
+        try:
+            results[i] = fn(*args)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, a)) for i, a in enumerate(args_list)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_callers_share_one_query():
+    fetch = _Fetch()
+    batcher = InventoryBatcher(fetch, window_s=0.2)
+    results, errors = _concurrently(batcher.fetch, [(BU, ["AS1", "AS2"], 5), (BU, ["AS2", "AS3"], 5)])
+    assert errors == [None, None]
+    assert results == [{"AS1": 1, "AS2": 2}, {"AS2": 2, "AS3": 3}]
+    assert len(fetch.calls) == 1 and sorted(fetch.calls[0][1]) == ["AS1", "AS2", "AS3"]
+    assert batcher.stats()["max_batch_callers"] == 2
+
+
+def test_large_request_is_split_at_max_items():
+    fetch = _Fetch()
+    batcher = InventoryBatcher(fetch, window_s=0.01, max_items=4)
+    items = [f"AS{i}" for i in range(10)]
+    assert batcher.fetch(BU, items, 5) == {it: int(it[2:]) for it in items}
+    assert sorted(len(call[1]) for call in fetch.calls) == [2, 4, 4]
+
+
+def test_missing_items_default_to_zero():
+    batcher = InventoryBatcher(lambda bu, items, timeout: {}, window_s=0.01)
+    assert batcher.fetch(BU, ["AS1"], 5) == {"AS1": 0}
+
+
+def test_each_caller_gets_its_own_exception():
+    shared = TimeoutError("boom")
+    batcher = InventoryBatcher(_Fetch(error=shared), window_s=0.2)
+    _, errors = _concurrently(batcher.fetch, [(BU, ["AS1"], 5), (BU, ["AS2"], 5)])
+    assert all(isinstance(e, TimeoutError) and str(e) == "boom" for e in errors)
+    assert errors[0] is not errors[1] and shared not in errors
+    assert all(e.__cause__ is shared for e in errors)
+
+
+def test_window_zero_calls_through():
+    fetch = _Fetch()
+    batcher = InventoryBatcher(fetch, window_s=0)
+    assert batcher.fetch(BU, ["AS7"], 5) == {"AS7": 7}
+    assert fetch.calls == [(BU, ["AS7"])] and batcher.stats()["batches"] == 0
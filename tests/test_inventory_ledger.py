@@ -0,0 +1,59 @@
+# tests/test_inventory_ledger.py
+import time
+
+from src.tools.inventory_ledger import AllocationLedger
+
+KEY = ("US1 Business Unit", "AS1")
+
+
+def test_reserve_subtracts_from_available():
+    ledger = AllocationLedger(ttl=60, commit_hold=60)
+    held, available = ledger.reserve("o1", {KEY: 3}, on_hand={KEY: 10})
+    assert held and available == {KEY: 10}
+    assert ledger.available(*KEY, on_hand=10) == 7
+
+
+def test_reserve_is_all_or_nothing():
+    ledger = AllocationLedger(ttl=60, commit_hold=60)
+    other = ("US1 Business Unit", "AS2")
+    ledger.reserve("o1", {KEY: 8}, on_hand={KEY: 10})
+    held, available = ledger.reserve("o2", {KEY: 3, other: 1}, on_hand={KEY: 10, other: 5})
+    assert not held and available == {KEY: 2, other: 5}
+    assert ledger.reserved(*other) == 0
+    assert ledger.get("o2") is None
+
+
+def test_same_id_replaces_its_hold():
+    ledger = AllocationLedger(ttl=60, commit_hold=60)
+    ledger.reserve("o1", {KEY: 8}, on_hand={KEY: 10})
+    held, available = ledger.reserve("o1", {KEY: 9}, on_hand={KEY: 10})
+    assert held and available == {KEY: 10}
+    assert ledger.reserved(*KEY) == 9
+
+
+def test_release_and_commit():
+    ledger = AllocationLedger(ttl=60, commit_hold=0)
+    ledger.reserve("o1", {KEY: 2})
+    ledger.reserve("o2", {KEY: 3})
+    assert ledger.release("o1") and not ledger.release("o1")
+    assert ledger.commit("o2")
+    assert ledger.reserved(*KEY) == 0
+
+
+def test_holds_expire():
+    ledger = AllocationLedger(ttl=0.05, commit_hold=60)
+    ledger.reserve("o1", {KEY: 2})
+    assert ledger.reserved(*KEY) == 2
+    time.sleep(0.1)
+    assert ledger.reserved(*KEY) == 0
+    assert ledger.stats()["expired"] == 1
+
+
+def test_committed_hold_lapses_after_commit_hold():
+    ledger = AllocationLedger(ttl=0.05, commit_hold=0.2)
+    ledger.reserve("o1", {KEY: 2})
+    ledger.commit("o1")
+    time.sleep(0.1)  # past the reservation ttl: the commit rescheduled it
+    assert ledger.reserved(*KEY) == 2
+    time.sleep(0.2)
+    assert ledger.reserved(*KEY) == 0
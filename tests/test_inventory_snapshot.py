@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from src.tools import inventory_snapshot
+from src.tools.aidp_jdbc_pool import JdbcWorkerPool
+from src.tools.inventory_snapshot import InventorySnapshot
+from src.utils.generate_inventory_data import generate
+
+BU = "US1 Business Unit"
+SKU = "AS6647431"  # first hot SKU: inventory_item_id 100000000
+US1_ORG_002 = (300000047000000, 300000046987012)  # (organization_id, business_unit_id)
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    path = generate(str(tmp_path / "inventory.sqlite"), n_items=20, n_rows=400)
+    monkeypatch.setenv("INVENTORY_SQLITE_PATH", path)
+    pool = JdbcWorkerPool(size=1, backend="sqlite", health_check_interval=0)
+    monkeypatch.setattr(inventory_snapshot, "get_jdbc_pool", lambda: pool)
+    yield path
+    pool.close()
+
+
+def _live_total(path, bu, sku):
+    sql = open(inventory_snapshot.FULL_SQL_PATH).read().replace("fdi_idl_catalog.default.", "")
+    rows = sqlite3.connect(path).execute(sql).fetchall()
+    return {(r[0], r[1]): int(r[2]) for r in rows}.get((bu, sku), 0), len(rows)
+
+
+def _add_onhand(path, qty, when):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT INTO dw_inv_onhand_details_cf VALUES (?, ?, 'Stores', ?, ?, ?)",
+                     (100000000, US1_ORG_002[0], US1_ORG_002[1], qty, when))
+    conn.close()
+
+
+def test_full_then_incremental_refresh(source, tmp_path):
+    snapshot = InventorySnapshot(str(tmp_path / "snapshot.sqlite"), max_age=60)
+    expected, keys = _live_total(source, BU, SKU)
+    assert snapshot.refresh() == keys
+    assert snapshot.lookup(BU, [SKU, "NOPE"]) == ({SKU: expected}, snapshot.refreshed_at)
+
+    watermark = snapshot.stats()["watermark"]
+    assert snapshot.refresh() == 0  # nothing changed since the watermark
+
+    _add_onhand(source, 7, "2030-01-01 00:00:00")
+    assert snapshot.refresh() == 1  # only the changed key is re-aggregated
+    assert snapshot.lookup(BU, [SKU])[0] == {SKU: expected + 7}
+    assert snapshot.stats()["watermark"] == "2030-01-01 00:00:00" > watermark
+
+
+def test_full_refresh_drops_deleted_rows(source, tmp_path):
+    snapshot = InventorySnapshot(str(tmp_path / "snapshot.sqlite"), max_age=60)
+    snapshot.refresh()
+    conn = sqlite3.connect(source)
+    with conn:
+        conn.execute("DELETE FROM dw_inv_onhand_details_cf WHERE inventory_item_id = 100000000")
+    conn.close()
+    assert snapshot.lookup(BU, [SKU])[0] != {}
+    snapshot.refresh(full=True)
+    assert snapshot.lookup(BU, [SKU])[0] == {}
+
+
+def test_stale_snapshot_answers_nothing(source, tmp_path):
+    snapshot = InventorySnapshot(str(tmp_path / "snapshot.sqlite"), max_age=0)
+    assert snapshot.lookup(BU, [SKU]) == ({}, None)
+    snapshot.refresh()
+    found, refreshed_at = snapshot.lookup(BU, [SKU])
+    assert found == {} and refreshed_at is not None and not snapshot.is_fresh()
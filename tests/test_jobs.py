@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from src.apps.jobs import JobManager, JobQueueFullError
+
+
+@pytest.fixture
+def make_manager():
+    managers = []
+
+    def make(**kwargs):
+        managers.append(JobManager(**kwargs))
+        return managers[-1]
+
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+
+def _wait(manager, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id).status in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return manager.get(job_id)
+
+
+def test_job_result_and_stages(make_manager):
+    manager = make_manager(workers=1, max_pending=4, ttl=60, max_items=10)
+
+    def work(job, a, b):
+        with job.stage("add"):
+            return a + b
+
+    job = _wait(manager, manager.submit("sum", work, 2, 3).id)
+    out = job.to_dict()
+    assert out["status"] == "succeeded" and out["result"] == 5 and out["kind"] == "sum"
+    assert [s["name"] for s in out["stages"]] == ["add"] and out["stages"][0]["status"] == "succeeded"
+    assert out["queue_ms"] is not None and out["total_ms"] is not None
+    assert manager.stats()["succeeded"] == 1
+
+
+def test_failed_job_keeps_error_and_failed_stage(make_manager):
+    manager = make_manager(workers=1, max_pending=4, ttl=60, max_items=10)
+
+    def work(job):
+        with job.stage("agent"):
+            raise ValueError("bad order")
+
+    job = _wait(manager, manager.submit("create", work).id)
+    out = job.to_dict()
+    assert out["status"] == "failed" and out["error"] == "bad order" and "result" not in out
+    assert out["stages"][0]["status"] == "failed"
+    assert manager.stats()["failed"] == 1
+
+
+def test_queue_full_and_active_jobs_are_retrievable(make_manager):
+    manager = make_manager(workers=1, max_pending=1, ttl=60, max_items=1)
+    release = threading.Event()
+    running = manager.submit("slow", lambda job: release.wait(5))
+    time.sleep(0.05)
+    queued = manager.submit("slow", lambda job: "second")
+    with pytest.raises(JobQueueFullError):
+        manager.submit("slow", lambda job: "third")
+
+    # active jobs are never evicted by the finished-job store
+    assert manager.get(running.id).status == "running"
+    assert manager.get(queued.id).status == "queued"
+    assert manager.stats()["rejected"] == 1 and manager.stats()["pending"] == 1
+
+    release.set()
+    assert _wait(manager, queued.id).result == "second"
+    while manager.stats()["running"]:
+        time.sleep(0.01)
+    assert manager.get(running.id) is None  # pushed out of the one-item store by the newer job
+
+
+def test_finished_job_expires_after_ttl(make_manager):
+    manager = make_manager(workers=1, max_pending=4, ttl=0.1, max_items=10)
+    job = _wait(manager, manager.submit("quick", lambda job: 1).id)
+    assert job.status == "succeeded"
+    time.sleep(0.2)
+    assert manager.get(job.id) is None
+    assert manager.get("unknown") is None
+
+
+def test_on_stage_reports_progress(make_manager):
+    manager = make_manager(workers=1, max_pending=4, ttl=60, max_items=10)
+    events = []
+
+    def work(job):
+        job.on_stage = lambda name, status, ms: events.append((name, status))
+        with job.stage("extract"):
+            pass
+        return "ok"
+
+    _wait(manager, manager.submit("pipeline", work).id)
+    assert events == [("extract", "running"), ("extract", "succeeded")]
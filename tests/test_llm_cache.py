@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from wayflowcore.messagelist import Message
+from wayflowcore.models.llmmodel import Prompt
+
+from src.llm import llm_cache
+from src.llm.llm_cache import LangchainLlmCache, LlmResponseCache, bypass_llm_cache, prompt_key
+
+LLM_STRING = '{"model_id": "cohere.command-r"}'
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LlmResponseCache(path=str(tmp_path / "llm_cache.sqlite"), ttl=60, maxsize=10, max_rows=100)
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+def test_langchain_lookup_after_update(cache):
+    langchain_cache = LangchainLlmCache()
+    assert langchain_cache.lookup("prompt", LLM_STRING) is None
+    langchain_cache.update("prompt", LLM_STRING, [ChatGeneration(message=AIMessage("hello"))])
+    hit = langchain_cache.lookup("prompt", LLM_STRING)
+    assert [g.message.content for g in hit] == ["hello"]
+    assert langchain_cache.lookup("prompt", '{"model_id": "other"}') is None  # the model is part of the key
+
+
+def test_entries_survive_a_restart_on_disk(cache):
+    LangchainLlmCache().update("prompt", LLM_STRING, [ChatGeneration(message=AIMessage("hello"))])
+    restarted = LlmResponseCache(path=cache.path, ttl=60, maxsize=10, max_rows=100)
+    assert restarted.get(LangchainLlmCache._key("prompt", LLM_STRING)) is not None
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_bypass_skips_lookup_and_store(cache):
+    langchain_cache = LangchainLlmCache()
+    langchain_cache.update("prompt", LLM_STRING, [ChatGeneration(message=AIMessage("old"))])
+    with bypass_llm_cache():
+        assert langchain_cache.lookup("prompt", LLM_STRING) is None
+        langchain_cache.update("prompt", LLM_STRING, [ChatGeneration(message=AIMessage("new"))])
+    assert langchain_cache.lookup("prompt", LLM_STRING)[0].message.content == "old"
+
+
+def test_bypass_is_per_context(cache):
+    async def main():
+        async def bypassed():
+            with bypass_llm_cache():
+                await asyncio.sleep(0.01)
+                return cache.active
+
+        async def normal():
+            await asyncio.sleep(0.005)
+            return cache.active
+
+        return await asyncio.gather(bypassed(), normal())
+
+    assert asyncio.run(main()) == [False, True]
+
+
+def test_disabled_cache_stores_nothing(monkeypatch):
+    cache = LlmResponseCache(path="", ttl=0)
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    LangchainLlmCache().update("prompt", LLM_STRING, [ChatGeneration(message=AIMessage("hello"))])
+    assert LangchainLlmCache().lookup("prompt", LLM_STRING) is None and cache.stats()["stores"] == 0
+
+
+def test_prompt_key_covers_model_and_messages():
+    prompt = Prompt(messages=[Message(content="hi")])
+    assert prompt_key("model-a", prompt) == prompt_key("model-a", Prompt(messages=[Message(content="hi")]))
+    assert prompt_key("model-a", prompt) != prompt_key("model-b", prompt)
+    assert prompt_key("model-a", prompt) != prompt_key("model-a", Prompt(messages=[Message(content="hello")]))
+
+
+def test_key_parts_are_separated():
+    assert LlmResponseCache.key("ab", "c") != LlmResponseCache.key("a", "bc")
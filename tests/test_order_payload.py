@@ -0,0 +1,33 @@
+# tests/test_order_payload.py
+import json
+
+from src.utils.order_payload import parse_orders_from_intake
+
+
+def _transaction(*items):
+    return {"BillToCustomer": {"BusinessUnit": "EMEA1 Business Unit"},
+            "lines": [{"ProductNumber": sku, "OrderedQuantity": qty} for sku, qty in items]}
+
+
+def test_transaction_json_with_lines():
+    [(order, bu)] = parse_orders_from_intake(json.dumps(_transaction(("AS1", 2))), "T1")
+    assert bu == "EMEA1 Business Unit"
+    assert order["SourceTransactionNumber"] == "T1"
+    assert [(l["ProductNumber"], l["OrderedQuantity"]) for l in order["lines"]] == [("AS1", 2)]
+
+
+def test_list_of_orders_gets_numbered_transactions():
+    intake = {"final_answer": json.dumps([_transaction(("AS1", 1)), _transaction(("AS2", 3))])}
+    orders = parse_orders_from_intake(intake, "T1")
+    assert [o["SourceTransactionNumber"] for o, _ in orders] == ["T1-1", "T1-2"]
+
+
+def test_nothing_readable_gives_no_order():
+    assert parse_orders_from_intake("I could not read the image.", "T1") == []
+    assert parse_orders_from_intake(json.dumps(_transaction(("AS1", 0))), "T1") == []
+
+
+def test_customer_name_is_sent_with_the_order():
+    intake = dict(_transaction(("AS1", 1)), BillToCustomer={"Name": "Acme", "BusinessUnit": "EMEA1 Business Unit"})
+    [(order, _)] = parse_orders_from_intake(json.dumps(intake), "T1")
+    assert order["BillToCustomer"] == {"Name": "Acme", "BusinessUnit": "EMEA1 Business Unit"}
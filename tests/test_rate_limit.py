@@ -0,0 +1,103 @@
+# tests/test_rate_limit.py
+import asyncio
+
+import pytest
+
+from src.llm.rate_limit import LlmQueueTimeoutError, ModelLimiter, TokenBucket
+
+
+class Throttled(Exception):
+    status = 429
+
+
+def _limiter(**kwargs):
+    settings = dict(rate=0, burst=1, max_concurrency=8, min_concurrency=1, max_attempts=0,
+                    base_delay=0.0, max_delay=0.0, queue_timeout=0.2)
+    settings.update(kwargs)
+    return ModelLimiter("test", **settings)
+
+
+def _throttled():
+    raise Throttled("429 TooManyRequests")
+
+
+def test_bucket_allows_a_burst_then_waits():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.take() == 0 and bucket.take() == 0
+    assert 0 < bucket.take() <= 0.1
+
+
+def test_bucket_without_rate_is_unlimited():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.take() == 0 for _ in range(100))
+
+
+def test_throttle_halves_the_window_down_to_the_floor():
+    limiter = _limiter(max_concurrency=8, min_concurrency=2)
+    for expected in (4, 2, 2):
+        with pytest.raises(Throttled):
+            limiter.call(_throttled)
+        assert limiter.window == expected
+    assert limiter.stats()["throttled"] == 3
+
+
+def test_success_grows_the_window_back_up_to_the_ceiling():
+    limiter = _limiter(max_concurrency=4)
+    with pytest.raises(Throttled):
+        limiter.call(_throttled)
+    assert limiter.window == 2
+    limiter.call(lambda: None)
+    assert limiter.window == 2.5  # +1/window per success: one per window of calls
+    for _ in range(20):
+        limiter.call(lambda: None)
+    assert limiter.window == 4
+    assert limiter.in_flight == 0
+
+
+def test_transient_errors_are_retried():
+    limiter = _limiter(max_attempts=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Throttled("429")
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 3 and limiter.stats()["retries"] == 2
+
+
+def test_full_window_times_out():
+    limiter = _limiter(max_concurrency=1, queue_timeout=0.05)
+    limiter.acquire()
+    with pytest.raises(LlmQueueTimeoutError):
+        limiter.acquire()
+    assert limiter.stats()["queue_timeouts"] == 1
+
+
+def test_cancelled_acall_gives_its_slot_back():
+    limiter = _limiter(max_concurrency=1)
+
+    async def main():
+        task = asyncio.create_task(limiter.acall(asyncio.sleep, 10))
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert limiter.in_flight == 0
+        assert await limiter.acall(asyncio.sleep, 0, "next") == "next"
+
+    asyncio.run(main())
+
+
+def test_interrupted_call_gives_its_slot_back():
+    limiter = _limiter(max_concurrency=1)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        limiter.call(interrupted)
+    assert limiter.in_flight == 0
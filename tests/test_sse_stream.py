@@ -0,0 +1,73 @@
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.apps import fastapi_orderx
+
+
+@pytest.fixture
+def client():
+    # no `with`: the lifespan would warm the JDBC pool and the LLM clients
+    return TestClient(fastapi_orderx.app)
+
+
+def _payload(**extra):
+    return {"SourceTransactionNumber": f"T-{uuid.uuid4().hex[:8]}", "BusinessUnit": "US1 Business Unit",
+            "lines": [{"ProductNumber": "AS1", "OrderedQuantity": 1}], **extra}
+
+
+def _frames(response):
+    frames = []
+    for block in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def test_stream_sends_accepted_stages_and_result(client, monkeypatch):
+    monkeypatch.setattr(fastapi_orderx, "create_order_impl", lambda payload: '{"OrderNumber": "42"}')
+    response = client.post("/stream/orders/create", json=_payload())
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/event-stream")
+
+    frames = _frames(response)
+    kinds = [kind for kind, _ in frames]
+    assert kinds[0] == "accepted" and kinds[-1] == "result"
+    assert ("stage", "create_order", "succeeded") in [(k, d.get("name"), d.get("status")) for k, d in frames]
+    result = frames[-1][1]
+    assert result["final_answer"] == '{"OrderNumber": "42"}' and result["mode"] == "direct"
+    assert not result["replayed"] and [s["name"] for s in result["stages"]] == ["reserve", "create_order"]
+
+
+def test_http_error_inside_the_stream_keeps_its_status(client, monkeypatch):
+    def reject(payload):
+        raise HTTPException(status_code=422, detail="no items in the document")
+
+    monkeypatch.setattr(fastapi_orderx, "create_order_impl", reject)
+    kind, data = _frames(client.post("/stream/orders/create", json=_payload()))[-1]
+    assert kind == "error" and data["status_code"] == 422 and data["error"] == "no items in the document"
+
+
+def test_unexpected_error_is_a_500_frame(client, monkeypatch):
+    def boom(payload):
+        raise RuntimeError("Fusion unreachable")
+
+    monkeypatch.setattr(fastapi_orderx, "create_order_impl", boom)
+    kind, data = _frames(client.post("/stream/orders/create", json=_payload()))[-1]
+    assert kind == "error" and data["status_code"] == 500 and data["error"] == "Fusion unreachable"
+    assert (data["stages"][-1]["name"], data["stages"][-1]["status"]) == ("create_order", "failed")
+
+
+def test_reused_key_with_another_payload_is_rejected_before_streaming(client, monkeypatch):
+    monkeypatch.setattr(fastapi_orderx, "create_order_impl", lambda payload: '{"OrderNumber": "43"}')
+    payload = _payload()
+    assert _frames(client.post("/stream/orders/create", json=payload))[-1][0] == "result"
+
+    replay = _frames(client.post("/stream/orders/create", json=payload))[-1][1]
+    assert replay["replayed"] and replay["final_answer"] == '{"OrderNumber": "43"}'
+
+    changed = dict(payload, lines=[{"ProductNumber": "AS1", "OrderedQuantity": 2}])
+    response = client.post("/stream/orders/create", json=changed)
+    assert response.status_code == 422
@@ -0,0 +1,36 @@
+# tests/test_vision_instruct_tools.py
+from src.tools.vision_instruct_tools import _merge_pages
+
+
+def _line(n, product):
+    return {"SourceTransactionLineId": str(n), "SourceTransactionLineNumber": str(n),
+            "ProductNumber": product, "OrderedQuantity": 1}
+
+
+def _order(txn, *products):
+    return {"SourceTransactionNumber": txn, "lines": [_line(i, p) for i, p in enumerate(products, start=1)]}
+
+
+def test_continuation_page_extends_previous_order():
+    orders = _merge_pages([[(_order("A", "P1", "P2"), True)], [(_order("", "P3"), False)]])
+    assert len(orders) == 1
+    lines = orders[0]["lines"]
+    assert [l["ProductNumber"] for l in lines] == ["P1", "P2", "P3"]
+    assert [l["SourceTransactionLineNumber"] for l in lines] == ["1", "2", "3"]
+    assert lines[2]["SourceTransactionLineId"] == "3"
+
+
+def test_orders_with_customer_stay_separate():
+    orders = _merge_pages([[(_order("A", "P1"), True), (_order("B", "P2"), True)], [(_order("C", "P3"), True)]])
+    assert [o["SourceTransactionNumber"] for o in orders] == ["A", "B", "C"]
+
+
+def test_leading_item_only_page_starts_an_order():
+    orders = _merge_pages([[(_order("", "P1"), False)], [(_order("", "P2"), False)]])
+    assert len(orders) == 1
+    assert [l["ProductNumber"] for l in orders[0]["lines"]] == ["P1", "P2"]
+
+
+def test_orders_without_lines_are_dropped():
+    orders = _merge_pages([[({"SourceTransactionNumber": "A", "lines": []}, True)], [], [(_order("B", "P1"), True)]])
+    assert [o["SourceTransactionNumber"] for o in orders] == ["B"]